@@ -0,0 +1,60 @@
+"""
+Random 3-SAT benchmark for the CDCL solver.
+
+Instances have round(4.26 * n) clauses over n variables, close to the
+satisfiability phase transition, where random 3-SAT is hardest. Run with
+
+    python benchmarks/sat.py --vars 50 100 150 --instances 20
+"""
+import argparse
+import random
+import statistics
+import time
+
+from deducto.solver import Solver
+
+RATIO = 4.26
+
+
+def random_3sat(num_vars, rng, ratio=RATIO):
+    num_clauses = round(ratio * num_vars)
+    return [
+        [v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), 3)]
+        for _ in range(num_clauses)
+    ]
+
+def satisfies(model, clauses):
+    return all(any(model[abs(l)] == (l > 0) for l in clause) for clause in clauses)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vars", type=int, nargs="+", default=[50, 100, 150])
+    parser.add_argument("--instances", type=int, default=20)
+    parser.add_argument("--ratio", type=float, default=RATIO)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>6} {'clauses':>8} {'sat':>5} {'median ms':>10} {'max ms':>10} {'conflicts':>10}")
+    for num_vars in args.vars:
+        times = []
+        satisfiable = 0
+        conflicts = 0
+        for _ in range(args.instances):
+            clauses = random_3sat(num_vars, rng, args.ratio)
+            solver = Solver(num_vars, clauses)
+            start = time.perf_counter()
+            result = solver.solve()
+            times.append(time.perf_counter() - start)
+            conflicts += solver.conflicts
+            if result:
+                assert satisfies(solver.model, clauses), "solver returned a non-model"
+                satisfiable += 1
+        print(
+            f"{num_vars:>6} {round(args.ratio * num_vars):>8} {satisfiable:>5} "
+            f"{statistics.median(times) * 1000:>10.1f} {max(times) * 1000:>10.1f} "
+            f"{conflicts // args.instances:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Cold-start import cost of the deducto CLI.
+
+Runs `python -X importtime -m deducto <args>` and reports the total import
+time and the slowest top-level imports. The exit status is 1 if the best run
+takes longer than --budget milliseconds. The total covers the whole
+interpreter (site, encodings, argparse, ...), so set the budget for the
+machine it runs on. Run with
+
+    python benchmarks/startup.py --version
+    python benchmarks/startup.py --budget 150 verify /dev/null
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Total import time allowed for a non-interactive launch, in milliseconds.
+# Loading prompt_toolkit alone takes well over this.
+STARTUP_BUDGET = 150.0
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def import_times(args):
+    """Return (module, self microseconds, cumulative microseconds, depth) for each import"""
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "deducto", *args],
+        env=env, capture_output=True, text=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), int(own), int(cumulative), depth))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="Number of imports to list.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs to take the best total from.")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET,
+                        help="Milliseconds of imports allowed (default: %(default)s).")
+    args, cli_args = parser.parse_known_args()
+
+    runs = [import_times(cli_args) for _ in range(args.runs)]
+    best = min(runs, key=lambda times: sum(t[1] for t in times))
+    total = sum(t[1] for t in best) / 1000
+    print(f"deducto {' '.join(cli_args)}: {total:.1f} ms of imports (budget {args.budget:.0f} ms)")
+    top_level = sorted((t for t in best if t[3] == 0), key=lambda t: -t[2])
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"{cumulative / 1000:>8.1f} ms  {name}")
+    return 1 if total > args.budget else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Micro-benchmarks for parsing, equality, rendering, rules and export.
+
+Formulas come from a seeded generator, so two runs with the same parameters
+measure the same inputs. Each benchmark reports the best time per call over
+several repeats. Results are saved as JSON and can be compared against a
+baseline, flagging anything slower by more than a threshold. Run with
+
+    python benchmarks/suite.py run --out baseline.json
+    python benchmarks/suite.py run --out new.json --compare baseline.json
+    python benchmarks/suite.py compare baseline.json new.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import timeit
+
+from deducto.cli.parser import _parse_normalized, parse
+from deducto.core.expr import *
+from deducto.core.proof import ProofState, ProofStep
+from deducto.core.render import LATEX, render
+from deducto.core.utils import all_paths, set_path
+from deducto.export.txt import export_txt
+from deducto.normalform import to_cnf, to_nnf
+from deducto.simplify import simplify
+from deducto.rules.apply import RULES, apply_rule, list_applicable_rules
+
+OPERATORS = {"and": And, "or": Or, "implies": Implies, "iff": Iff, "xor": Xor, "not": Not}
+DEFAULT_MIX = "and=3,or=3,implies=2,iff=1,xor=1,not=2"
+
+
+def parse_mix(text):
+    """Read operator weights written as 'and=3,or=2,...'"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATORS:
+            raise ValueError(f"Unknown operator '{name.strip()}'")
+        mix[OPERATORS[name.strip()]] = float(weight or 1)
+    return mix
+
+
+class FormulaGenerator:
+    """
+    Random formulas over variables x0..x{n-1}, full to the given depth, with
+    operators drawn according to mix.
+    """
+    def __init__(self, variables=8, depth=8, mix=DEFAULT_MIX, seed=0):
+        self.variables = [Var(f"x{i}") for i in range(variables)]
+        self.depth = depth
+        self.operators, self.weights = zip(*parse_mix(mix).items())
+        self.rng = random.Random(seed)
+
+    def formula(self, depth=None):
+        depth = self.depth if depth is None else depth
+        if depth == 0:
+            return self.rng.choice(self.variables)
+        operator = self.rng.choices(self.operators, self.weights)[0]
+        if operator is Not:
+            return Not(self.formula(depth - 1))
+        return operator(self.formula(depth - 1), self.formula(depth - 1))
+
+
+def rule_inputs(a, b, c):
+    """Find premises each rule accepts, among shapes built from a, b and c"""
+    t, f = TrueExpr(), FalseExpr()
+    shapes = [
+        a, Not(a), Not(b), Not(Not(a)), Implies(a, b), Implies(b, c), Or(a, b),
+        Or(Not(a), c), And(a, b), And(a, Or(a, b)), Or(a, And(a, b)),
+        And(And(a, b), c), Or(Or(a, b), c), Iff(a, b), Xor(a, b), And(a, Not(a)),
+        Not(And(a, b)), Not(Or(a, b)), And(a, Or(b, c)), Or(a, And(b, c)),
+        And(a, f), Or(a, t), Or(a, Not(a)), And(a, a), And(a, t), Or(a, f),
+    ]
+    inputs = {}
+    for rule in RULES.values():
+        candidates = [[s] for s in shapes] if rule.arity == 1 else [[s, u] for s in shapes for u in shapes]
+        for premises in candidates:
+            try:
+                rule.func(*premises)
+            except (TypeError, ValueError):
+                continue
+            inputs[rule.name] = premises
+            break
+    return inputs
+
+
+def measure(func, repeat=5):
+    """Best seconds per call of func"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def benchmarks(args):
+    """Yield (name, callable) pairs, setting up their inputs"""
+    gen = FormulaGenerator(args.vars, args.depth, args.mix, args.seed)
+    formulas = [gen.formula() for _ in range(args.formulas)]
+    texts = [str(f) for f in formulas]
+    assert [parse(t) for t in texts] == formulas, "generated formulas do not round-trip"
+
+    cold_parse = _parse_normalized.__wrapped__
+    yield "parse", lambda: [cold_parse(" ".join(t.split())) for t in texts]
+    yield "parse_cached", lambda: [parse(t) for t in texts]
+    others = [gen.formula() for _ in formulas]
+    yield "eq", lambda: [x == y for x, y in zip(formulas, others)]
+    yield "str", lambda: [str(f) for f in formulas]
+    yield "latex", lambda: [render(f, LATEX) for f in formulas]
+    yield "all_paths", lambda: [all_paths(f) for f in formulas]
+    yield "to_nnf", lambda: [to_nnf(f) for f in formulas]
+    yield "to_cnf", lambda: [to_cnf(f) for f in formulas]
+    yield "simplify", lambda: [simplify(f) for f in formulas]
+
+    a, b, c = (gen.formula(max(1, args.depth // 2)) for _ in range(3))
+    inputs = rule_inputs(a, b, c)
+    for name in RULES:
+        if name in inputs:
+            premises = inputs[name]
+            yield f"apply_rule:{name}", lambda name=name, premises=premises: apply_rule(name, premises)
+        else:
+            print(f"  (no input found for {name}, skipped)", file=sys.stderr)
+
+    # A double negation at the bottom of a deep formula, rewritten in place
+    path = []
+    target = formulas[0]
+    for _ in range(args.depth - 1):
+        if isinstance(target, Not):
+            path.append("negated")
+            target = target.negated
+        else:
+            path.append("left")
+            target = target.left
+    proof = ProofState([set_path(formulas[0], path, Not(Not(target)))], None)
+    ref = ".".join(["1", *path])
+
+    def try_rule():
+        proof.try_rule("negation", [ref])
+        proof.undo()
+    yield "try_rule_subpath", try_rule
+
+    # Suggestions on a long chain of implications, served by the step index
+    chain = ProofState([Implies(Var(f"p{i}"), Var(f"p{i + 1}")) for i in range(300)] + [Var("p0")],
+                       Var("p300"))
+    yield "suggest_long_proof", lambda: list_applicable_rules(chain.steps, chain.index, chain.goal)
+
+    steps = ProofState(formulas[:2], None)
+    for i, formula in enumerate(formulas[2:]):
+        steps.add_step(ProofStep(formula, "addition", [i, i + 1]))
+    out = os.path.join(tempfile.mkdtemp(), "proof.txt")
+    yield "export_txt", lambda: export_txt(steps, out)
+
+
+def run(args):
+    results = {}
+    for name, func in benchmarks(args):
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeat)
+        print(f"{results[name] * 1e6:>12.2f} us  {name}")
+    report = {
+        "params": {k: getattr(args, k) for k in ("vars", "depth", "mix", "seed", "formulas")},
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            return compare_reports(json.load(f), report, args.threshold)
+    return 0
+
+
+def compare_reports(baseline, current, threshold):
+    """Print the change of every benchmark and return 1 if any regressed"""
+    if baseline.get("params") != current.get("params"):
+        print("warning: the reports were made with different parameters", file=sys.stderr)
+    regressions = 0
+    for name, before in sorted(baseline["results"].items()):
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{change:>+8.1%}  {before * 1e6:>10.2f} -> {after * 1e6:>10.2f} us  {name}{flag}")
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    return compare_reports(baseline, current, args.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks.")
+    run_parser.add_argument("--vars", type=int, default=8)
+    run_parser.add_argument("--depth", type=int, default=8)
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="Operator weights, e.g. and=3,or=1,not=2.")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--formulas", type=int, default=50, help="Formulas per batch.")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--filter", help="Only run benchmarks whose name contains this.")
+    run_parser.add_argument("--out", help="Save the results as JSON.")
+    run_parser.add_argument("--compare", help="Compare against a saved baseline.")
+    run_parser.add_argument("--threshold", type=float, default=0.1)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved results.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative slowdown to flag (0.1 is 10%%).")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+if __name__ == "__main__":
+    main()
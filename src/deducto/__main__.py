@@ -1,10 +1,107 @@
-from deducto.cli.session import run_proof_session
+import argparse
+import json
+import sys
 
-def main():
+from deducto import __version__
+
+# Subcommands import what they need when they run, so that batch jobs and
+# --version never load prompt_toolkit or pylatex
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="deducto", description="Interactive proof assistant.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the run into FILE: collapsed stacks for flamegraphs if it "
+                             "ends in .folded, .collapsed or .txt, cProfile statistics otherwise. "
+                             "Also records every rule application for `stats`. "
+                             "Worker processes are not profiled.")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="Run proof scripts and print one JSON result per line.")
+    run.add_argument("scripts", nargs="+", help="Script files, directories or glob patterns.")
+    run.add_argument("-j", "--jobs", type=int, default=None,
+                     help="Number of worker processes (default: one per CPU).")
+
+    verify = commands.add_parser("verify", help="Verify JSONL proof files and print one JSON result per proof.")
+    verify.add_argument("files", nargs="+", help="JSONL files, one proof per line.")
+    verify.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: one per CPU).")
+
+    serve = commands.add_parser("serve", help="Serve proof sessions over JSON-RPC, one request per line.")
+    where = serve.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=None, help="TCP port to listen on (default: 8765).")
+    where.add_argument("--socket", metavar="PATH", default=None, help="Unix socket to listen on instead.")
+    serve.add_argument("--host", default=None, help="Address to listen on (default: 127.0.0.1).")
+    serve.add_argument("-j", "--jobs", type=int, default=None,
+                       help="Worker processes for check and prove (default: one per CPU).")
+    serve.add_argument("--max-sessions", type=int, default=None, help="Maximum number of open sessions.")
+    serve.add_argument("--idle-timeout", type=float, default=None, metavar="SECONDS",
+                       help="Close sessions unused for this long.")
+    return parser
+
+def run(args):
+    from deducto.cli.batch import find_scripts, run_scripts
+
+    failed = 0
+    for result in run_scripts(find_scripts(args.scripts), args.jobs):
+        failed += not result["reached"]
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return 1 if failed else 0
+
+def verify(args):
+    from deducto.cli.verify import Throughput, verify_files
+
+    throughput = Throughput()
+    for result in verify_files(args.files, args.jobs):
+        throughput.add(result)
+        print(json.dumps(result, ensure_ascii=False))
+    print(throughput, file=sys.stderr)
+    return 1 if throughput.invalid else 0
+
+def serve(args):
+    import asyncio
+    from deducto.cli import server
+
+    limits = {}
+    if args.max_sessions is not None:
+        limits["max_sessions"] = args.max_sessions
+    if args.idle_timeout is not None:
+        limits["idle_timeout"] = args.idle_timeout
+    try:
+        # --port 0 asks the system for a free port
+        host = args.host if args.host is not None else server.DEFAULT_HOST
+        port = args.port if args.port is not None else server.DEFAULT_PORT
+        asyncio.run(server.serve(host, port, args.socket, args.jobs, **limits))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from deducto.cli.profile import profiled
+        from deducto.core.stats import STATS
+
+        STATS.rules = True
+        with profiled(args.profile):
+            return dispatch(args)
+    return dispatch(args)
+
+def dispatch(args):
+    if args.command == "run":
+        return run(args)
+    if args.command == "verify":
+        return verify(args)
+    if args.command == "serve":
+        return serve(args)
+
+    from deducto.cli.session import run_proof_session
     try:
         run_proof_session()
     except (KeyboardInterrupt, EOFError):
         pass
+    return 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+Reduced ordered binary decision diagrams.
+
+A BDD manager keeps every node in a unique table keyed on (level, low, high),
+so two formulas compile to the same node exactly when they are equivalent
+under the manager's variable order. Nodes are plain ints; 0 and 1 are the
+FALSE and TRUE terminals. All operations go through a memoized if-then-else
+whose cache is a fixed-size, direct-mapped table: a colliding entry simply
+overwrites the older one.
+
+sift improves the order in place by swapping adjacent levels. A swap only
+rewrites the nodes of the two levels and their unique-table entries, and
+every node keeps its number and function.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from deducto.core.expr import *
+from deducto.core.utils import postorder
+
+FALSE = 0
+TRUE = 1
+
+# Number of slots in the if-then-else cache
+CACHE_SIZE = 1 << 16
+
+# How far sifting lets the diagram grow, as a multiple of the best size seen,
+# before it stops moving a variable further in the same direction
+MAX_GROWTH = 1.2
+
+
+class BDD:
+    """
+    A BDD manager.
+    ---
+    :param order: Variable names from the top level down. Variables met later
+                  are appended below the existing ones.
+    :param cache_size: Number of slots in the operation cache.
+    """
+    def __init__(self, order: Sequence[str] = (), cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        self.order: List[str] = []
+        self._levels: Dict[str, int] = {}
+        # Terminals sit below every variable level
+        self._level = [float("inf"), float("inf")]
+        self._low = [FALSE, TRUE]
+        self._high = [FALSE, TRUE]
+        self._unique: Dict[tuple, int] = {}
+        self._cache: List[Optional[tuple]] = [None] * cache_size
+        self._compiled: Dict[Expr, int] = {}
+        for name in order:
+            self.level(name)
+
+    def __len__(self):
+        """Number of nodes ever created, terminals included"""
+        return len(self._low)
+
+    def level(self, name: str) -> int:
+        """Return the level of a variable, adding it at the bottom if new"""
+        level = self._levels.get(name)
+        if level is None:
+            level = self._levels[name] = len(self.order)
+            self.order.append(name)
+        return level
+
+    def var(self, name: str) -> int:
+        return self._mk(self.level(name), FALSE, TRUE)
+
+    def _mk(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self._low)
+            self._level.append(level)
+            self._low.append(low)
+            self._high.append(high)
+            self._unique[key] = node
+        return node
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """If f then g else h"""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        slot = hash(key) % self.cache_size
+        entry = self._cache[slot]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        levels = self._level
+        top = min(levels[f], levels[g], levels[h])
+        f0, f1 = (self._low[f], self._high[f]) if levels[f] == top else (f, f)
+        g0, g1 = (self._low[g], self._high[g]) if levels[g] == top else (g, g)
+        h0, h1 = (self._low[h], self._high[h]) if levels[h] == top else (h, h)
+        node = self._mk(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self._cache[slot] = (key, node)
+        return node
+
+    def negate(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def compile(self, expr: Expr) -> int:
+        """Return the node of expr, compiling shared subformulas once"""
+        compiled = self._compiled
+        if expr in compiled:
+            return compiled[expr]
+        for node in postorder(expr):
+            if node in compiled:
+                continue
+            if isinstance(node, Var):
+                result = self.var(node.name)
+            elif isinstance(node, TrueExpr):
+                result = TRUE
+            elif isinstance(node, FalseExpr):
+                result = FALSE
+            elif isinstance(node, Not):
+                result = self.negate(compiled[node.negated])
+            else:
+                a, b = compiled[node.left], compiled[node.right]
+                if isinstance(node, And):
+                    result = self.ite(a, b, FALSE)
+                elif isinstance(node, Or):
+                    result = self.ite(a, TRUE, b)
+                elif isinstance(node, Implies):
+                    result = self.ite(a, b, TRUE)
+                elif isinstance(node, Iff):
+                    result = self.ite(a, b, self.negate(b))
+                elif isinstance(node, Xor):
+                    result = self.ite(a, self.negate(b), b)
+                else:
+                    raise TypeError(f"Cannot compile {node.__class__.__name__}")
+            compiled[node] = result
+        return compiled[expr]
+
+    def equivalent(self, a: Expr, b: Expr) -> bool:
+        return self.compile(a) == self.compile(b)
+
+    def is_tautology(self, expr: Expr) -> bool:
+        return self.compile(expr) == TRUE
+
+    def _reachable(self, roots: Iterable[int]):
+        seen = set()
+        stack = [root for root in roots if root > TRUE]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            for child in (self._low[node], self._high[node]):
+                if child > TRUE:
+                    stack.append(child)
+        return seen
+
+    def size(self, roots: Iterable[int]) -> int:
+        """Number of internal nodes reachable from roots"""
+        return len(self._reachable(roots))
+
+    def count(self, f: int, num_vars: Optional[int] = None) -> int:
+        """
+        Number of satisfying assignments of f over the first num_vars levels
+        (all variables of the manager by default).
+        """
+        num_vars = len(self.order) if num_vars is None else num_vars
+        levels = self._level
+
+        def level(node):
+            return num_vars if node <= TRUE else levels[node]
+
+        counts = {FALSE: 0, TRUE: 1}
+        for node in sorted(self._reachable([f]), key=lambda n: -levels[n]):
+            low, high = self._low[node], self._high[node]
+            counts[node] = (
+                counts[low] << (level(low) - levels[node] - 1)
+            ) + (
+                counts[high] << (level(high) - levels[node] - 1)
+            )
+        return counts[f] << level(f)
+
+    def satisfy(self, f: int) -> Optional[Dict[str, bool]]:
+        """Return one satisfying assignment of the variables on a path, or None"""
+        if f == FALSE:
+            return None
+        assignment = {}
+        while f > TRUE:
+            name = self.order[self._level[f]]
+            if self._low[f] != FALSE:
+                assignment[name] = False
+                f = self._low[f]
+            else:
+                assignment[name] = True
+                f = self._high[f]
+        return assignment
+
+    def transfer(self, roots: Sequence[int], target: "BDD") -> List[int]:
+        """Rebuild roots in another manager, which may use a different order"""
+        translated = {FALSE: FALSE, TRUE: TRUE}
+        for node in sorted(self._reachable(roots), key=lambda n: -self._level[n]):
+            var = target.var(self.order[self._level[node]])
+            translated[node] = target.ite(
+                var, translated[self._high[node]], translated[self._low[node]]
+            )
+        return [translated[root] for root in roots]
+
+    def reorder(self, order: Sequence[str], roots: Sequence[int]) -> List[int]:
+        """
+        Switch to a new variable order, keeping only what roots reach.
+        Node numbers change, so the roots are returned renumbered.
+        """
+        fresh = BDD(order, self.cache_size)
+        for name in self.order:
+            fresh.level(name)
+        new_roots = self.transfer(roots, fresh)
+        self.__dict__.update(fresh.__dict__)
+        return new_roots
+
+    def _swap(self, i: int, nodes_at: List[set]):
+        """
+        Swap the variables at levels i and i + 1 in place. Every node keeps
+        its number and its function, so roots, the compiled formulas and the
+        operation cache all stay valid. nodes_at holds the nodes of each
+        level and is kept up to date.
+        """
+        levels, low, high, unique = self._level, self._low, self._high, self._unique
+        upper, lower = nodes_at[i], nodes_at[i + 1]
+        # The cofactors of the nodes of level i that test level i + 1
+        # below them, read before anything moves
+        mixed = {}
+        for node in upper:
+            f0, f1 = low[node], high[node]
+            if levels[f0] == i + 1 or levels[f1] == i + 1:
+                f00, f01 = (low[f0], high[f0]) if levels[f0] == i + 1 else (f0, f0)
+                f10, f11 = (low[f1], high[f1]) if levels[f1] == i + 1 else (f1, f1)
+                mixed[node] = (f00, f01, f10, f11)
+        for node in upper:
+            del unique[(i, low[node], high[node])]
+        for node in lower:
+            del unique[(i + 1, low[node], high[node])]
+
+        # Nodes of level i + 1 move up as they are
+        for node in lower:
+            levels[node] = i
+            unique[(i, low[node], high[node])] = node
+        moved_up, moved_down = set(lower), set()
+        # Nodes of level i that do not test level i + 1 move down as they are
+        for node in upper:
+            if node not in mixed:
+                levels[node] = i + 1
+                unique[(i + 1, low[node], high[node])] = node
+                moved_down.add(node)
+        # The others are rebuilt over new nodes of level i + 1
+        for node, (f00, f01, f10, f11) in mixed.items():
+            created = len(low)
+            children = self._mk(i + 1, f00, f10), self._mk(i + 1, f01, f11)
+            moved_down.update(n for n in children if n >= created)
+            low[node], high[node] = children
+            unique[(i, low[node], high[node])] = node
+            moved_up.add(node)
+        nodes_at[i], nodes_at[i + 1] = moved_up, moved_down
+
+        x, y = self.order[i], self.order[i + 1]
+        self.order[i], self.order[i + 1] = y, x
+        self._levels[x], self._levels[y] = i + 1, i
+
+    def sift(self, roots: Sequence[int], passes: int = 1, max_growth: float = MAX_GROWTH) -> List[int]:
+        """
+        Sifting: move each variable, most used first, down to the bottom
+        level and up to the top by swapping adjacent levels, then back to the
+        position giving the fewest nodes for roots. A variable stops moving
+        in one direction once the diagram grows past max_growth times the
+        best size. Nodes keep their numbers, so the roots are returned as is.
+        """
+        roots = list(roots)
+        nodes_at = [set() for _ in self.order]
+        for node in range(TRUE + 1, len(self._low)):
+            nodes_at[self._level[node]].add(node)
+        best_size = self.size(roots)
+        last = len(self.order) - 1
+        for _ in range(passes):
+            usage = {name: 0 for name in self.order}
+            for node in self._reachable(roots):
+                usage[self.order[self._level[node]]] += 1
+            start_size = best_size
+            for name in sorted(usage, key=usage.get, reverse=True):
+                level = self._levels[name]
+                best_level = level
+                # Down, then up, then back to the best level seen
+                while level < last:
+                    self._swap(level, nodes_at)
+                    level += 1
+                    size = self.size(roots)
+                    if size < best_size:
+                        best_size, best_level = size, level
+                    elif size > max_growth * best_size:
+                        break
+                while level > 0:
+                    level -= 1
+                    self._swap(level, nodes_at)
+                    size = self.size(roots)
+                    if size < best_size:
+                        best_size, best_level = size, level
+                    elif size > max_growth * best_size:
+                        break
+                while level < best_level:
+                    self._swap(level, nodes_at)
+                    level += 1
+                while level > best_level:
+                    level -= 1
+                    self._swap(level, nodes_at)
+            if best_size >= start_size:
+                break
+        return roots
+
+def equivalent(a: Expr, b: Expr) -> bool:
+    """Check two formulas for equivalence with a throwaway manager"""
+    manager = BDD()
+    return manager.equivalent(a, b)
+
+def first_nonequivalent(formulas: Iterable[Expr]) -> Optional[int]:
+    """
+    Check that a chain of rewrites preserved meaning. All formulas are
+    compiled into one manager, so each check is a node comparison.
+    ---
+    :return: The index of the first formula not equivalent to the one
+             before it, or None if the whole chain is equivalent.
+    """
+    manager = BDD()
+    previous = None
+    for i, formula in enumerate(formulas):
+        node = manager.compile(formula)
+        if previous is not None and node != previous:
+            return i
+        previous = node
+    return None
@@ -0,0 +1,160 @@
+"""
+Non-interactive proof scripts.
+
+A script (.dd file) gives the problem in header lines followed by one
+command per line, as typed in the REPL:
+
+    # comments and blank lines are ignored
+    variables: p, q
+    premises: p -> q, p
+    goal: q
+    apply modus_ponens 1 2
+
+Supported commands are apply, prove and ac on|off. run_scripts fans scripts
+out over a process pool and yields one result dict per script as each one
+finishes.
+"""
+import glob
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from deducto.cli.parser import parse
+from deducto.core.ac import MODULO_AC, modulo_ac
+from deducto.core.expr import Expr
+from deducto.core.proof import ProofState
+
+SCRIPT_SUFFIX = ".dd"
+HEADERS = ("variables", "premises", "goal")
+
+
+class ScriptError(Exception):
+    """A script line that could not be read or did not apply"""
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+
+class Script(NamedTuple):
+    variables: List[str]
+    premises: List[Expr]
+    goal: Optional[Expr]
+    commands: List[Tuple[int, str]]  # (line number, command)
+
+
+def parse_script(text: str) -> Script:
+    """
+    Read a script.
+    ---
+    :raises ScriptError: If a header is repeated or cannot be parsed.
+    """
+    headers = {}
+    commands = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, sep, value = line.partition(":")
+        name = name.strip().lower()
+        if sep and name in HEADERS:
+            if name in headers:
+                raise ScriptError(number, f"Duplicate '{name}' line")
+            headers[name] = (number, value.strip())
+        else:
+            commands.append((number, line))
+
+    def header(name, read):
+        number, value = headers.get(name, (None, ""))
+        try:
+            return read(value)
+        except SyntaxError as e:
+            raise ScriptError(number, f"Invalid {name}: {e}") from None
+
+    return Script(
+        variables=header("variables", lambda v: [x.strip() for x in v.split(",")] if v else []),
+        premises=header("premises", lambda v: [parse(p) for p in v.split(",")] if v else []),
+        goal=header("goal", lambda v: parse(v) if v else None),
+        commands=commands,
+    )
+
+
+def execute_script(script: Script) -> ProofState:
+    """
+    Run the commands of a script and return the resulting proof.
+    ---
+    :raises ScriptError: At the first command that is unknown or fails.
+    """
+    proof = ProofState(script.premises, script.goal)
+    for number, command in script.commands:
+        parts = command.split()
+        name = parts[0].lower()
+        try:
+            if name == "apply" and len(parts) >= 3:
+                proof.apply(parts[1], parts[2:])
+            elif name == "prove" and len(parts) == 1:
+                proof.derive()
+            elif name == "ac" and len(parts) == 2 and parts[1].lower() in ("on", "off"):
+                MODULO_AC.set(parts[1].lower() == "on")
+            else:
+                raise ScriptError(number, f"Unknown command '{command}'")
+        except ValueError as e:
+            raise ScriptError(number, str(e)) from None
+    return proof
+
+
+def run_script(path: str) -> Dict:
+    """Run one script file and describe the outcome as a JSON-ready dict"""
+    start = time.perf_counter()
+    result = {"script": path, "reached": False, "steps": 0, "line": None, "error": None}
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        # An "ac on" in one script must not carry over to the next run by
+        # the same worker
+        with modulo_ac(False):
+            proof = execute_script(parse_script(text))
+            result["reached"] = any(proof.reaches_goal(step.result) for step in proof.steps)
+        result["steps"] = len(proof.steps)
+        if not result["reached"]:
+            result["error"] = "Goal not reached"
+    except ScriptError as e:
+        result["line"] = e.line
+        result["error"] = str(e)
+    except (OSError, UnicodeDecodeError) as e:
+        result["error"] = str(e)
+    except Exception as e:
+        # Anything else is reported against this script, not the whole batch
+        result["error"] = f"{e.__class__.__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def find_scripts(targets: Iterable[str]) -> List[str]:
+    """Expand directories (recursively, to their .dd files) and glob patterns"""
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(sorted(glob.glob(os.path.join(target, "**", "*" + SCRIPT_SUFFIX), recursive=True)))
+        elif glob.has_magic(target):
+            paths.extend(sorted(glob.glob(target, recursive=True)))
+        else:
+            paths.append(target)
+    return paths
+
+
+def run_scripts(paths: List[str], jobs: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Run scripts across a process pool, yielding results in completion order.
+    ---
+    :param paths: The script files.
+    :param jobs: Number of worker processes, one per CPU by default. With a
+                 single job or a single script everything runs in this process.
+    """
+    if jobs == 1 or len(paths) <= 1:
+        yield from map(run_script, paths)
+        return
+    jobs = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (jobs * 8))
+    with Pool(jobs) as pool:
+        yield from pool.imap_unordered(run_script, paths, chunksize)
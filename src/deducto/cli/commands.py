@@ -1,99 +1,139 @@
-from copy import deepcopy
-
-from prompt_toolkit.completion import Completer, WordCompleter, NestedCompleter
-from prompt_toolkit.document import Document
-
-from deducto.core.utils import all_paths, parse_path, resolve_path, set_path
+from deducto.core.ac import MODULO_AC
+from deducto.core.utils import parse_path, resolve_path, set_path
 from deducto.core.proof import ProofStep
+from deducto.core.stats import STATS
+from deducto.core.truthtable import format_assignment
 from deducto.rules.apply import list_rules, get_rule_explanation
-from deducto.export.tex import export_tex
-from deducto.export.txt import export_txt
 from deducto.cli.parser import parse
 
 
-class CommandCompleter(Completer):
-    def __init__(self, proof):
-        self.proof = proof
-        self.rules = list_rules()
-        self.commands = ['apply', 'undo', 'delete', 'reset', 'exit', 'export', 'assume', 'goal', 'help', 'list']
-
-    def get_completions(self, document, complete_event):
-        text = document.text_before_cursor.lstrip()
-        stripped_len = len(document.text_before_cursor) - len(text)
-
-        if " " in text:
-            command = text.split()[0]
-            if command in self.commands:
-                remaining_text = text[len(command):].lstrip()
-                move_cursor = len(text) - len(remaining_text) + stripped_len
-
-                new_document = Document(
-                    remaining_text,
-                    cursor_position=document.cursor_position - move_cursor,
-                )
-
-                if command == 'apply':
-                    parts = remaining_text.split()
-                    if not parts:
-                        # Suggest rules only
-                        completer = WordCompleter(self.rules, ignore_case=True)
-                    else:
-                        rule = parts[0]
-                        if rule in self.rules:
-                            # After rule is entered, suggest step refs and subpaths
-                            step_refs = [str(i + 1) for i in range(len(self.proof.steps))]
-                            subpaths = [
-                                f"{i + 1}.{path}"
-                                for i, step in enumerate(self.proof.steps)
-                                for path in all_paths(step.result)
-                            ]
-                            completer = WordCompleter(step_refs + subpaths, ignore_case=True)
-                        else:
-                            # Suggest rules if the entered rule is incomplete or invalid
-                            completer = WordCompleter(self.rules, ignore_case=True)
-
-                    yield from completer.get_completions(new_document, complete_event)
-
-                elif command == 'delete':
-                    # Suggest step refs for delete and undo commands
-                    step_refs = [str(i + 1) for i in range(len(self.proof.steps))]
-                    completer = WordCompleter(step_refs, ignore_case=True)
-                    yield from completer.get_completions(new_document, complete_event)
-
-                elif command == 'help':
-                    parts = remaining_text.split()
-                    if (
-                        len(parts) == 0 or (len(parts) == 1 and remaining_text[-1] != " ")
-                    ): # the rule is not or not fully entered
-                        completer = WordCompleter(self.rules, ignore_case=True)
-                        yield from completer.get_completions(new_document, complete_event)
-
-        else:
-            # Complete command names
-            completer = WordCompleter(self.commands, ignore_case=True)
-            yield from completer.get_completions(document, complete_event)
-
-
-def undo_last_step(proof, initial_steps):
-    if len(proof.steps) > len(initial_steps):
-        proof.steps.pop()
+def undo_last_step(proof):
+    if proof.undo():
         print("Undone last operation.")
     else:
         print("Nothing to undo.")
 
+def redo_step(proof):
+    if proof.redo():
+        print("Redone last undone operation.")
+    else:
+        print("Nothing to redo.")
+
 def delete_step(proof, n):
-    if n < len(proof.steps):
-        proof.steps.pop(n)
+    removed = proof.delete_step(n)
+    if len(removed) == 1:
         print(f"Deleted step {n + 1}.")
     else:
-        print("Cannot delete original assumptions.")
-
-def reset_proof(proof, initial_steps):
-    proof.steps = deepcopy(initial_steps)
+        print(f"Deleted steps {', '.join(str(i + 1) for i in removed)}.")
+
+def prune_proof(proof):
+    try:
+        removed = proof.prune()
+    except ValueError as e:
+        print(f"✗ Cannot prune: {e}")
+        return
+    if removed:
+        print(f"Pruned {len(removed)} step(s) not needed for the goal.")
+    else:
+        print("Nothing to prune.")
+
+def normalize_step(proof, form, ref):
+    from deducto.normalform import proof_steps
+    if not ref.isdigit() or not 0 < int(ref) <= len(proof.steps):
+        print("✗ Invalid step index.")
+        return
+    n = int(ref) - 1
+    try:
+        steps = proof_steps(proof.steps[n].result, form, n, len(proof.steps))
+    except ValueError as e:
+        print(f"✗ Cannot normalize: {e}")
+        return
+    if not steps:
+        print(f"Step {n + 1} is already in {form.upper()}.")
+        return
+    for step in steps:
+        proof.add_step(step)
+    print(f"✓ {form.upper()} reached in {len(steps)} step(s): {steps[-1].result}")
+
+def simplify_step(proof, ref):
+    from deducto.simplify import proof_steps
+    if not ref.isdigit() or not 0 < int(ref) <= len(proof.steps):
+        print("✗ Invalid step index.")
+        return
+    n = int(ref) - 1
+    steps = proof_steps(proof.steps[n].result, n, len(proof.steps))
+    if not steps:
+        print(f"Step {n + 1} is already simplified.")
+        return
+    for step in steps:
+        proof.add_step(step)
+    print(f"✓ Simplified in {len(steps)} step(s): {steps[-1].result}")
+
+def rewrite_to_goal(proof, ref):
+    from deducto.egraph import proof_steps
+    if proof.goal is None:
+        print("No goal set.")
+        return
+    if not ref.isdigit() or not 0 < int(ref) <= len(proof.steps):
+        print("✗ Invalid step index.")
+        return
+    n = int(ref) - 1
+    try:
+        steps = proof_steps(proof.steps[n].result, proof.goal, n, len(proof.steps))
+    except ValueError as e:
+        print(f"✗ {e}")
+        return
+    if not steps:
+        print(f"Step {n + 1} is already the goal.")
+        return
+    for step in steps:
+        proof.add_step(step)
+    print(f"✓ Step {n + 1} rewritten into the goal in {len(steps)} step(s).")
+
+def reset_proof(proof):
+    proof.reset()
     print("Reset to original assumptions.")
 
+def list_branches(proof):
+    for name in proof.log.branches:
+        marker = "*" if name == proof.log.branch else " "
+        print(f"{marker} {name}")
+
+
+def show_stats(parts):
+    if len(parts) == 1:
+        if STATS.counters:
+            print("\n".join(STATS.table()))
+        else:
+            print("No calls recorded yet.")
+    elif len(parts) == 2 and parts[1] == 'reset':
+        STATS.reset()
+        print("Statistics cleared.")
+    elif len(parts) == 2 and parts[1] in ('on', 'off'):
+        STATS.rules = parts[1] == 'on'
+        print(f"Recording of every rule application is {parts[1]}.")
+    elif len(parts) == 3 and parts[1] == 'json':
+        STATS.dump(parts[2])
+        print(f"✓ Statistics written to {parts[2]}")
+    else:
+        print("Usage: stats [on | off | reset | json <filename>]")
+
+def set_modulo_ac(parts):
+    if len(parts) == 2 and parts[1].lower() in ('on', 'off'):
+        MODULO_AC.set(parts[1].lower() == 'on')
+    elif len(parts) != 1:
+        print("Usage: ac [on|off]")
+        return
+    state = "on" if MODULO_AC.get() else "off"
+    print(f"Matching modulo associativity and commutativity of ∧ and ∨ is {state}.")
+
+
+def execute_command(cmd, proof, exporter=None):
+    name = cmd.split()[0].lower() if cmd.strip() else ""
+    with STATS.timed("command", name):
+        return _execute_command(cmd, proof, exporter)
 
-def execute_command(cmd, proof, initial_steps):
+def _execute_command(cmd, proof, exporter):
     parts = cmd.split()
     if cmd.lower() == 'exit':
         return True
@@ -108,14 +148,28 @@ def execute_command(cmd, proof, initial_steps):
         if len(parts) == 1:
             print("Commands:")
             print("  apply <rule> <target> - Apply a rule to the specified targets.")
+            print("  prove [seconds] - Search for a proof of the goal.")
+            print("  check - Check whether the goal follows from the assumptions.")
             print("  goal <goal> - Set the goal expression.")
             print("  assume <premise> - Add an assumption.")
             print("  list - List available rules.")
+            print("  stats [on | off | reset | json <filename>] - Show, clear or save call counts and timings; on/off records every rule application.")
+            print("  suggest - Suggest rules that apply to the current steps.")
+            print("  normalize <nnf|cnf|dnf> <n> - Rewrite step n into a normal form, one rule per step.")
+            print("  simplify <n> - Simplify step n with the reducing equivalence rules, one rule per step.")
+            print("  equiv <n> - Rewrite step n into the goal with equivalence rules, if they can.")
             print("  exact - Check if the goal is reached.")
+            print("  ac [on|off] - Show or set whether goals and premises match up to the order and grouping of ∧ and ∨.")
             print("  undo - Undo the last step.")
-            print("  delete <n> - Delete step n.")
+            print("  redo - Redo the last undone step.")
+            print("  checkpoint <name> - Save the current steps under a name.")
+            print("  restore <name> - Return to a saved checkpoint.")
+            print("  branch [name] - Start a new branch of the proof, or list branches.")
+            print("  switch <name> - Switch to another branch.")
+            print("  delete <n> - Delete step n and the steps that depend on it.")
+            print("  prune - Delete the steps the goal does not depend on.")
             print("  reset - Reset to original assumptions.")
-            print("  export <format> <filename> - Export proof to specified format.")
+            print("  export <format> <filename> [all] - Export proof to specified format (all: every branch, tex only).")
             print("  exit - Exit the session.")
             print("  help - Show this help message.")
             print("  help <rule> - Get help about a rule.")
@@ -126,8 +180,53 @@ def execute_command(cmd, proof, initial_steps):
             print("Usage: help or help <rule>")
         return False
 
+    if parts[0].lower() == 'stats':
+        show_stats(parts)
+        return False
+
+    if parts[0].lower() == 'ac':
+        set_modulo_ac(parts)
+        return False
+
     if cmd.lower() == 'undo':
-        undo_last_step(proof, initial_steps)
+        undo_last_step(proof)
+        return False
+
+    if cmd.lower() == 'redo':
+        redo_step(proof)
+        return False
+
+    if parts[0].lower() in ('checkpoint', 'restore', 'switch'):
+        if len(parts) != 2:
+            print(f"Usage: {parts[0].lower()} <name>")
+            return False
+        name = parts[1]
+        if parts[0].lower() == 'checkpoint':
+            proof.checkpoint(name)
+            print(f"✓ Checkpoint '{name}' saved.")
+            return False
+        try:
+            if parts[0].lower() == 'restore':
+                proof.restore(name)
+                print(f"✓ Restored checkpoint '{name}'.")
+            else:
+                proof.switch(name)
+                print(f"✓ Switched to branch '{name}'.")
+        except ValueError as e:
+            print(f"✗ {e}")
+        return False
+
+    if parts[0].lower() == 'branch':
+        if len(parts) == 1:
+            list_branches(proof)
+        elif len(parts) == 2:
+            try:
+                proof.branch(parts[1])
+                print(f"✓ Started branch '{parts[1]}'.")
+            except ValueError as e:
+                print(f"✗ {e}")
+        else:
+            print("Usage: branch [name]")
         return False
 
     if cmd.lower().startswith('delete '):
@@ -138,20 +237,36 @@ def execute_command(cmd, proof, initial_steps):
             print(f"Invalid delete command: {e}")
         return False
 
+    if cmd.lower() == 'prune':
+        prune_proof(proof)
+        return False
+
     if cmd.lower() == 'reset':
-        reset_proof(proof, initial_steps)
+        reset_proof(proof)
         return False
 
     if cmd.lower().startswith('export '):
-        if len(parts) != 3:
-            print("Usage: export <format> <filename>")
+        if len(parts) not in (3, 4) or (len(parts) == 4 and parts[3] != 'all'):
+            print("Usage: export <format> <filename> [all]")
             return False
         fmt = parts[1]
         filename = parts[2]
         if fmt == "tex":
-            export_tex(proof, filename)
-            print(f"✓ Exported to {filename}.tex and {filename}.pdf")
+            if len(parts) == 4:
+                # Every branch as its own proof, in one document
+                titles = list(proof.log.branches)
+                proofs = [proof.branch_proof(name) for name in titles]
+            else:
+                titles, proofs = None, [proof]
+            if exporter is not None:
+                exporter.submit(proofs, filename, titles)
+                print(f"Compiling {filename}.pdf in the background.")
+            else:
+                from deducto.export.tex import export_tex_batch
+                cached = export_tex_batch(proofs, filename, titles)
+                print(f"✓ Exported to {filename}.tex and {filename}.pdf{' (cached)' if cached else ''}")
         elif fmt == "txt":
+            from deducto.export.txt import export_txt
             export_txt(proof, filename)
         else:
             print("Unknown format. Supported formats: tex, txt")
@@ -180,17 +295,33 @@ def execute_command(cmd, proof, initial_steps):
         try:
             expr = parse(assumption_str)
             proof.assumptions.append(expr)
-            proof.steps.append(ProofStep(expr, "assumption", []))
+            proof.add_step(ProofStep(expr, "assumption", []))
             print(f"✓ Assumption added: {expr}")
         except Exception as e:
             print(f"✗ Failed to parse assumption: {e}")
         return False
 
+    if cmd.lower() == 'suggest':
+        proof.list_applicable()
+        return False
+
+    if cmd.lower() == 'check':
+        try:
+            valid, counterexample = proof.check()
+        except ValueError as e:
+            print(f"✗ Cannot check: {e}")
+            return False
+        if valid:
+            print("✓ Valid: the goal follows from the assumptions.")
+        else:
+            print(f"✗ Invalid. Counterexample: {format_assignment(counterexample)}")
+        return False
+
     if cmd.lower() == 'exact':
         if proof.goal is None:
             print("No goal set.")
             return False
-        if proof.steps[-1].result == proof.goal:
+        if proof.reaches_goal(proof.steps[-1].result):
             print("✓ Goal reached!")
             return True
         else:
@@ -207,10 +338,41 @@ def execute_command(cmd, proof, initial_steps):
 
         proof.try_rule(rule, targets)
 
+    elif parts[0].lower() == 'normalize':
+        if len(parts) != 3:
+            print("Usage: normalize <nnf|cnf|dnf> <n>")
+            return False
+        normalize_step(proof, parts[1].lower(), parts[2])
+
+    elif parts[0].lower() == 'simplify':
+        if len(parts) != 2:
+            print("Usage: simplify <n>")
+            return False
+        simplify_step(proof, parts[1])
+
+    elif parts[0].lower() == 'equiv':
+        if len(parts) != 2:
+            print("Usage: equiv <n>")
+            return False
+        rewrite_to_goal(proof, parts[1])
+
+    elif parts[0].lower() == 'prove':
+        if len(parts) > 2:
+            print("Usage: prove [seconds]")
+            return False
+        limits = {}
+        if len(parts) == 2:
+            try:
+                limits['timeout'] = float(parts[1])
+            except ValueError:
+                print("Usage: prove [seconds]")
+                return False
+        proof.prove(**limits)
+
     else:
         raise ValueError(f"Unknown command '{cmd}'")
 
-    if proof.goal and proof.steps[-1].result == proof.goal:
+    if proof.reaches_goal(proof.steps[-1].result):
         return True
 
     return False
@@ -0,0 +1,104 @@
+from prompt_toolkit.completion import Completer, Completion, WordCompleter
+from prompt_toolkit.document import Document
+
+from deducto.cli.trie import PrefixTrie
+from deducto.rules.apply import RULES, list_rules
+
+
+class CommandCompleter(Completer):
+    def __init__(self, proof):
+        self.proof = proof
+        self.rules = list_rules()
+        self.targets = PrefixTrie()  # step refs and subpaths
+        self._indexed = 0  # steps already in self.targets
+        self._revision = proof.revision
+        self.commands = ['apply', 'prove', 'check', 'suggest', 'normalize', 'simplify', 'equiv', 'undo', 'redo', 'checkpoint', 'restore', 'branch', 'switch', 'delete', 'prune', 'reset', 'exit', 'export', 'assume', 'goal', 'help', 'list', 'stats', 'ac']
+
+    def step_targets(self):
+        """
+        Return the trie of step refs and subpaths, adding steps appended since
+        the last call and starting over if steps were removed or replaced.
+        """
+        proof = self.proof
+        if proof.revision != self._revision:
+            self.targets.clear()
+            self._indexed = 0
+            self._revision = proof.revision
+        for i in range(self._indexed, len(proof.steps)):
+            ref = str(i + 1)
+            self.targets.add(ref)
+            for path in proof.steps[i].paths:
+                self.targets.add(f"{ref}.{path}")
+        self._indexed = len(proof.steps)
+        return self.targets
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor.lstrip()
+        stripped_len = len(document.text_before_cursor) - len(text)
+
+        if " " in text:
+            command = text.split()[0]
+            if command in self.commands:
+                remaining_text = text[len(command):].lstrip()
+                move_cursor = len(text) - len(remaining_text) + stripped_len
+
+                new_document = Document(
+                    remaining_text,
+                    cursor_position=document.cursor_position - move_cursor,
+                )
+
+                if command == 'apply':
+                    parts = remaining_text.split()
+                    if not parts:
+                        # Suggest rules only
+                        completer = WordCompleter(self.rules, ignore_case=True)
+                    else:
+                        rule = parts[0]
+                        if rule in RULES:
+                            # After rule is entered, suggest step refs and subpaths
+                            target = remaining_text.split(" ")[-1].lower()
+                            for match in self.step_targets().complete(target):
+                                yield Completion(match, start_position=-len(target))
+                            return
+                        else:
+                            # Suggest rules if the entered rule is incomplete or invalid
+                            completer = WordCompleter(self.rules, ignore_case=True)
+
+                    yield from completer.get_completions(new_document, complete_event)
+
+                elif command in ('delete', 'simplify', 'equiv'):
+                    # Suggest step refs
+                    step_refs = [str(i + 1) for i in range(len(self.proof.steps))]
+                    completer = WordCompleter(step_refs, ignore_case=True)
+                    yield from completer.get_completions(new_document, complete_event)
+
+                elif command == 'normalize':
+                    parts = remaining_text.split()
+                    if len(parts) == 0 or (len(parts) == 1 and remaining_text[-1] != " "):
+                        completer = WordCompleter(['nnf', 'cnf', 'dnf'], ignore_case=True)
+                    else:
+                        completer = WordCompleter([str(i + 1) for i in range(len(self.proof.steps))])
+                    yield from completer.get_completions(new_document, complete_event)
+
+                elif command == 'ac':
+                    completer = WordCompleter(['on', 'off'], ignore_case=True)
+                    yield from completer.get_completions(new_document, complete_event)
+
+                elif command in ('restore', 'switch'):
+                    log = self.proof.log
+                    names = log.checkpoints if command == 'restore' else log.branches
+                    completer = WordCompleter(list(names), ignore_case=True)
+                    yield from completer.get_completions(new_document, complete_event)
+
+                elif command == 'help':
+                    parts = remaining_text.split()
+                    if (
+                        len(parts) == 0 or (len(parts) == 1 and remaining_text[-1] != " ")
+                    ): # the rule is not or not fully entered
+                        completer = WordCompleter(self.rules, ignore_case=True)
+                        yield from completer.get_completions(new_document, complete_event)
+
+        else:
+            # Complete command names
+            completer = WordCompleter(self.commands, ignore_case=True)
+            yield from completer.get_completions(document, complete_event)
@@ -1,4 +1,6 @@
 import re
+from functools import lru_cache
+
 from deducto.core.expr import *
 
 TOKEN_SPEC = [
@@ -16,122 +18,133 @@ TOKEN_SPEC = [
     (r'[A-Za-z_][A-Za-z0-9_]*', 'VAR'),
 ]
 
+# Compiled once; the alternatives are tried in TOKEN_SPEC order and the
+# matching one is reported through lastgroup.
+TOKEN_REGEX = re.compile('|'.join(
+    f'(?P<{type_ or "SKIP"}>{pattern})' for pattern, type_ in TOKEN_SPEC
+))
+
 class Token:
-    def __init__(self, type_, value):
+    __slots__ = ('type', 'value', 'pos')
+
+    def __init__(self, type_, value, pos=None):
         self.type = type_
         self.value = value
+        self.pos = pos
     def __repr__(self):
         return f'Token({self.type}, {self.value})'
 
 def tokenize(text):
-    regex_parts = [f'({pattern})' for pattern, _ in TOKEN_SPEC]
-    regex = '|'.join(regex_parts)
-    types = [type_ for _, type_ in TOKEN_SPEC]
-
+    """
+    Yield the tokens of text along with their source positions.
+    Matching is anchored at each position in the original string, so the
+    whole input is scanned once without slicing it.
+    """
+    match = TOKEN_REGEX.match
     pos = 0
-    while pos < len(text):
-        match = re.match(regex, text[pos:])
-        if not match:
+    end = len(text)
+    while pos < end:
+        m = match(text, pos)
+        if m is None:
             raise SyntaxError(f"Invalid token at position {pos}: '{text[pos]}'")
-
-        for i, type_ in enumerate(types):
-            value = match.group(i + 1)
-            if value is not None:
-                if type_ is not None:  # Skip whitespace
-                    yield Token(type_, value)
-                break
-
-        pos += len(match.group(0))
+        type_ = m.lastgroup
+        if type_ != 'SKIP':
+            yield Token(type_, m.group(), pos)
+        pos = m.end()
+
+# Binding power and node class of each infix operator, all left-associative.
+# NOT binds tighter than any of them.
+BINARY_OPERATORS = {
+    'IFF': (1, Iff),
+    'IMPLIES': (2, Implies),
+    'XOR': (3, Xor),
+    'OR': (4, Or),
+    'AND': (5, And),
+}
+
+CONSTANTS = {
+    'TRUE': TrueExpr,
+    'FALSE': FalseExpr,
+}
+
+PARSE_CACHE_SIZE = 1024
 
 class Parser:
+    """
+    Table-driven precedence-climbing parser.
+    Pending operators and open brackets live on an explicit stack instead of
+    the call stack, so nesting depth is not bounded by the recursion limit.
+    """
     def __init__(self, tokens):
-        self.tokens = list(tokens)
-        self.pos = 0
-
-    def peek(self):
-        # Check the next token without advancing
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
-
-    def advance(self):
-        self.pos += 1
-
-    def expect(self, type_):
-        # Check the next token and advance if it matches the expected type
-        # Made for bracket matching
-        token = self.peek()
-        if token and token.type == type_:
-            self.advance()
-            return token
-        raise SyntaxError(f"Expected {type_} but got {token}")
+        self.tokens = tokens
 
     def parse(self):
-        # Start parsing from the top-level expression
-        return self.parse_iff()
-
-    def parse_iff(self):
-        node = self.parse_implies()
-        while self.peek() and self.peek().type == 'IFF':
-            self.advance()
-            node = Iff(node, self.parse_implies())
-        return node
-
-    def parse_implies(self):
-        node = self.parse_xor()
-        while self.peek() and self.peek().type == 'IMPLIES':
-            self.advance()
-            node = Implies(node, self.parse_xor())
-        return node
-
-    def parse_xor(self):
-        node = self.parse_or()
-        while self.peek() and self.peek().type == 'XOR':
-            self.advance()
-            node = Xor(node, self.parse_or())
-        return node
-
-    def parse_or(self):
-        node = self.parse_and()
-        while self.peek() and self.peek().type == 'OR':
-            self.advance()
-            node = Or(node, self.parse_and())
-        return node
-
-    def parse_and(self):
-        node = self.parse_not()
-        while self.peek() and self.peek().type == 'AND':
-            self.advance()
-            node = And(node, self.parse_not())
-        return node
-
-    def parse_not(self):
-        if self.peek() and self.peek().type == 'NOT':
-            self.advance()
-            return Not(self.parse_not())
-        return self.parse_atom()
-
-    def parse_atom(self):
-        token = self.peek()
-        if token is None:
+        operands = []
+        operators = []  # pending NOT, LPAREN and binary operator tokens
+        expect_operand = True
+
+        for token in self.tokens:
+            type_ = token.type
+            if expect_operand:
+                if type_ == 'NOT' or type_ == 'LPAREN':
+                    operators.append(token)
+                    continue
+                if type_ == 'VAR':
+                    operands.append(Var(token.value))
+                elif type_ in CONSTANTS:
+                    operands.append(CONSTANTS[type_]())
+                else:
+                    raise SyntaxError(f"Unexpected token {token} at position {token.pos}")
+                expect_operand = False
+            elif type_ in BINARY_OPERATORS:
+                self.reduce(operands, operators, BINARY_OPERATORS[type_][0])
+                operators.append(token)
+                expect_operand = True
+            elif type_ == 'RPAREN':
+                self.reduce(operands, operators, 0)
+                if not operators:
+                    raise SyntaxError(f"Unmatched RPAREN at position {token.pos}")
+                operators.pop()
+            else:
+                raise SyntaxError(f"Unexpected token {token} at position {token.pos}")
+
+        if expect_operand:
             raise SyntaxError("Unexpected end of input")
-        if token.type == 'VAR':
-            self.advance()
-            return Var(token.value)
-        if token.type == 'LPAREN':
-            self.advance()
-            expr = self.parse()
-            self.expect('RPAREN')
-            return expr
-        # Handle True and False literals
-        if token.type == 'TRUE':
-            self.advance()
-            return TrueExpr()
-        if token.type == 'FALSE':
-            self.advance()
-            return FalseExpr()
-        raise SyntaxError(f"Unexpected token: {token}")
+        self.reduce(operands, operators, 0)
+        if operators:
+            raise SyntaxError("Expected RPAREN but got None")
+        return operands[0]
+
+    @staticmethod
+    def reduce(operands, operators, min_precedence):
+        # Fold the pending operators that bind at least as tightly as
+        # min_precedence, stopping at the innermost open bracket
+        while operators:
+            type_ = operators[-1].type
+            if type_ == 'NOT':
+                operators.pop()
+                operands[-1] = Not(operands[-1])
+            elif type_ == 'LPAREN':
+                return
+            else:
+                precedence, node = BINARY_OPERATORS[type_]
+                if precedence < min_precedence:
+                    return
+                operators.pop()
+                right = operands.pop()
+                operands[-1] = node(operands[-1], right)
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text: str) -> Expr:
+    return Parser(tokenize(text)).parse()
 
 def parse(text: str) -> Expr:
-    return Parser(tokenize(text)).parse()
+    """
+    Parse text into an Expr.
+    Results are cached on the whitespace-normalized text; Expr nodes are
+    immutable, so the cached tree is handed out as is.
+    """
+    return _parse_normalized(' '.join(text.split()))
 
 if __name__ == '__main__':
     print(parse(input("Enter a logical expression: ")))
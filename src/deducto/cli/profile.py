@@ -0,0 +1,78 @@
+"""
+Whole-run profiling for the --profile flag.
+
+Two outputs are supported: cProfile statistics (open them with pstats or
+snakeviz), and collapsed stacks ("frame;frame;frame count" lines) for
+flamegraph.pl or speedscope, collected by sampling the main thread.
+"""
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.001
+
+COLLAPSED_SUFFIXES = (".folded", ".collapsed", ".txt")
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread"""
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, filepath: str):
+        with open(filepath, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiled(filepath: str, collapsed: bool = None):
+    """
+    Profile the block into filepath. Collapsed stacks are written when
+    collapsed is true, or when it is None and the file name ends in
+    .folded, .collapsed or .txt; cProfile statistics otherwise.
+    """
+    if collapsed is None:
+        collapsed = filepath.endswith(COLLAPSED_SUFFIXES)
+    if collapsed:
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write(filepath)
+    else:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(filepath)
@@ -0,0 +1,430 @@
+"""
+JSON-RPC server for embedding deducto in other services.
+
+`deducto serve` listens on a local TCP port or a Unix socket. Every line a
+client sends is one JSON-RPC 2.0 request, and every response is written back
+as one line. Requests on one connection are handled concurrently, so
+responses may arrive out of order; match them by id. Parameters are passed
+by name:
+
+    parse {formula}                     -> {formula}
+    apply_rule {rule, premises, ac}     -> {result}
+    open {assumptions, goal, ac}        -> {session, steps, goal, reached}
+    steps {session}                     -> {steps, goal, reached}
+    try_rule {session, rule, targets}   -> {ok, message, steps, reached}
+    check {session}                     -> {valid, counterexample}
+    prove {session, timeout}            -> {ok, message, steps, reached}
+    close {session}                     -> {}
+
+Formulas are sent in the REPL's syntax and returned as rendered. Steps are
+{"n", "formula", "rule", "premises"} objects numbered from 1, and try_rule
+and prove return only the steps they added. ac makes the session compare
+goals and premises modulo AC (see deducto.core.ac).
+
+Sessions are proofs kept by the server under an id, so a learner can
+reconnect and carry on. Requests on one session run one at a time. check and
+prove run in a process pool, so a long search does not hold up anybody else;
+the other methods are cheap and run on the event loop. A session refuses new
+steps once its formulas hold MAX_SESSION_NODES distinct nodes, counted per
+formula, and is not opened with assumptions holding more. Sessions idle for
+IDLE_TIMEOUT seconds are closed.
+"""
+import asyncio
+import contextlib
+import functools
+import json
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+from deducto.cli.parser import parse
+from deducto.core.ac import modulo_ac
+from deducto.core.expr import Expr
+from deducto.core.proof import ProofState, ProofStep
+from deducto.core.search import ProofSearch
+from deducto.core.truthtable import format_assignment
+from deducto.core.utils import postorder
+from deducto.rules.apply import apply_rule
+from deducto.solver import entails
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_SESSIONS = 1000
+MAX_SESSION_NODES = 100_000  # formula nodes over all steps of a session
+IDLE_TIMEOUT = 1800.0        # seconds
+MAX_PROVE_TIMEOUT = 10.0     # seconds a prove request may ask for
+MAX_REQUEST_BYTES = 1 << 20
+
+# JSON-RPC 2.0 error codes, then this server's own
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNKNOWN_SESSION = -32001
+LIMIT_REACHED = -32002
+RULE_ERROR = -32003
+
+_REQUIRED = object()
+
+# formula -> number of distinct nodes in it, for as long as it is alive
+_sizes = WeakKeyDictionary()
+
+
+class RPCError(Exception):
+    """A request that cannot be answered, sent back as a JSON-RPC error"""
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class Session:
+    """A proof kept by the server, used by one request at a time"""
+    def __init__(self, proof: ProofState, ac: bool = False):
+        self.id = secrets.token_urlsafe(12)
+        self.proof = proof
+        self.ac = ac
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    def size(self) -> int:
+        """The number of formula nodes held by the steps"""
+        return sum(_size(step.result) for step in self.proof.steps)
+
+
+class SessionPool:
+    """
+    Open sessions, least recently used first.
+    ---
+    :param max_sessions: Maximum number of open sessions.
+    :param idle_timeout: Seconds after which an unused session is closed.
+    :param max_nodes: Formula nodes after which a session takes no new steps.
+    """
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = IDLE_TIMEOUT,
+                 max_nodes: int = MAX_SESSION_NODES):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_nodes = max_nodes
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def open(self, proof: ProofState, ac: bool = False) -> Session:
+        """
+        :raises RPCError: If the pool is full even after closing idle sessions.
+        """
+        if len(self._sessions) >= self.max_sessions:
+            self.evict_idle()
+        if len(self._sessions) >= self.max_sessions:
+            raise RPCError(LIMIT_REACHED, f"Too many open sessions ({self.max_sessions})")
+        session = Session(proof, ac)
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id) -> Session:
+        """
+        :raises RPCError: If there is no such session.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise RPCError(UNKNOWN_SESSION, f"No session '{session_id}'")
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def close(self, session_id) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def check_size(self, session: Session):
+        """
+        :raises RPCError: If the session holds max_nodes formula nodes or more.
+        """
+        if session.size() >= self.max_nodes:
+            raise RPCError(LIMIT_REACHED, f"Session is over its limit of {self.max_nodes} formula nodes")
+
+    def evict_idle(self, now: float = None) -> List[str]:
+        """
+        Close the sessions unused for idle_timeout seconds, except those
+        handling a request.
+        ---
+        :return: The ids of the closed sessions.
+        """
+        now = time.monotonic() if now is None else now
+        evicted = []
+        for session_id, session in self._sessions.items():
+            if now - session.last_used < self.idle_timeout:
+                break  # the rest were used more recently
+            if not session.lock.locked():
+                evicted.append(session_id)
+        for session_id in evicted:
+            del self._sessions[session_id]
+        return evicted
+
+
+def _size(formula: Expr) -> int:
+    """The number of distinct nodes in formula"""
+    size = _sizes.get(formula)
+    if size is None:
+        size = _sizes[formula] = sum(1 for _ in postorder(formula))
+    return size
+
+def _search(premises: List[Expr], goal: Expr, timeout: float):
+    """Run a proof search in a worker process"""
+    search = ProofSearch(premises, goal, timeout=timeout)
+    found = search.run()
+    return found, search.reason, search.counterexample, search.expanded, search.elapsed
+
+def _step(proof: ProofState, n: int) -> Dict:
+    step = proof.steps[n]
+    return {"n": n + 1, "formula": str(step.result), "rule": step.rule,
+            "premises": [i + 1 for i in step.premises]}
+
+def _param(params: Dict, name: str, kind, default=_REQUIRED):
+    value = params.get(name, default)
+    if value is _REQUIRED:
+        raise RPCError(INVALID_PARAMS, f"Missing parameter '{name}'")
+    if value is not default and not isinstance(value, kind):
+        raise RPCError(INVALID_PARAMS, f"Invalid parameter '{name}'")
+    return value
+
+def _formula(text) -> Expr:
+    if not isinstance(text, str):
+        raise RPCError(INVALID_PARAMS, "Formulas must be strings")
+    try:
+        return parse(text)
+    except SyntaxError as e:
+        raise RPCError(INVALID_PARAMS, f"Invalid formula '{text}': {e}") from None
+
+def _error(request_id, code: int, message: str) -> Dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class Server:
+    """
+    Answers JSON-RPC requests against a pool of proof sessions.
+    ---
+    :param jobs: Number of worker processes for check and prove, one per CPU
+                 by default.
+    :param limits: Passed on to SessionPool.
+    """
+    def __init__(self, jobs: Optional[int] = None, **limits):
+        self.sessions = SessionPool(**limits)
+        self.executor = ProcessPoolExecutor(jobs)
+        self.methods = {
+            "parse": self.parse,
+            "apply_rule": self.apply_rule,
+            "open": self.open,
+            "steps": self.steps,
+            "try_rule": self.try_rule,
+            "check": self.check,
+            "prove": self.prove,
+            "close": self.close,
+        }
+        self._server = None
+        self._sweeper = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    socket_path: str = None) -> asyncio.AbstractServer:
+        """Listen on socket_path if given, else on host and port"""
+        if socket_path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._connection, socket_path, limit=MAX_REQUEST_BYTES)
+        else:
+            self._server = await asyncio.start_server(
+                self._connection, host, port, limit=MAX_REQUEST_BYTES)
+        self._sweeper = asyncio.create_task(self._sweep())
+        return self._server
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Waiting for the workers to finish would block the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.executor.shutdown, cancel_futures=True))
+
+    async def _sweep(self):
+        interval = max(1.0, self.sessions.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.sessions.evict_idle()
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(response):
+            async with lock:
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+
+        async def answer(line):
+            response = await self.handle(line)
+            if response is not None:
+                await send(response)
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than MAX_REQUEST_BYTES: the stream cannot be resynchronised
+                    await send(_error(None, INVALID_REQUEST, "Request too long"))
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def handle(self, line: bytes) -> Optional[Dict]:
+        """
+        Answer one request line.
+        ---
+        :return: The response, or None for a notification.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "Parse error")
+        if (not isinstance(request, dict) or request.get("jsonrpc") != "2.0"
+                or not isinstance(request.get("method"), str)):
+            request_id = request.get("id") if isinstance(request, dict) else None
+            return _error(request_id, INVALID_REQUEST, "Invalid request")
+        request_id = request.get("id")
+        try:
+            method = self.methods.get(request["method"])
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method '{request['method']}' not found")
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "Parameters must be passed by name")
+            result = await method(params)
+        except RPCError as e:
+            response = _error(request_id, e.code, str(e))
+        except Exception as e:
+            response = _error(request_id, INTERNAL_ERROR, f"{e.__class__.__name__}: {e}")
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return response if "id" in request else None
+
+    def _state(self, session: Session, first: int = 0) -> Dict:
+        proof = session.proof
+        with modulo_ac(session.ac):
+            reached = proof.reaches_goal(proof.steps[-1].result) if proof.steps else False
+        return {"steps": [_step(proof, n) for n in range(first, len(proof.steps))], "reached": reached}
+
+    async def parse(self, params):
+        return {"formula": str(_formula(_param(params, "formula", str)))}
+
+    async def apply_rule(self, params):
+        rule = _param(params, "rule", str)
+        premises = [_formula(p) for p in _param(params, "premises", list)]
+        try:
+            with modulo_ac(_param(params, "ac", bool, False)):
+                result = apply_rule(rule, premises)
+        except (TypeError, ValueError) as e:
+            raise RPCError(RULE_ERROR, str(e)) from None
+        if result is None:
+            raise RPCError(RULE_ERROR, f"Rule '{rule}' not applicable to given premises")
+        return {"result": str(result)}
+
+    async def open(self, params):
+        assumptions = [_formula(a) for a in _param(params, "assumptions", list, [])]
+        goal = _param(params, "goal", str, None)
+        goal = None if goal is None else _formula(goal)
+        # Checked before ProofState builds its steps and index
+        if sum(_size(formula) for formula in assumptions) > self.sessions.max_nodes:
+            raise RPCError(LIMIT_REACHED, f"Assumptions are over the limit of {self.sessions.max_nodes} formula nodes")
+        session = self.sessions.open(ProofState(assumptions, goal), _param(params, "ac", bool, False))
+        return {"session": session.id, "goal": None if goal is None else str(goal), **self._state(session)}
+
+    async def steps(self, params):
+        session = self.sessions.get(_param(params, "session", str))
+        goal = session.proof.goal
+        return {"goal": None if goal is None else str(goal), **self._state(session)}
+
+    async def try_rule(self, params):
+        session = self.sessions.get(_param(params, "session", str))
+        rule = _param(params, "rule", str)
+        targets = _param(params, "targets", list)
+        if not all(isinstance(target, (str, int)) for target in targets):
+            raise RPCError(INVALID_PARAMS, "Targets must be step numbers or paths such as '2.left'")
+        async with session.lock:
+            self.sessions.check_size(session)
+            proof = session.proof
+            first = len(proof.steps)
+            try:
+                with modulo_ac(session.ac):
+                    proof.apply(rule, [str(target) for target in targets])
+            except ValueError as e:
+                return {"ok": False, "message": str(e), **self._state(session, first)}
+            return {"ok": True, "message": None, **self._state(session, first)}
+
+    async def check(self, params):
+        session = self.sessions.get(_param(params, "session", str))
+        proof = session.proof
+        if proof.goal is None:
+            raise RPCError(INVALID_PARAMS, "No goal set")
+        loop = asyncio.get_running_loop()
+        valid, counterexample = await loop.run_in_executor(
+            self.executor, entails, proof.assumptions, proof.goal)
+        return {"valid": valid, "counterexample": counterexample}
+
+    async def prove(self, params):
+        session = self.sessions.get(_param(params, "session", str))
+        timeout = _param(params, "timeout", (int, float), MAX_PROVE_TIMEOUT)
+        timeout = min(max(timeout, 0), MAX_PROVE_TIMEOUT)
+        proof = session.proof
+        if proof.goal is None:
+            raise RPCError(INVALID_PARAMS, "No goal set")
+        async with session.lock:
+            self.sessions.check_size(session)
+            first = len(proof.steps)
+            loop = asyncio.get_running_loop()
+            found, reason, counterexample, expanded, elapsed = await loop.run_in_executor(
+                self.executor, _search, [step.result for step in proof.steps], proof.goal, timeout)
+            if found is None:
+                if counterexample is not None:
+                    message = f"The goal does not follow from the assumptions: {format_assignment(counterexample)}"
+                else:
+                    message = f"No proof found ({reason} after {expanded} nodes, {elapsed:.2f}s)"
+                return {"ok": False, "message": message, **self._state(session, first)}
+            for result, rule, premises in found:
+                proof.add_step(ProofStep(result, rule, premises))
+            return {"ok": True, "message": None, **self._state(session, first)}
+
+    async def close(self, params):
+        if not self.sessions.close(_param(params, "session", str)):
+            raise RPCError(UNKNOWN_SESSION, f"No session '{params['session']}'")
+        return {}
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: str = None,
+                jobs: Optional[int] = None, **limits):
+    """Serve until cancelled"""
+    server = Server(jobs, **limits)
+    listener = await server.start(host, port, socket_path)
+    where = socket_path or ", ".join(str(s.getsockname()) for s in listener.sockets)
+    print(f"Serving on {where}", file=sys.stderr, flush=True)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.stop()
@@ -1,12 +1,11 @@
-from copy import deepcopy
-
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import WordCompleter
 
-from deducto.cli.commands import execute_command, CommandCompleter
+from deducto.cli.commands import execute_command
+from deducto.cli.completion import CommandCompleter
 from deducto.core.utils import get_goal, get_premises, get_variables
 from deducto.core.proof import ProofState
-from deducto.export.tex import export_tex
+from deducto.export.background import TexExporter
 
 
 def clear_line():
@@ -43,12 +42,12 @@ def run_proof_session():
         print("No goal provided")
 
     proof = ProofState(premises, goal)
-    initial_steps = deepcopy(proof.steps)
 
+    exporter = TexExporter()
     completer = CommandCompleter(proof)
     session = PromptSession(completer=completer)
 
-    print("Commands: apply <rule> <targets>, undo, delete <n>, reset, exit")
+    print("Commands: apply <rule> <targets>, prove, undo, delete <n>, reset, exit")
     print("For help about the commands, enter: help")
     print("For help about a rule, enter: help <rule>")
 
@@ -56,13 +55,14 @@ def run_proof_session():
         try:
             cmd = ""
             while cmd == "":
+                for message in exporter.finished():
+                    print(message)
                 cmd = session.prompt(">>> ").strip()
-            if execute_command(cmd, proof, initial_steps):
+            if execute_command(cmd, proof, exporter):
                 export = input("Export to LaTeX? (y/n): ").lower()
                 if export == 'y':
                     filepath = input("Enter output path prefix (no extension): ").strip()
-                    export_tex(proof, filepath)
-                    print(f"✓ Exported to {filepath}.tex and {filepath}.pdf")
+                    exporter.submit([proof], filepath)
                 else:
                     print("Export skipped.")
                 break
@@ -72,3 +72,6 @@ def run_proof_session():
                 break
         except Exception as e:
             print(f"Invalid: {e}")
+
+    for message in exporter.close():
+        print(message)
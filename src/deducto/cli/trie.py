@@ -0,0 +1,58 @@
+"""
+Prefix trie for tab completion.
+
+Looking up a prefix walks one node per character, then yields the words below
+it, so the cost depends on the prefix and the number of matches rather than on
+how many words are stored.
+"""
+from typing import Iterable, Iterator
+
+# Key under which a node stores the word ending there
+_END = None
+
+
+class PrefixTrie:
+    def __init__(self, words: Iterable[str] = ()):
+        self._root = {}
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, word: str):
+        node = self._find(word)
+        return node is not None and _END in node
+
+    def add(self, word: str):
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = word
+            self._size += 1
+
+    def clear(self):
+        self._root = {}
+        self._size = 0
+
+    def _find(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str) -> Iterator[str]:
+        """Yield the stored words starting with prefix, each before its extensions"""
+        node = self._find(prefix)
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if _END in node:
+                yield node[_END]
+            stack.extend(child for char, child in reversed(node.items()) if char is not _END)
@@ -0,0 +1,193 @@
+"""
+Streaming verification of proof corpora.
+
+Proofs are read as JSON lines:
+
+    {"id": "hw1-3", "assumptions": ["p -> q", "p"], "goal": "q",
+     "steps": [{"rule": "modus_ponens", "premises": [1, 2], "result": "q"}]}
+
+Premises are step numbers counted from 1, assumptions first, as in the REPL.
+A step with a "path" applies an equivalence rule at that subpath of its single
+premise ("left.right"). "result" is optional; when given it must be what the
+rule produces. The last step must be the goal.
+
+Files are read lazily in batches that are verified by worker processes, with
+only a bounded number of batches in flight at any time.
+"""
+import json
+import os
+import time
+from collections import deque
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# The parser, the rules and multiprocessing are imported when proofs are
+# verified, so that `deducto verify` starts quickly
+
+BATCH_SIZE = 256        # proofs per task sent to a worker
+BATCHES_PER_WORKER = 4  # tasks in flight per worker before reading on
+
+
+def verify_proof(record: Dict) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Check every step of a proof.
+    ---
+    :return: (None, None) if the proof is valid, else the number of the first
+             invalid step (None when only the conclusion is wrong) and why.
+    """
+    from deducto.cli.parser import parse
+    from deducto.core.utils import resolve_path, set_path
+    from deducto.rules.apply import apply_rule
+
+    try:
+        assumptions, goal, steps = record["assumptions"], record["goal"], record["steps"]
+        if not isinstance(assumptions, list) or not all(isinstance(a, str) for a in assumptions):
+            raise TypeError("assumptions must be a list of strings")
+        if not isinstance(goal, str):
+            raise TypeError("goal must be a string")
+        if not isinstance(steps, list):
+            raise TypeError("steps must be a list")
+        formulas = [parse(a) for a in assumptions]
+        goal = parse(goal)
+    except (KeyError, TypeError, SyntaxError) as e:
+        return None, f"Invalid proof: {e}"
+
+    for number, step in enumerate(steps, len(formulas) + 1):
+        try:
+            premises = []
+            for i in step["premises"]:
+                if type(i) is not int:
+                    raise TypeError(f"Premise {i!r} is not a step number")
+                if not 1 <= i < number:
+                    raise IndexError(f"No earlier step {i}")
+                premises.append(formulas[i - 1])
+            path = step.get("path")
+            if path:
+                if len(premises) != 1:
+                    raise ValueError("A rule at a subpath takes one premise")
+                path = path.split(".")
+                result = set_path(premises[0], path,
+                                  apply_rule(step["rule"], [resolve_path(premises[0], path)]))
+            else:
+                result = apply_rule(step["rule"], premises)
+            if "result" in step and parse(step["result"]) != result:
+                raise ValueError(f"{step['rule']} gives {result}, not {step['result']}")
+        except (KeyError, TypeError, ValueError, SyntaxError, AttributeError, IndexError) as e:
+            return number, str(e)
+        formulas.append(result)
+
+    if not formulas:
+        return None, "No conclusion: the proof has no assumptions and no steps"
+    if formulas[-1] != goal:
+        return None, f"Conclusion {formulas[-1]} is not the goal {goal}"
+    return None, None
+
+
+def verify_lines(batch: List[Tuple[str, Optional[int], bytes]]) -> List[Dict]:
+    """
+    Verify a batch of (file, line number, raw line) JSON lines. An entry
+    without a line number stands for a file that could not be read, and
+    carries the error message instead of a line.
+    """
+    results = []
+    for path, line, data in batch:
+        result = {"file": path, "line": line, "id": None, "valid": False, "step": None, "error": None}
+        if line is None:
+            result["error"] = data
+            results.append(result)
+            continue
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            result["error"] = f"Invalid proof: {e}"
+            results.append(result)
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            result["error"] = f"Invalid JSON: {e}"
+        else:
+            if isinstance(record, dict):
+                result["id"] = record.get("id")
+                try:
+                    result["step"], result["error"] = verify_proof(record)
+                except Exception as e:
+                    # One bad record must not take the worker, and the run, down
+                    result["error"] = f"Invalid proof: {e.__class__.__name__}: {e}"
+            else:
+                result["error"] = "Invalid proof: not an object"
+            result["valid"] = result["error"] is None
+        results.append(result)
+    return results
+
+
+def read_batches(paths: Iterable[str], size: int = BATCH_SIZE) -> Iterator[List[Tuple[str, Optional[int], bytes]]]:
+    """
+    Read non-blank lines lazily, in batches of size. Lines are decoded by
+    verify_lines, so that one that is not UTF-8 fails on its own, and a file
+    that cannot be read becomes an entry with its error, as in verify_lines.
+    """
+    batch = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                for line, data in enumerate(f, 1):
+                    if data.strip():
+                        batch.append((path, line, data))
+                        if len(batch) == size:
+                            yield batch
+                            batch = []
+        except OSError as e:
+            batch.append((path, None, str(e)))
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def verify_files(paths: Iterable[str], jobs: Optional[int] = None,
+                 batch_size: int = BATCH_SIZE) -> Iterator[Dict]:
+    """
+    Verify JSONL files, yielding one result per proof in input order.
+    ---
+    :param jobs: Number of worker processes, one per CPU by default. With a
+                 single job or a single batch everything runs in this process.
+    :param batch_size: Number of proofs per task.
+    """
+    batches = read_batches(paths, batch_size)
+    head = list(islice(batches, 2))
+    if jobs == 1 or len(head) < 2:
+        for batch in chain(head, batches):
+            yield from verify_lines(batch)
+        return
+    from multiprocessing import Pool
+
+    jobs = jobs or os.cpu_count() or 1
+    limit = jobs * BATCHES_PER_WORKER
+    with Pool(jobs) as pool:
+        pending = deque()
+        for batch in chain(head, batches):
+            pending.append(pool.apply_async(verify_lines, (batch,)))
+            if len(pending) >= limit:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+class Throughput:
+    """Counts verified proofs against wall-clock time"""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.proofs = 0
+        self.invalid = 0
+
+    def add(self, result: Dict):
+        self.proofs += 1
+        self.invalid += not result["valid"]
+
+    def __str__(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.proofs / elapsed if elapsed > 0 else 0.0
+        return (f"Verified {self.proofs} proofs in {elapsed:.2f}s ({rate:.0f} proofs/s), "
+                f"{self.invalid} invalid")
@@ -0,0 +1,155 @@
+"""
+Comparison modulo associativity and commutativity (AC) of ∧ and ∨.
+
+The canonical form of a formula flattens every chain of ∧ (or of ∨) into its
+operands, drops repeated operands, sorts them, and rebuilds the chain nested
+to the right. Formulas that differ only in the grouping, order or repetition
+of conjuncts and disjuncts have the same canonical form, and since
+expressions are hash-consed that form is a single object: comparing two
+formulas modulo AC is an identity check on their canonical forms, whose hash
+is cached like that of any other expression.
+
+Canonical forms are remembered per expression for as long as the expression
+is alive. Whether goal checks and rule premises are compared modulo AC is set
+by MODULO_AC, off by default.
+"""
+from contextvars import ContextVar
+from typing import Tuple
+from weakref import WeakKeyDictionary
+
+from deducto.core.expr import *
+
+# Whether goal checks and premise matching ignore the grouping, order and
+# repetition of conjuncts and disjuncts
+MODULO_AC = ContextVar("modulo_ac", default=False)
+
+AC_OPERATORS = (And, Or)
+
+# expr -> (canonical form, or None if expr is its own canonical form, sort key
+# of the canonical form). Storing None rather than expr itself keeps the value
+# from holding the weak key alive.
+_cache = WeakKeyDictionary()
+
+
+def _operands(expr: Expr, cls: type):
+    """The operands of the chain of cls at expr, left to right"""
+    operands = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is cls:
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            operands.append(node)
+    return operands
+
+def _parts(expr: Expr):
+    """The subterms whose canonical forms the canonical form of expr is built from"""
+    cls = expr.__class__
+    if cls in AC_OPERATORS:
+        return _operands(expr, cls)
+    if isinstance(expr, BinaryOperation):
+        return [expr.left, expr.right]
+    if isinstance(expr, Not):
+        return [expr.negated]
+    return []
+
+def _lookup(expr: Expr):
+    canonical, key = _cache[expr]
+    return (expr if canonical is None else canonical), key
+
+def _build(expr: Expr, parts):
+    cls = expr.__class__
+    if cls in AC_OPERATORS:
+        seen = {}
+        for part in parts:
+            canonical, key = _lookup(part)
+            # The canonical form of an operand collapses to a chain of cls
+            # when it is, say, a ∨ a with a a conjunction
+            for operand in (_operands(canonical, cls) if canonical.__class__ is cls else (canonical,)):
+                if operand not in seen:
+                    seen[operand] = _lookup(operand)[1]
+        operands = sorted(seen, key=seen.__getitem__)
+        result = operands[-1]
+        for operand in reversed(operands[:-1]):
+            result = cls(operand, result)
+        if len(operands) == 1:
+            return result, seen[result]
+        return result, (3, cls.__name__, tuple(seen[operand] for operand in operands))
+    if isinstance(expr, BinaryOperation):
+        (left, left_key), (right, right_key) = _lookup(parts[0]), _lookup(parts[1])
+        return expr.replace(left=left, right=right), (4, cls.__name__, left_key, right_key)
+    if isinstance(expr, Not):
+        negated, key = _lookup(parts[0])
+        return expr.replace(negated=negated), (2, key)
+    if isinstance(expr, Var):
+        return expr, (0, expr.name)
+    return expr, (1, cls.__name__)
+
+def canonical(expr: Expr) -> Expr:
+    """
+    Return the AC-canonical form of expr.
+    ---
+    :return: An expression with the same meaning as expr, identical to the
+             canonical form of every formula equal to expr modulo AC.
+    """
+    entry = _cache.get(expr)
+    if entry is not None:
+        return expr if entry[0] is None else entry[0]
+    # Intermediate links of a chain are not needed by the chain, so the
+    # parts of each node are visited rather than its children, and wide
+    # chains are flattened once
+    parts = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in _cache:
+            stack.pop()
+            continue
+        if node not in parts:
+            parts[node] = _parts(node)
+            missing = [part for part in parts[node] if part not in _cache]
+            if missing:
+                stack.extend(missing)
+                continue
+        stack.pop()
+        result, key = _build(node, parts.pop(node))
+        _cache.setdefault(result, (None, key))
+        _cache[node] = (None if result is node else result, key)
+    return _lookup(expr)[0]
+
+def operands(expr: Expr) -> Tuple[Expr, ...]:
+    """
+    Return the n-ary view of expr: the canonical operands of its ∧ or ∨
+    chain, flattened, deduplicated and sorted, or just its canonical form if
+    it is neither.
+    """
+    expr = canonical(expr)
+    if expr.__class__ in AC_OPERATORS:
+        return tuple(_operands(expr, expr.__class__))
+    return (expr,)
+
+def same(a: Expr, b: Expr) -> bool:
+    """Whether a and b are the same formula, modulo AC if MODULO_AC is set"""
+    if a is b:
+        return True
+    if not MODULO_AC.get() or a is None or b is None:
+        return False
+    return canonical(a) is canonical(b)
+
+class modulo_ac:
+    """
+    Compare modulo AC, or not, within a with block. A class rather than a
+    contextlib generator, so that the rules importing this module do not
+    load contextlib at startup.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def __enter__(self):
+        self._token = MODULO_AC.set(self.enabled)
+        return self
+
+    def __exit__(self, *exc_info):
+        MODULO_AC.reset(self._token)
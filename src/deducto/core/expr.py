@@ -1,83 +1,158 @@
+from weakref import WeakValueDictionary
+
+# One live instance per distinct formula, keyed on (class, *fields).
+# Entries disappear once nothing references the node anymore.
+_interned = WeakValueDictionary()
+
+
 class Expr:
+    """
+    Base class of every formula node.
+
+    Nodes are immutable and hash-consed: building a node that is structurally
+    equal to a live one returns that same instance. Equality is therefore the
+    identity check inherited from object, and the structural hash is computed
+    once at construction.
+    """
+    __slots__ = ('_hash', '__weakref__')
+    _fields = ()
+
+    def __new__(cls, *args, **kwargs):
+        raise TypeError(f"{cls.__name__} cannot be instantiated directly")
+
+    @classmethod
+    def _intern(cls, *values):
+        key = (cls, *values)
+        node = _interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for field, value in zip(cls._fields, values):
+                object.__setattr__(node, field, value)
+            object.__setattr__(node, '_hash', hash((cls.__name__, *values)))
+            _interned[key] = node
+        return node
+
+    def __hash__(self):
+        return self._hash
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        # Unpickling goes through the constructors, so nodes are re-interned.
+        # Pickling the fields themselves would recurse once per level of the
+        # formula, so anything above a leaf is sent flattened instead.
+        if not any(isinstance(getattr(self, f), Expr) for f in self._fields):
+            return (self.__class__, tuple(getattr(self, f) for f in self._fields))
+        return (_unflatten, (_flatten(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def replace(self, **fields):
+        """
+        Returns the node with the given fields swapped, sharing the others.
+        """
+        values = {f: getattr(self, f) for f in self._fields}
+        values.update(fields)
+        return self.__class__(**values)
+
     def __str__(self):
         """
-        Returns a string stresentation of the object.
+        Returns a string representation of the object.
         """
-        return self.__class__.__name__
+        from deducto.core.render import render
+        return render(self)
+
+def _flatten(expr):
+    """
+    The distinct subterms of expr, children before parents, each as its
+    class followed by its fields, with subterms given by their position.
+    """
+    positions = {}
+    nodes = []
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in positions:
+            stack.pop()
+            continue
+        values = [getattr(node, f) for f in node._fields]
+        missing = [v for v in values if isinstance(v, Expr) and v not in positions]
+        if missing:
+            stack.extend(missing)
+            continue
+        stack.pop()
+        positions[node] = len(nodes)
+        nodes.append((node.__class__, *(positions[v] if isinstance(v, Expr) else v for v in values)))
+    return nodes
+
+def _unflatten(nodes):
+    """Rebuild the formula flattened by _flatten"""
+    built = []
+    for cls, *values in nodes:
+        built.append(cls(*(built[v] if isinstance(v, int) else v for v in values)))
+    return built[-1]
 
 class Var(Expr):
-    def __init__(self, name):
-        self.name = name
-
-    def __str__(self):
-        return self.name
+    __slots__ = ('name',)
+    _fields = ('name',)
 
-    def __eq__(self, other):
-        if not isinstance(other, Var):
-            return False
-        return self.name == other.name
+    def __new__(cls, name):
+        return cls._intern(name)
 
 class Not(Expr):
-    def __init__(self, negated):
-        self.negated = negated
+    __slots__ = ('negated',)
+    _fields = ('negated',)
 
-    def __str__(self):
-        if isinstance(self.negated, Var):
-            return f"¬{self.negated}"
-        return f"¬({self.negated})"
-
-    def __eq__(self, other):
-        if not isinstance(other, Not):
-            return False
-        return self.negated == other.negated
+    def __new__(cls, negated):
+        return cls._intern(negated)
 
 class BinaryOperation(Expr):
+    __slots__ = ('left', 'right')
+    _fields = ('left', 'right')
     INFIX_SYMBOL = None # to define in the child classes
 
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
-
-    def __str__(self):
-        left_str = str(self.left) if isinstance(self.left, (Var, Not)) else f"({self.left})"
-        right_str = str(self.right) if isinstance(self.right, (Var, Not)) else f"({self.right})"
-        return f"{left_str} {self.INFIX_SYMBOL} {right_str}"
-
-    def __eq__(self, other):
-        if not isinstance(other, type(self)): # not the same type
-            return False
-        return self.left == other.left and self.right == other.right
+    def __new__(cls, left, right):
+        return cls._intern(left, right)
 
 class And(BinaryOperation):
+    __slots__ = ()
     INFIX_SYMBOL = "∧"
 
 class Or(BinaryOperation):
+    __slots__ = ()
     INFIX_SYMBOL = "∨"
 
 class Implies(BinaryOperation):
+    __slots__ = ()
     INFIX_SYMBOL = "→"
 
 class Iff(BinaryOperation):
+    __slots__ = ()
     INFIX_SYMBOL = "↔"
 
 class Xor(BinaryOperation):
+    __slots__ = ()
     INFIX_SYMBOL = "⊕"
 
 class ConstantExpr(Expr):
+    __slots__ = ()
     INFIX_SYMBOL = None
-    def __init__(self):
-        pass
-
-    def __str__(self):
-        return str(self.INFIX_SYMBOL)
 
-    def __eq__(self, other):
-        if not isinstance(other, type(self)):
-            return False
-        return True
+    def __new__(cls):
+        return cls._intern()
 
 class TrueExpr(ConstantExpr):
+    __slots__ = ()
     INFIX_SYMBOL = "𝗧"
 
 class FalseExpr(ConstantExpr):
+    __slots__ = ()
     INFIX_SYMBOL = "𝗙"
@@ -0,0 +1,121 @@
+"""
+Index of proof steps by the shape of their formulas.
+
+Each step is filed under its whole formula, its top-level operator, and its
+operator together with each direct operand, so that the partner a rule needs
+(the implication whose left side is a given formula, the disjunction whose
+left side is its negation, ...) is a dictionary lookup away. While
+MODULO_AC is set, lookups by whole formula go through the AC-canonical forms
+of the steps, filed the first time they are needed.
+"""
+from collections import defaultdict
+from typing import Iterable
+
+from deducto.core.ac import MODULO_AC, canonical
+from deducto.core.expr import *
+
+
+def _keys(formula: Expr):
+    cls = formula.__class__
+    yield ("=", formula)
+    yield (cls,)
+    if isinstance(formula, BinaryOperation):
+        yield (cls, "left", formula.left)
+        yield (cls, "right", formula.right)
+    elif isinstance(formula, Not):
+        yield (cls, "negated", formula.negated)
+
+
+class StepIndex:
+    """
+    Steps keyed on formula shape. Steps are stored by identity, so inserting
+    or deleting one touches only its own entries and never renumbers others.
+    """
+    def __init__(self, steps: Iterable = ()):
+        # key -> steps, with dicts used as insertion-ordered sets
+        self._entries = defaultdict(dict)
+        self._canonical = None  # AC-canonical formula -> steps, once used
+        for step in steps:
+            self.add(step)
+
+    def add(self, step):
+        for key in _keys(step.result):
+            self._entries[key][step] = None
+        if self._canonical is not None:
+            self._canonical[canonical(step.result)][step] = None
+
+    def remove(self, step):
+        for key in _keys(step.result):
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.pop(step, None)
+                if not entry:
+                    del self._entries[key]
+        if self._canonical is not None:
+            key = canonical(step.result)
+            entry = self._canonical.get(key)
+            if entry is not None:
+                entry.pop(step, None)
+                if not entry:
+                    del self._canonical[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._canonical = None
+
+    def equal_to(self, formula: Expr):
+        """Steps whose formula is formula, modulo AC if MODULO_AC is set"""
+        if MODULO_AC.get():
+            if self._canonical is None:
+                self._canonical = defaultdict(dict)
+                for key, entry in self._entries.items():
+                    if key[0] == "=":
+                        self._canonical[canonical(key[1])].update(entry)
+            return self._canonical.get(canonical(formula), {}).keys()
+        return self._entries.get(("=", formula), {}).keys()
+
+    def of_type(self, cls: type):
+        """Steps whose top-level operator is cls"""
+        return self._entries.get((cls,), {}).keys()
+
+    def with_operand(self, cls: type, attr: str, operand: Expr):
+        """Steps whose top-level operator is cls and whose attr is operand"""
+        return self._entries.get((cls, attr, operand), {}).keys()
+
+
+class DependencyIndex:
+    """
+    Reverse edges of the proof's dependency DAG: for every step, the steps
+    that use it as a premise. Like StepIndex, steps are kept by identity.
+    """
+    def __init__(self):
+        self._dependents = defaultdict(dict)
+
+    def add(self, step, premises: Iterable):
+        for premise in premises:
+            self._dependents[premise][step] = None
+
+    def remove(self, step, premises: Iterable):
+        for premise in premises:
+            entry = self._dependents.get(premise)
+            if entry is not None:
+                entry.pop(step, None)
+                if not entry:
+                    del self._dependents[premise]
+        self._dependents.pop(step, None)
+
+    def dependents(self, step):
+        """Steps using step directly as a premise"""
+        return self._dependents.get(step, {}).keys()
+
+    def closure(self, steps: Iterable) -> set:
+        """The given steps together with everything that depends on them"""
+        found = set()
+        stack = list(steps)
+        while stack:
+            step = stack.pop()
+            if step in found:
+                continue
+            found.add(step)
+            stack.extend(self.dependents(step))
+        return found
@@ -0,0 +1,112 @@
+"""
+Persistent proof log.
+
+Steps are never copied or removed. Each entry points at the entry before it,
+so the log is a tree whose root-to-entry paths are proofs. Undo, redo,
+checkpoints and branches are all pointers into that tree, so moving between
+them is a pointer move; the proof state only replays the steps that differ
+between the old and the new position.
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+class Entry:
+    """One step in the log, with the entry it follows"""
+    __slots__ = ("step", "parent", "depth")
+
+    def __init__(self, step, parent: Optional["Entry"]):
+        self.step = step
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+
+
+class ProofLog:
+    """
+    An append-only tree of steps with a head, named checkpoints and named
+    branches. Each branch remembers its own head.
+    """
+    def __init__(self, branch: str = "main"):
+        self.root = Entry(None, None)
+        self.head = self.root
+        self.branch = branch
+        self.branches: Dict[str, Entry] = {branch: self.root}
+        self.checkpoints: Dict[str, Entry] = {}
+        self._redo: List[Entry] = []
+
+    def append(self, step) -> Entry:
+        self._redo.clear()
+        self._move(Entry(step, self.head))
+        return self.head
+
+    def _move(self, entry: Entry):
+        self.head = entry
+        self.branches[self.branch] = entry
+
+    def undo(self, floor: Entry = None) -> Optional[Entry]:
+        """Step the head back, never above floor. Returns the new head, or None."""
+        floor_depth = 0 if floor is None else floor.depth
+        if self.head.depth <= floor_depth:
+            return None
+        self._redo.append(self.head)
+        self._move(self.head.parent)
+        return self.head
+
+    def redo(self) -> Optional[Entry]:
+        if not self._redo:
+            return None
+        self._move(self._redo.pop())
+        return self.head
+
+    def goto(self, entry: Entry):
+        """Move the head of the current branch to any entry"""
+        self._redo.clear()
+        self._move(entry)
+
+    def steps(self, entry: Entry) -> List:
+        """The steps from the root up to entry"""
+        steps = []
+        while entry.parent is not None:
+            steps.append(entry.step)
+            entry = entry.parent
+        steps.reverse()
+        return steps
+
+    def checkpoint(self, name: str):
+        self.checkpoints[name] = self.head
+
+    def fork(self, name: str):
+        """Start a new branch at the head and switch to it"""
+        if name in self.branches:
+            raise ValueError(f"Branch '{name}' already exists")
+        self.branches[name] = self.head
+        self.branch = name
+        self._redo.clear()
+
+    def switch(self, name: str):
+        if name not in self.branches:
+            raise ValueError(f"No branch named '{name}'")
+        self.branch = name
+        self.head = self.branches[name]
+        self._redo.clear()
+
+
+def diff(source: Entry, target: Entry) -> Tuple[int, List]:
+    """
+    Return how to turn the steps up to source into the steps up to target:
+    the number of steps to drop from the end, then the steps to append.
+    """
+    pops = 0
+    pushes = []
+    while source.depth > target.depth:
+        source = source.parent
+        pops += 1
+    while target.depth > source.depth:
+        pushes.append(target.step)
+        target = target.parent
+    while source is not target:
+        source = source.parent
+        pops += 1
+        pushes.append(target.step)
+        target = target.parent
+    pushes.reverse()
+    return pops, pushes
@@ -1,8 +1,18 @@
-from copy import deepcopy
-from typing import List
+import time
+from copy import copy
+from functools import cached_property
+from typing import Iterable, List
 
+from deducto.core.ac import same
 from deducto.core.expr import *
-from deducto.core.utils import parse_path, resolve_path, set_path
+from deducto.core.index import DependencyIndex, StepIndex
+from deducto.core.log import Entry, ProofLog, diff
+from deducto.core.render import Renderer
+from deducto.core.stats import STATS
+from deducto.core.search import ProofSearch
+from deducto.core.truthtable import format_assignment
+from deducto.solver import entails
+from deducto.core.utils import all_paths, parse_path, resolve_path, set_path
 from deducto.rules.apply import *
 
 
@@ -12,67 +22,344 @@ class ProofStep:
         self.rule = rule
         self.premises = premises
 
+    @cached_property
+    def paths(self) -> List[str]:
+        """Subpaths offered by tab completion, listed the first time they are asked for"""
+        return all_paths(self.result)
+
+    def renumbered(self, numbering) -> "ProofStep":
+        """Return this step with its premise indices mapped through numbering"""
+        step = copy(self)
+        step.premises = [numbering[i] for i in self.premises]
+        return step
+
     def __str__(self):
+        return self.format(Renderer())
+
+    def format(self, renderer: Renderer) -> str:
+        result = renderer.render(self.result)
         if self.premises:
             premises_str = ', '.join(str(i + 1) for i in self.premises)
             rule = self.rule.replace("_", " ")
-            return f"{self.result}		({rule} of {premises_str})"
+            return f"{result}		({rule} of {premises_str})"
         else:
-            return f"{self.result}		({self.rule})"
+            return f"{result}		({self.rule})"
+
+def chain_steps(rewrites: Iterable, premise: int, first: int) -> List[ProofStep]:
+    """
+    Turn successive rewrites of one step into proof steps, each following the
+    one before.
+    ---
+    :param rewrites: (rule, result) pairs, in order.
+    :param premise: The index of the rewritten step.
+    :param first: The index the first returned step will have.
+    """
+    steps = []
+    for i, (rule, result) in enumerate(rewrites):
+        steps.append(ProofStep(result, rule, [premise if i == 0 else first + i - 1]))
+    return steps
 
 class ProofState:
     def __init__(self, assumptions: List[Expr], goal: Expr):
         self.assumptions = assumptions
         self.goal = goal
-        self.steps: List[ProofStep] = [ProofStep(a, "assumption", []) for a in assumptions]
+        self.steps: List[ProofStep] = []
+        self.index = StepIndex()
+        self.dependencies = DependencyIndex()
+        self.log = ProofLog()
+        # Bumped whenever steps are removed, so caches built from the step
+        # list know to start over rather than just catch up
+        self.revision = 0
+        for a in assumptions:
+            self.add_step(ProofStep(a, "assumption", []))
+        self.start = self.log.head  # where reset returns to
+
+    def add_step(self, step: ProofStep):
+        self.log.append(step)
+        self._push(step)
+
+    def _push(self, step):
+        self.dependencies.add(step, [self.steps[i] for i in step.premises])
+        self.steps.append(step)
+        self.index.add(step)
+
+    def _pop(self):
+        step = self.steps.pop()
+        self.index.remove(step)
+        self.dependencies.remove(step, [self.steps[i] for i in step.premises])
+
+    def _sync(self, source: Entry):
+        """Bring steps and index from the log entry source to the log head"""
+        pops, pushes = diff(source, self.log.head)
+        for _ in range(pops):
+            self._pop()
+        for step in pushes:
+            self._push(step)
+        if pops:
+            self.revision += 1
+
+    def _goto(self, entry: Entry):
+        head = self.log.head
+        self.log.goto(entry)
+        self._sync(head)
+
+    def undo(self) -> bool:
+        """Drop the last step, keeping it for redo. Steps from before start stay."""
+        head = self.log.head
+        if self.log.undo(self.start) is None:
+            return False
+        self._sync(head)
+        return True
+
+    def redo(self) -> bool:
+        head = self.log.head
+        if self.log.redo() is None:
+            return False
+        self._sync(head)
+        return True
+
+    def reset(self):
+        self._goto(self.start)
+
+    def delete_step(self, n: int) -> List[int]:
+        """
+        Remove step n together with every step that depends on it.
+        ---
+        :return: The indices of the removed steps, in order.
+        :raises IndexError: If there is no step n.
+        :raises ValueError: If step n is an assumption.
+        """
+        if not 0 <= n < len(self.steps):
+            raise IndexError(f"No step {n + 1}")
+        if n < self.start.depth:
+            raise ValueError("Cannot delete original assumptions")
+        if self.steps[n].rule == "assumption":
+            # It would stay in self.assumptions, which exports number from
+            raise ValueError("Cannot delete assumptions")
+        doomed = self.dependencies.closure([self.steps[n]])
+        removed = [i for i in range(n, len(self.steps)) if self.steps[i] in doomed]
+        self._remove(removed)
+        return removed
+
+    def prune(self) -> List[int]:
+        """
+        Remove every step that is not an assumption and that the first step
+        reaching the goal does not depend on.
+        ---
+        :return: The indices of the removed steps, in order.
+        :raises ValueError: If there is no goal or it has not been reached.
+        """
+        if self.goal is None:
+            raise ValueError("No goal set")
+        reached = [i for i, step in enumerate(self.steps) if self.reaches_goal(step.result)]
+        if not reached:
+            raise ValueError("Goal not reached")
+        # Assumptions added with assume stay too, like the original ones
+        needed = {i for i, step in enumerate(self.steps) if step.rule == "assumption"}
+        stack = [reached[0]]
+        while stack:
+            i = stack.pop()
+            if i not in needed:
+                needed.add(i)
+                stack.extend(self.steps[i].premises)
+        removed = [i for i in range(len(self.steps)) if i not in needed]
+        self._remove(removed)
+        return removed
+
+    def _remove(self, removed: Iterable[int]):
+        """
+        Remove the steps at the given indices, none of which may be a premise
+        of a kept step. Only the steps after the first removed one are
+        touched: they are appended again, renumbered, to its predecessor, so
+        the old sequence stays in the log.
+        """
+        removed = set(removed)
+        if not removed:
+            return
+        first = min(removed)
+        later = self.steps[first:]
+        entry = self.log.head
+        for _ in later:
+            entry = entry.parent
+        self._goto(entry)
+        numbering = {}
+        for i, step in enumerate(later, first):
+            if i in removed:
+                continue
+            numbering[i] = len(self.steps)
+            if any(numbering.get(j, j) != j for j in step.premises):
+                step = step.renumbered({j: numbering.get(j, j) for j in step.premises})
+            self.add_step(step)
+
+    def checkpoint(self, name: str):
+        self.log.checkpoint(name)
+
+    def restore(self, name: str):
+        """
+        Return to a checkpoint.
+        ---
+        :raises ValueError: If there is no such checkpoint.
+        """
+        if name not in self.log.checkpoints:
+            raise ValueError(f"No checkpoint named '{name}'")
+        self._goto(self.log.checkpoints[name])
+
+    def branch(self, name: str):
+        """Start a new branch from the current steps and switch to it"""
+        self.log.fork(name)
+
+    def switch(self, name: str):
+        """
+        Switch to another branch, restoring its steps.
+        ---
+        :raises ValueError: If there is no such branch.
+        """
+        head = self.log.head
+        self.log.switch(name)
+        self._sync(head)
+
+    def branch_proof(self, name: str) -> "ProofState":
+        """
+        Return a separate proof holding the steps of a branch, sharing them.
+        ---
+        :raises ValueError: If there is no such branch.
+        """
+        if name not in self.log.branches:
+            raise ValueError(f"No branch named '{name}'")
+        proof = ProofState(self.assumptions, self.goal)
+        for step in self.log.steps(self.log.branches[name])[proof.start.depth:]:
+            proof.add_step(step)
+        return proof
 
     def show(self):
-        print("\nProof Steps:")
+        renderer = Renderer()
+        lines = ["\nProof Steps:"]
         for i, step in enumerate(self.steps):
-            print(f"  {i + 1}. {step}")
-        print(f"Goal: {self.goal}")
+            lines.append(f"  {i + 1}. {step.format(renderer)}")
+        goal = renderer.render(self.goal) if self.goal is not None else None
+        lines.append(f"Goal: {goal}")
+        print("\n".join(lines))
 
     def try_rule(self, rule: str, targets: List[str]) -> bool:
+        """Apply a rule, printing the outcome instead of raising"""
+        try:
+            self.apply(rule, targets)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return False
+        if self.reaches_goal(self.steps[-1].result):
+            print("✓ Goal reached!")
+            self.show()
+        return True
+
+    def apply(self, rule: str, targets: List[str]) -> ProofStep:
+        """
+        Apply a rule to steps, or to a subpath of a step, and add the result.
+        ---
+        :param targets: Step numbers counted from 1, or a single "n.path".
+        :return: The new step.
+        :raises ValueError: If the targets or the rule do not fit, with a
+                            message for the user.
+        """
+        start = time.perf_counter()
+        ok = False
+        try:
+            step = self._apply(rule, targets)
+            ok = True
+        finally:
+            STATS.record("try_rule", rule, time.perf_counter() - start, ok)
+        self.add_step(step)
+        return step
+
+    def _apply(self, rule, targets):
         try:
             if '.' in targets[0]:  # handle subexpression
                 idx, path = parse_path(targets[0])
-                expr = deepcopy(self.steps[idx].result)
-                subexpr = resolve_path(expr, path)
-                result = apply_rule(rule, [subexpr])
-                if result is None:
-                    print(f"✗ Rule '{rule}' not applicable at {targets[0]}")
-                    return False
-                set_path(expr, path, result)
-                subnode = '.'.join(targets[0].split('.')[1:])
-                self.steps.append(ProofStep(expr, f"{rule} at {subnode}", [idx]))
+                expr = self.steps[idx].result
+                result = apply_rule(rule, [resolve_path(expr, path)])
             else:
                 premise_indices = [int(t) - 1 for t in targets]
                 premises = [self.steps[i].result for i in premise_indices]
                 result = apply_rule(rule, premises)
-                if result is None:
-                    print(f"✗ Rule '{rule}' not applicable to given premises.")
-                    return False
-                self.steps.append(ProofStep(result, rule, premise_indices))
+        except IndexError:
+            raise ValueError("Invalid step index.") from None
+        except Exception as e:
+            raise ValueError(f"Error applying rule: {e}") from None
 
-            if self.steps[-1].result == self.goal:
-                print("✓ Goal reached!")
-                self.show()
-            return True
+        if '.' in targets[0]:
+            if result is None:
+                raise ValueError(f"Rule '{rule}' not applicable at {targets[0]}")
+            subnode = '.'.join(targets[0].split('.')[1:])
+            return ProofStep(set_path(expr, path, result), f"{rule} at {subnode}", [idx])
+        if result is None:
+            raise ValueError(f"Rule '{rule}' not applicable to given premises.")
+        return ProofStep(result, rule, premise_indices)
 
-        except IndexError:
-            print("✗ Invalid step index.")
+    def reaches_goal(self, formula: Expr) -> bool:
+        """Whether formula is the goal, modulo AC if that is switched on"""
+        return self.goal is not None and same(formula, self.goal)
+
+    def check(self):
+        """
+        Check whether the goal follows from the assumptions, using truth tables
+        for small problems and the SAT solver otherwise.
+        ---
+        :return: (True, None) if it does, else (False, counterexample).
+        :raises ValueError: If there is no goal.
+        """
+        if self.goal is None:
+            raise ValueError("No goal set")
+        # The current steps rather than self.assumptions, which keeps
+        # assumptions that were undone
+        return entails([step.result for step in self.steps if step.rule == "assumption"], self.goal)
+
+    def prove(self, **limits) -> bool:
+        """
+        Search for a derivation of the goal from the current steps and append
+        it to the proof, printing the outcome. Keyword arguments are passed on
+        to ProofSearch as budgets (max_nodes, timeout, max_formulas).
+        """
+        if self.goal is None:
+            print("No goal set.")
             return False
-        except Exception as e:
-            print(f"✗ Error applying rule: {e}")
+        try:
+            search, found = self.derive(**limits)
+        except ValueError as e:
+            print(f"✗ {e}")
             return False
+        print(f"✓ Proof found in {search.elapsed:.2f}s ({len(found)} steps, {search.expanded} nodes)")
+        if self.reaches_goal(self.steps[-1].result):
+            print("✓ Goal reached!")
+            self.show()
+        return True
 
-    # def list_applicable(self):
-    #     formulas = [step.result for step in self.steps]
-    #     suggestions = list_applicable_rules(formulas, self.goal)
-    #     if suggestions:
-    #         print("Possible rules to try:")
-    #         for rule, premises in suggestions:
-    #             indices = ', '.join(str(i + 1) for i in premises)
-    #             print(f"  {rule} on steps {indices}")
-    #     else:
-    #         print("No obvious applicable rules found.")
+    def derive(self, **limits):
+        """
+        Search for a derivation of the goal and append it to the proof.
+        ---
+        :return: The finished ProofSearch and the steps it found.
+        :raises ValueError: If there is no goal, it does not follow, or no
+                            proof was found within the budgets.
+        """
+        if self.goal is None:
+            raise ValueError("No goal set")
+        search = ProofSearch([step.result for step in self.steps], self.goal, **limits)
+        found = search.run()
+        if found is None and search.counterexample is not None:
+            raise ValueError(f"The goal does not follow from the assumptions: {format_assignment(search.counterexample)}")
+        if found is None:
+            raise ValueError(f"No proof found ({search.reason} after {search.expanded} nodes, {search.elapsed:.2f}s)")
+        for result, rule, premises in found:
+            self.add_step(ProofStep(result, rule, premises))
+        return search, found
+
+    def list_applicable(self):
+        suggestions = list_applicable_rules(self.steps, self.index, self.goal)
+        if suggestions:
+            print("Possible rules to try:")
+            for rule, premises, result in suggestions:
+                indices = ', '.join(str(i + 1) for i in premises)
+                print(f"  {rule} on steps {indices} → {result}")
+        else:
+            print("No obvious applicable rules found.")
+        return suggestions
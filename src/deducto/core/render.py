@@ -0,0 +1,179 @@
+"""
+Rendering of formulas to text.
+
+A Renderer builds the text of shallow formulas by recursion, and switches to
+an explicit stack below RECURSION_DEPTH, so formulas of any depth render.
+Each formula it is asked for is remembered, so exports that show a step more
+than once render it once. Subtrees are not remembered: most are rendered
+once, and keeping their text would cost memory quadratic in the depth.
+
+Two styles are provided: UNICODE, used by str() and the text views, and LATEX
+for exports, which also decides parentheses from operator precedence.
+"""
+from typing import Dict
+
+from deducto.core.expr import *
+
+# Binding strength, loosest first, as in the parser
+PRECEDENCE = {Iff: 1, Implies: 2, Xor: 3, Or: 4, And: 5}
+
+# Operators whose nested uses need no parentheses on the left
+ASSOCIATIVE = (And, Or)
+
+BINARY_CLASSES = (And, Or, Implies, Iff, Xor)
+NODE_CLASSES = (Var, Not, TrueExpr, FalseExpr) + BINARY_CLASSES
+
+# Nesting rendered by recursion, which is fastest; deeper subtrees are
+# rendered with an explicit stack
+RECURSION_DEPTH = 200
+
+
+class Style:
+    """
+    Symbols and parenthesis policy of a rendering.
+    ---
+    :param symbols: Text for each binary operator and constant class.
+    :param negation: Text put before a negated formula.
+    :param parens: Opening and closing parenthesis.
+    :param precedence: Whether to drop parentheses that precedence makes
+                       redundant, rather than wrapping every compound operand.
+    """
+    def __init__(self, symbols: Dict[type, str], negation: str, parens=("(", ")"), precedence=False):
+        self.symbols = symbols
+        self.negation = negation
+        self.open, self.close = parens
+        self.precedence = precedence
+        # The answers of needs_parens by class: the operand classes wrapped
+        # under a negation, and on the left and right of each binary operator
+        self.wrap_negated = frozenset(c for c in NODE_CLASSES if self._needs_parens(c, Not, "negated"))
+        self.wrap_left = {
+            p: frozenset(c for c in NODE_CLASSES if self._needs_parens(c, p, "left"))
+            for p in BINARY_CLASSES
+        }
+        self.wrap_right = {
+            p: frozenset(c for c in NODE_CLASSES if self._needs_parens(c, p, "right"))
+            for p in BINARY_CLASSES
+        }
+
+    def needs_parens(self, child: Expr, parent: Expr, side: str) -> bool:
+        return self._needs_parens(child.__class__, parent.__class__, side)
+
+    def _needs_parens(self, child: type, parent: type, side: str) -> bool:
+        if issubclass(parent, Not):
+            return not issubclass(child, Var) and not (
+                self.precedence and issubclass(child, (Not, ConstantExpr))
+            )
+        if not self.precedence:
+            return not issubclass(child, (Var, Not))
+        if not issubclass(child, BinaryOperation):
+            return False
+        child_prec = PRECEDENCE[child]
+        parent_prec = PRECEDENCE[parent]
+        if child_prec != parent_prec:
+            return child_prec < parent_prec
+        return side == "right" or not issubclass(parent, ASSOCIATIVE)
+
+
+UNICODE = Style(
+    {cls: cls.INFIX_SYMBOL for cls in (And, Or, Implies, Iff, Xor, TrueExpr, FalseExpr)},
+    "¬",
+)
+
+LATEX = Style(
+    {
+        And: r"\land",
+        Or: r"\lor",
+        Implies: r"\rightarrow",
+        Iff: r"\leftrightarrow",
+        Xor: r"\oplus",
+        TrueExpr: r"\mathbf{T}",
+        FalseExpr: r"\mathbf{F}",
+    },
+    r"\lnot ",
+    (r"\left(", r"\right)"),
+    precedence=True,
+)
+
+
+class Renderer:
+    """
+    Renders formulas in one style, remembering each formula it was asked for.
+    Use one renderer for all steps of a proof, so that a step shown twice is
+    rendered once.
+    """
+    def __init__(self, style: Style = UNICODE):
+        self.style = style
+        self._memo: Dict[Expr, str] = {}
+
+    def render(self, expr: Expr) -> str:
+        text = self._memo.get(expr)
+        if text is None:
+            text = self._memo[expr] = self._render(expr, 0)
+        return text
+
+    def _render(self, node, depth):
+        """Render node by recursion, handing subtrees below RECURSION_DEPTH to _render_deep"""
+        cls = node.__class__
+        if cls is Var:
+            return node.name
+        if depth >= RECURSION_DEPTH:
+            return self._render_deep(node)
+        style = self.style
+        if cls is Not:
+            child = node.negated
+            text = self._render(child, depth + 1)
+            if child.__class__ in style.wrap_negated:
+                return f"{style.negation}{style.open}{text}{style.close}"
+            return style.negation + text
+        if cls in BINARY_CLASSES:
+            left, right = node.left, node.right
+            left_text = self._render(left, depth + 1)
+            if left.__class__ in style.wrap_left[cls]:
+                left_text = f"{style.open}{left_text}{style.close}"
+            right_text = self._render(right, depth + 1)
+            if right.__class__ in style.wrap_right[cls]:
+                right_text = f"{style.open}{right_text}{style.close}"
+            return f"{left_text} {style.symbols[cls]} {right_text}"
+        if isinstance(node, ConstantExpr):
+            return style.symbols[cls]
+        return cls.__name__
+
+    def _render_deep(self, expr):
+        """Render expr without recursion, appending to a single buffer"""
+        style = self.style
+        symbols = style.symbols
+        buffer = []
+        # Pieces of text, and nodes still to render, in reverse order
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if node.__class__ is str:
+                buffer.append(node)
+            elif isinstance(node, Var):
+                buffer.append(node.name)
+            elif isinstance(node, ConstantExpr):
+                buffer.append(symbols[node.__class__])
+            elif isinstance(node, Not):
+                buffer.append(style.negation)
+                self._push_operand(stack, node.negated, node, "negated")
+            elif isinstance(node, BinaryOperation):
+                self._push_operand(stack, node.right, node, "right")
+                stack.append(f" {symbols[node.__class__]} ")
+                self._push_operand(stack, node.left, node, "left")
+            else:
+                buffer.append(node.__class__.__name__)
+        return "".join(buffer)
+
+    def _push_operand(self, stack, child, parent, side):
+        # Pushed in reverse: the closing parenthesis comes out last
+        if self.style.needs_parens(child, parent, side):
+            stack.append(self.style.close)
+            stack.append(child)
+            stack.append(self.style.open)
+        else:
+            stack.append(child)
+
+
+def render(expr: Expr, style: Style = UNICODE) -> str:
+    """Render a single formula"""
+    return Renderer(style).render(expr)
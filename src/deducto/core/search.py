@@ -0,0 +1,306 @@
+"""
+Automated proof search.
+
+ProofSearch runs a weighted A* over formulas: every formula derived so far is
+a node, and applying an inference rule to known formulas, or an equivalence
+rule at any subpath of one, yields its successors. Derivations only ever add
+knowledge, so the search keeps a single growing set of known formulas instead
+of branching over whole proof states.
+
+The search matches formulas exactly: it runs with MODULO_AC off whatever the
+caller's setting, so that the rules it applies and its goal test agree, in
+the REPL and in server workers alike. A goal reached exactly is reached
+modulo AC too.
+"""
+import heapq
+import time
+from collections import defaultdict
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from deducto.core.ac import modulo_ac
+from deducto.core.expr import *
+from deducto.core.utils import children, postorder, set_path, subterms
+from deducto.rules.apply import RULES
+from deducto.solver import entails
+
+# Default budgets: expanded formulas, wall-clock seconds and stored formulas
+MAX_NODES = 20000
+TIMEOUT = 5.0
+MAX_FORMULAS = 200000
+
+# Weight of the heuristic against the derivation depth (weighted A*)
+HEURISTIC_WEIGHT = 2
+
+# Equivalence rules grouped by the node type they expect
+_REWRITES: Dict[type, List[Tuple[str, object]]] = {}
+
+def _rewrites_for(cls):
+    rewrites = _REWRITES.get(cls)
+    if rewrites is None:
+        rewrites = [
+            (rule.name, rule.func)
+            for rule in RULES.values()
+            if rule.kind == "equivalence" and issubclass(cls, rule.types[0])
+        ]
+        _REWRITES[cls] = rewrites
+    return rewrites
+
+
+class ProofSearch:
+    """
+    Search for a derivation of goal from a list of known formulas.
+    ---
+    :param premises: The formulas to start from, usually the current steps.
+    :param goal: The formula to derive.
+    :param max_nodes: Maximum number of formulas to expand.
+    :param timeout: Maximum number of seconds to search.
+    :param max_formulas: Maximum number of distinct formulas to keep.
+    :param precheck: Whether to reject goals that are not entailed before searching.
+    """
+    def __init__(self, premises: List[Expr], goal: Expr, max_nodes: int = MAX_NODES,
+                 timeout: float = TIMEOUT, max_formulas: int = MAX_FORMULAS,
+                 precheck: bool = True):
+        self.premises = list(premises)
+        self.goal = goal
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+        self.max_formulas = max_formulas
+        self.precheck = precheck
+
+        self.expanded = 0
+        self.elapsed = 0.0
+        self.reason = None  # why the search stopped
+        self.counterexample = None  # set when the goal is not entailed
+
+        # Derivations in discovery order: (formula, rule, premise indices, depth)
+        self._derived: List[Tuple[Expr, Optional[str], Tuple[int, ...], int]] = []
+        self._known: Dict[Expr, int] = {}
+        self._seen: Dict[Expr, int] = {}  # best depth queued so far
+        self._queue = []
+        self._tie = count()
+        self._found = None
+
+        # Known formulas indexed by the operands inference rules match on
+        self._implies_by_left = defaultdict(list)
+        self._implies_by_right = defaultdict(list)
+        self._or_by_left = defaultdict(list)
+
+        # Size and variables of every formula met, shared across subterms
+        self._measures: Dict[Expr, Tuple[int, frozenset]] = {}
+
+        # Conjunctions and disjunctions worth building from two known steps
+        self._wanted_and = defaultdict(list)
+        self._wanted_or = defaultdict(list)
+        for root in [goal, *self.premises]:
+            for node in postorder(root):
+                if isinstance(node, And):
+                    self._wanted_and[node.left].append(node)
+                    self._wanted_and[node.right].append(node)
+                elif isinstance(node, Or):
+                    self._wanted_or[node.left].append(node)
+                    self._wanted_or[node.right].append(node)
+
+        self._goal_size, self._goal_vars = self._measure(goal)
+        largest = max([self._goal_size] + [self._measure(p)[0] for p in self.premises])
+        self._max_size = 2 * largest + 4
+
+    def run(self) -> Optional[List[Tuple[Expr, str, List[int]]]]:
+        """
+        Run the search.
+        ---
+        :return: The new steps as (formula, rule, premise indices) triples, with
+                 indices numbered after the premises, or None if no proof was
+                 found within the budgets. self.reason says why it stopped.
+        """
+        with modulo_ac(False):
+            return self._run()
+
+    def _run(self):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        try:
+            if self.precheck and not self._entailed():
+                self.reason = "not entailed"
+                return None
+
+            for premise in self.premises:
+                if premise not in self._known:
+                    self._add(premise, None, (), 0)
+                else:
+                    self._derived.append((premise, None, (), 0))  # keep numbering
+            if self.goal in self._known:
+                self._found = self._known[self.goal]
+            for index in range(len(self._derived)):
+                if self._found is not None:
+                    break
+                if self._derived[index][1] is None and self._known[self._derived[index][0]] == index:
+                    self._expand(index)
+
+            while self._found is None:
+                if not self._queue:
+                    self.reason = "exhausted"
+                    return None
+                if self.expanded >= self.max_nodes:
+                    self.reason = "node budget"
+                    return None
+                if len(self._seen) >= self.max_formulas:
+                    self.reason = "memory budget"
+                    return None
+                if time.perf_counter() > deadline:
+                    self.reason = "time budget"
+                    return None
+
+                _, _, formula, rule, premises, depth = heapq.heappop(self._queue)
+                if formula in self._known:
+                    continue
+                index = self._add(formula, rule, premises, depth)
+                self.expanded += 1
+                self._expand(index)
+
+            self.reason = "found"
+            return self._extract(self._found)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def _entailed(self):
+        valid, self.counterexample = entails(self.premises, self.goal)
+        return valid
+
+    def _measure(self, expr):
+        measures = self._measures
+        if expr in measures:
+            return measures[expr]
+        for node in postorder(expr):
+            if node in measures:
+                continue
+            if isinstance(node, Var):
+                measures[node] = (1, frozenset((node.name,)))
+            elif isinstance(node, ConstantExpr):
+                measures[node] = (1, frozenset())
+            else:
+                size = 1
+                variables = frozenset()
+                for _, child in children(node):
+                    child_size, child_vars = measures[child]
+                    size += child_size
+                    variables |= child_vars
+                measures[node] = (size, variables)
+        return measures[expr]
+
+    def _heuristic(self, size, variables):
+        missing = len(self._goal_vars - variables)
+        extra = len(variables - self._goal_vars)
+        return abs(size - self._goal_size) + 2 * missing + extra
+
+    def _add(self, formula, rule, premises, depth=0):
+        index = len(self._derived)
+        self._derived.append((formula, rule, premises, depth))
+        self._known[formula] = index
+        if isinstance(formula, Implies):
+            self._implies_by_left[formula.left].append(index)
+            self._implies_by_right[formula.right].append(index)
+        elif isinstance(formula, Or):
+            self._or_by_left[formula.left].append(index)
+        if formula is self.goal:
+            self._found = index
+        return index
+
+    def _push(self, formula, rule, premises):
+        if self._found is not None or formula in self._known:
+            return
+        depth = 1 + max(self._derived[i][3] for i in premises)
+        if formula is self.goal:
+            self._found = self._add(formula, rule, premises, depth)
+            return
+        if self._seen.get(formula, depth + 1) <= depth:
+            return
+        size, variables = self._measure(formula)
+        if size > self._max_size:
+            return
+        self._seen[formula] = depth
+        priority = depth + HEURISTIC_WEIGHT * self._heuristic(size, variables)
+        heapq.heappush(self._queue, (priority, next(self._tie), formula, rule, premises, depth))
+
+    def _infer(self, rule, premises):
+        formulas = [self._derived[i][0] for i in premises]
+        try:
+            result = RULES[rule].func(*formulas)
+        except (TypeError, ValueError):
+            return
+        self._push(result, rule, premises)
+
+    def _expand(self, index):
+        formula = self._derived[index][0]
+        known = self._known
+        derived = self._derived
+
+        # Inference rules, pairing the formula with known partners
+        if isinstance(formula, Implies):
+            if formula.left in known:
+                self._infer("modus_ponens", (index, known[formula.left]))
+            negated = Not(formula.right)
+            if negated in known:
+                self._infer("modus_tollens", (index, known[negated]))
+            for j in self._implies_by_left.get(formula.right, ()):
+                self._infer("hypothetical_syllogism", (index, j))
+            for j in self._implies_by_right.get(formula.left, ()):
+                self._infer("hypothetical_syllogism", (j, index))
+        elif isinstance(formula, Or):
+            negated = Not(formula.left)
+            if negated in known:
+                self._infer("disjunctive_syllogism", (index, known[negated]))
+            for j in self._or_by_left.get(negated, ()):
+                self._infer("resolution", (index, j))
+            if isinstance(formula.left, Not):
+                for j in self._or_by_left.get(formula.left.negated, ()):
+                    self._infer("resolution", (j, index))
+        elif isinstance(formula, And):
+            self._infer("simplification", (index,))
+        elif isinstance(formula, Not):
+            for j in self._implies_by_right.get(formula.negated, ()):
+                self._infer("modus_tollens", (j, index))
+            for j in self._or_by_left.get(formula.negated, ()):
+                self._infer("disjunctive_syllogism", (j, index))
+        for j in self._implies_by_left.get(formula, ()):
+            self._infer("modus_ponens", (j, index))
+
+        # Build conjunctions and disjunctions that appear in the problem
+        for wanted in self._wanted_and.get(formula, ()):
+            if wanted.left in known and wanted.right in known:
+                self._infer("conjunction", (known[wanted.left], known[wanted.right]))
+        for wanted in self._wanted_or.get(formula, ()):
+            if wanted.left in known and wanted.right in known:
+                self._infer("addition", (known[wanted.left], known[wanted.right]))
+
+        # Equivalence rules at every subpath
+        for path, node in subterms(formula):
+            for rule, func in _rewrites_for(node.__class__):
+                try:
+                    result = func(node)
+                except (TypeError, ValueError):
+                    continue
+                if path:
+                    self._push(set_path(formula, path, result), f"{rule} at {'.'.join(path)}", (index,))
+                else:
+                    self._push(result, rule, (index,))
+                if self._found is not None:
+                    return
+
+    def _extract(self, target):
+        needed = set()
+        stack = [target]
+        while stack:
+            index = stack.pop()
+            if index in needed or self._derived[index][1] is None:
+                continue
+            needed.add(index)
+            stack.extend(self._derived[index][2])
+
+        numbering = {i: i for i in range(len(self.premises))}
+        steps = []
+        for index in sorted(needed):
+            formula, rule, premises, _ = self._derived[index]
+            numbering[index] = len(self.premises) + len(steps)
+            steps.append((formula, rule, [numbering[i] for i in premises]))
+        return steps
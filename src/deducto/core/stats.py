@@ -0,0 +1,125 @@
+"""
+Call counters and latency for commands and rules.
+
+Instrumented code calls STATS.record (or uses STATS.timed) with a category
+("command", "rule", "shape", ...) and a name. Each metric keeps the number
+of calls, successes and failures, the total time, and the most recent
+latencies for percentiles.
+
+Commands are always recorded. Every apply_rule call, by rule and by premise
+shape, is recorded only while STATS.rules is set (`stats on`, --profile), as
+timing it costs several times the call itself.
+"""
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Latencies kept per counter for percentiles
+SAMPLES = 10000
+
+
+class Metric:
+    __slots__ = ("calls", "ok", "failed", "total", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.ok = 0
+        self.failed = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, seconds: float, ok: bool):
+        self.calls += 1
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Latency below which the given fraction of recent calls fell"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "ok": self.ok,
+            "failed": self.failed,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls else 0.0,
+            "p95": self.percentile(0.95),
+        }
+
+
+def label(name) -> str:
+    """
+    The printed name of a metric. Names may be tuples, formatted only here,
+    such as a rule and its premise classes: "modus_ponens(Implies, Var)".
+    """
+    if isinstance(name, tuple):
+        head, *classes = name
+        return f"{head}({', '.join(cls.__name__ for cls in classes)})"
+    return name
+
+
+class Stats:
+    def __init__(self):
+        self.enabled = True
+        self.rules = False  # whether apply_rule records each call
+        self.counters: Dict[str, Dict] = {}
+
+    def record(self, category: str, name, seconds: float, ok: bool = True):
+        if not self.enabled:
+            return
+        counters = self.counters.setdefault(category, {})
+        counter = counters.get(name)
+        if counter is None:
+            counter = counters[name] = Metric()
+        counter.add(seconds, ok)
+
+    @contextmanager
+    def timed(self, category: str, name: str):
+        """Record the time of the block, counting an exception as a failure"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(category, name, time.perf_counter() - start, ok)
+
+    def reset(self):
+        self.counters.clear()
+
+    def to_dict(self) -> Dict:
+        return {
+            category: {label(name): counter.to_dict() for name, counter in counters.items()}
+            for category, counters in self.counters.items()
+        }
+
+    def dump(self, filepath: str):
+        with open(filepath, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def table(self) -> List[str]:
+        """Format the counters, slowest total first within each category"""
+        lines = [f"{'':<40} {'calls':>7} {'ok':>7} {'failed':>7} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9}"]
+        for category, counters in self.counters.items():
+            lines.append(f"{category}:")
+            for name, counter in sorted(counters.items(), key=lambda item: -item[1].total):
+                row = counter.to_dict()
+                lines.append(
+                    f"  {label(name):<38} {row['calls']:>7} {row['ok']:>7} {row['failed']:>7} "
+                    f"{row['total'] * 1000:>10.2f} {row['mean'] * 1000:>9.3f} {row['p95'] * 1000:>9.3f}"
+                )
+        return lines
+
+
+# Shared by the whole process
+STATS = Stats()
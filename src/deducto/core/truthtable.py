@@ -0,0 +1,147 @@
+"""
+Bit-parallel truth tables.
+
+Every variable is given a packed bit-vector (a Python int) whose k-th bit is
+its value under the k-th assignment, so a single bottom-up pass of bitwise
+operations over the Expr tree evaluates a formula under all assignments at
+once. Tables are processed in chunks of 2**CHUNK_VARIABLES assignments, which
+bounds memory and lets entailment checks stop at the first counterexample.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from deducto.core.expr import *
+from deducto.core.utils import postorder
+
+# Largest number of distinct variables a table is built for
+MAX_VARIABLES = 25
+
+# Assignments per chunk are 2**CHUNK_VARIABLES
+CHUNK_VARIABLES = 16
+
+_OPCODES = {
+    Not: "not",
+    And: "and",
+    Or: "or",
+    Implies: "implies",
+    Iff: "iff",
+    Xor: "xor",
+    TrueExpr: "true",
+    FalseExpr: "false",
+}
+
+
+def variables(*exprs: Expr) -> List[str]:
+    """Return the sorted names of the variables occurring in exprs"""
+    names = set()
+    for expr in exprs:
+        for node in postorder(expr):
+            if isinstance(node, Var):
+                names.add(node.name)
+    return sorted(names)
+
+def _compile(expr: Expr, names: List[str]):
+    # Flatten expr into a straight-line program over numbered registers
+    position = {name: i for i, name in enumerate(names)}
+    registers = {}
+    program = []
+    for node in postorder(expr):
+        if isinstance(node, Var):
+            program.append(("var", position[node.name], None))
+        elif isinstance(node, Not):
+            program.append(("not", registers[node.negated], None))
+        elif isinstance(node, BinaryOperation):
+            program.append((_OPCODES[node.__class__], registers[node.left], registers[node.right]))
+        else:
+            program.append((_OPCODES[node.__class__], None, None))
+        registers[node] = len(program) - 1
+    return program
+
+def _chunks(expr: Expr, names: List[str]):
+    """
+    Yield (offset, table) pairs: bit k of table is the value of expr under the
+    assignment numbered offset + k, where variable i is true in assignment a
+    iff bit i of a is set.
+    """
+    if len(names) > MAX_VARIABLES:
+        raise ValueError(f"Truth tables are limited to {MAX_VARIABLES} variables, got {len(names)}")
+    program = _compile(expr, names)
+
+    low = min(len(names), CHUNK_VARIABLES)
+    width = 1 << low
+    full = (1 << width) - 1
+    masks = []
+    for i in range(low):
+        half = 1 << i
+        mask = ((1 << half) - 1) << half
+        span = 2 * half
+        while span < width:
+            mask |= mask << span
+            span *= 2
+        masks.append(mask)
+
+    for chunk in range(1 << (len(names) - low)):
+        # Variables above the chunk size are constant within a chunk
+        values = masks + [full if chunk >> j & 1 else 0 for j in range(len(names) - low)]
+        registers = []
+        for op, a, b in program:
+            if op == "var":
+                registers.append(values[a])
+            elif op == "not":
+                registers.append(full ^ registers[a])
+            elif op == "and":
+                registers.append(registers[a] & registers[b])
+            elif op == "or":
+                registers.append(registers[a] | registers[b])
+            elif op == "implies":
+                registers.append((full ^ registers[a]) | registers[b])
+            elif op == "iff":
+                registers.append(full ^ (registers[a] ^ registers[b]))
+            elif op == "xor":
+                registers.append(registers[a] ^ registers[b])
+            elif op == "true":
+                registers.append(full)
+            else:
+                registers.append(0)
+        yield chunk * width, registers[-1]
+
+def evaluate(expr: Expr, names: Optional[List[str]] = None) -> int:
+    """
+    Return the whole truth table of expr as one int: bit k is the value of
+    expr under assignment k (see _chunks for the numbering).
+    """
+    names = variables(expr) if names is None else names
+    table = 0
+    for offset, chunk in _chunks(expr, names):
+        table |= chunk << offset
+    return table
+
+def _assignment(names: List[str], index: int) -> Dict[str, bool]:
+    return {name: bool(index >> i & 1) for i, name in enumerate(names)}
+
+def find_model(expr: Expr, names: Optional[List[str]] = None) -> Optional[Dict[str, bool]]:
+    """Return an assignment satisfying expr, or None if it is unsatisfiable"""
+    names = variables(expr) if names is None else names
+    for offset, chunk in _chunks(expr, names):
+        if chunk:
+            lowest = (chunk & -chunk).bit_length() - 1
+            return _assignment(names, offset + lowest)
+    return None
+
+def is_tautology(expr: Expr) -> bool:
+    return find_model(Not(expr)) is None
+
+def entails(premises: Iterable[Expr], goal: Expr) -> Tuple[bool, Optional[Dict[str, bool]]]:
+    """
+    Check whether goal is true under every assignment making all premises true.
+    ---
+    :return: (True, None) if it is, else (False, counterexample).
+    :raises ValueError: If there are more than MAX_VARIABLES variables.
+    """
+    counter = Not(goal)
+    for premise in reversed(list(premises)):
+        counter = And(premise, counter)
+    model = find_model(counter)
+    return model is None, model
+
+def format_assignment(assignment: Dict[str, bool]) -> str:
+    return ", ".join(f"{name} = {'T' if value else 'F'}" for name, value in assignment.items())
@@ -1,16 +1,22 @@
-from prompt_toolkit import PromptSession
-from prompt_toolkit.completion import WordCompleter
-
 from deducto.cli.parser import parse
+from deducto.core.expr import BinaryOperation, Not
+
 
+# The prompt helpers import prompt_toolkit on first use, so that code using
+# only the path and traversal helpers does not pay for it at startup
 
 def get_variables():
+    from prompt_toolkit import PromptSession
+
     session = PromptSession()
     variables = session.prompt("Variables: ").strip()
     # print("\033[F\033[K", end="")
     return [v.strip() for v in variables.split(",")]
 
 def get_premises(variables):
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import WordCompleter
+
     operators = ["->", "<->", "&", "|", "!", "^", "T", "F"]
     input_session = PromptSession(completer=WordCompleter(variables + operators, ignore_case=True))
     raw = input_session.prompt("Premises: ").strip()
@@ -18,6 +24,9 @@ def get_premises(variables):
     return [parse(p.strip()) for p in raw.split(",")] if raw else []
 
 def get_goal(variables):
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import WordCompleter
+
     operators = ["->", "<->", "&", "|", "!", "^", "T", "F"]
     input_session = PromptSession(completer=WordCompleter(variables + operators, ignore_case=True))
     goal = input_session.prompt("Goal: ").strip()
@@ -31,26 +40,56 @@ def resolve_path(expr, path):
     return expr
 
 def set_path(expr, path, new_value):
-    """Mutate a subexpression via a path"""
-    for attr in path[:-1]:
+    """
+    Return expr with the subexpression at path replaced by new_value.
+    Only the nodes along path are rebuilt; every other subtree is shared with expr.
+    """
+    spine = []
+    for attr in path:
+        spine.append(expr)
         expr = getattr(expr, attr)
-    setattr(expr, path[-1], new_value)
+    for node, attr in zip(reversed(spine), reversed(path)):
+        new_value = node.replace(**{attr: new_value})
+    return new_value
 
 def parse_path(path_str):
     """Convert '1.left.right' to (premise_index, ['left', 'right'])"""
     parts = path_str.split('.')
     return int(parts[0]) - 1, parts[1:]
 
-def all_paths(expr, prefix=""):
-    paths = []
-    if hasattr(expr, 'negated'):
-        path = f"{prefix}negated" if not prefix else f"{prefix}.negated"
-        paths.append(path)
-        paths.extend(all_paths(expr.negated, path))
-    elif hasattr(expr, 'left') and hasattr(expr, 'right'):
-        for attr in ["left", "right"]:
-            subexpr = getattr(expr, attr)
-            path = f"{prefix}{attr}" if not prefix else f"{prefix}.{attr}"
-            paths.append(path)
-            paths.extend(all_paths(subexpr, path))
-    return paths
+def all_paths(expr):
+    """Return the dotted path of every proper subexpression of expr, parents first"""
+    return ['.'.join(path) for path, _ in subterms(expr) if path]
+
+def children(expr):
+    """Return the direct subexpressions of expr as (attribute, node) pairs"""
+    if isinstance(expr, BinaryOperation):
+        return (("left", expr.left), ("right", expr.right))
+    if isinstance(expr, Not):
+        return (("negated", expr.negated),)
+    return ()
+
+def subterms(expr):
+    """Yield (path, node) for expr and every subexpression, parents first"""
+    stack = [((), expr)]
+    while stack:
+        path, node = stack.pop()
+        yield path, node
+        for attr, child in reversed(children(node)):
+            stack.append((path + (attr,), child))
+
+def postorder(expr):
+    """Yield each distinct subexpression of expr once, children before parents"""
+    seen = set()
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+            continue
+        if node in seen:
+            continue
+        seen.add(node)
+        stack.append((node, True))
+        for _, child in reversed(children(node)):
+            stack.append((child, False))
@@ -0,0 +1,510 @@
+"""
+Equality saturation over the equivalence rules.
+
+An e-graph stores many equivalent formulas at once. Every node ever added is
+a term with its own id, hash-consed on its operator and the ids of its
+children, and a union-find groups the ids into e-classes of terms known to be
+equivalent. A second table keyed on the canonical form of each node (children
+replaced by their class) restores congruence: two nodes with the same operator
+over the same classes end up in the same class. As in egg, merges only queue
+the classes involved, and rebuild repairs the table in one pass per
+iteration.
+
+The rewrite rules are the equivalence rules of deducto.rules.apply, read from
+the schemas in their docstrings ("a ∧ b ⇔ b ∧ a"). Each iteration first finds
+the matches of every rule, then adds the right-hand sides and merges. A rule
+that matches more than its limit in one iteration is banned for a few
+iterations, with the limit and the ban doubling each time, so rules such as
+commutativity and associativity cannot starve the others. Saturation also
+stops at an iteration, node or time budget.
+
+Every rewrite is kept as an edge from the left-hand side term to the
+right-hand side term. A rewrite chain between two terms of a class is a
+shortest path over those edges, where moving between two terms with the same
+operator costs the chains between their operands. Only edges in the direction
+of the rules are used, so every step of a chain is a rule applied as apply
+would apply it. The e-graph may prove two formulas equivalent using rules
+backwards; such formulas have no chain.
+"""
+import heapq
+import time
+from itertools import count
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from deducto.core.expr import *
+from deducto.core.proof import ProofStep, chain_steps
+from deducto.core.utils import postorder, resolve_path, set_path
+from deducto.rules.apply import RULES
+
+# Default budgets: iterations, nodes (terms) and wall-clock seconds
+MAX_ITERATIONS = 30
+MAX_NODES = 20000
+TIMEOUT = 2.0
+
+# Matches a rule may have in one iteration before it is banned, and for how
+# many iterations it is banned the first time
+MATCH_LIMIT = 1000
+BAN_LENGTH = 5
+
+# Most chain searches for operands nested within one another, which keeps
+# the recursion well below the interpreter limit
+MAX_NESTING = 150
+
+# Child attribute names by arity, for paths
+_ATTRS = {1: ("negated",), 2: ("left", "right")}
+
+
+def _compile_rules():
+    """(rule name, left pattern, right pattern) for every schema of an equivalence rule"""
+    from deducto.cli.parser import parse
+    rewrites = []
+    for rule in RULES.values():
+        if rule.kind != "equivalence":
+            continue
+        for form in rule.forms:
+            left, right = form.split("⇔")
+            rewrites.append((rule.name, parse(left), parse(right)))
+    return rewrites
+
+
+def _op(expr: Expr):
+    """The operator of a node: its class, or (Var, name) for variables"""
+    if isinstance(expr, Var):
+        return (Var, expr.name)
+    return expr.__class__
+
+
+class EGraph:
+    """
+    An e-graph of formulas.
+    ---
+    :param max_iterations: Most rule iterations run saturates.
+    :param max_nodes: Most terms the e-graph may hold.
+    :param timeout: Most seconds run may take.
+    :param match_limit: Matches per rule and iteration before the rule is banned.
+    :param ban_length: Iterations a rule is banned for the first time.
+    """
+    def __init__(self, max_iterations: int = MAX_ITERATIONS, max_nodes: int = MAX_NODES,
+                 timeout: float = TIMEOUT, match_limit: int = MATCH_LIMIT,
+                 ban_length: int = BAN_LENGTH):
+        self.max_iterations = max_iterations
+        self.max_nodes = max_nodes
+        self.timeout = timeout
+        self.match_limit = match_limit
+        self.ban_length = ban_length
+        self.rewrites = _compile_rules()
+
+        self.iterations = 0
+        self.elapsed = 0.0
+        self.reason = None  # why run stopped
+
+        # Terms by id: (operator, *child ids), and the id of each term
+        self._nodes: List[tuple] = []
+        self._ids: Dict[tuple, int] = {}
+        self._parent: List[int] = []  # union-find over ids
+        # Canonical node -> id of a term with that canonical form
+        self._hashcons: Dict[tuple, int] = {}
+        # Class id -> its canonical nodes (each with a term), and the nodes
+        # using the class as an operand
+        self._classes: Dict[int, Dict[tuple, int]] = {}
+        self._uses: Dict[int, List[Tuple[tuple, int]]] = {}
+        self._pending: List[int] = []
+        # Rewrites: left-hand side id -> {right-hand side id: rule}
+        self._edges: Dict[int, Dict[int, str]] = {}
+        # Scheduler state per rule name: (times banned, banned until)
+        self._bans: Dict[str, Tuple[int, int]] = {}
+        self._exprs: Dict[int, Expr] = {}
+        self._trees: Dict[int, dict] = {}  # chains from each term, see _tree
+        self._depth = 0  # trees being built, each waiting on the next
+        self._deadline = None  # when chain searches must stop
+        self._members = None
+
+    def __len__(self):
+        """Number of terms"""
+        return len(self._nodes)
+
+    @property
+    def num_classes(self) -> int:
+        return len(self._classes)
+
+    def find(self, i: int) -> int:
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def _canonical(self, node):
+        return (node[0], *(self.find(child) for child in node[1:]))
+
+    def _add_node(self, node: tuple) -> int:
+        """Return the id of a term, adding it if new"""
+        i = self._ids.get(node)
+        if i is not None:
+            return i
+        i = len(self._nodes)
+        self._nodes.append(node)
+        self._ids[node] = i
+        self._members = None
+        canonical = self._canonical(node)
+        existing = self._hashcons.get(canonical)
+        if existing is not None:
+            # Congruent to a known node: same class
+            self._parent.append(self.find(existing))
+            return i
+        self._parent.append(i)
+        self._hashcons[canonical] = i
+        self._classes[i] = {canonical: i}
+        self._uses[i] = []
+        for child in canonical[1:]:
+            self._uses[child].append((canonical, i))
+        return i
+
+    def add(self, expr: Expr) -> int:
+        """Add a formula and return the id of its term"""
+        ids = {}
+        for node in postorder(expr):
+            if isinstance(node, BinaryOperation):
+                ids[node] = self._add_node((node.__class__, ids[node.left], ids[node.right]))
+            elif isinstance(node, Not):
+                ids[node] = self._add_node((Not, ids[node.negated]))
+            else:
+                ids[node] = self._add_node((_op(node),))
+            self._exprs.setdefault(ids[node], node)
+        return ids[expr]
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the classes of two ids. Returns whether they were apart."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if len(self._uses[a]) < len(self._uses[b]):
+            a, b = b, a
+        self._parent[b] = a
+        self._classes[a].update(self._classes.pop(b))
+        self._uses[a].extend(self._uses.pop(b))
+        self._pending.append(a)
+        self._members = None
+        return True
+
+    def equivalent(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    def rebuild(self):
+        """Restore congruence after merges"""
+        while self._pending:
+            todo = {self.find(c) for c in self._pending}
+            self._pending.clear()
+            for c in todo:
+                self._repair(self.find(c))
+        for c, nodes in self._classes.items():
+            canonical = {}
+            for node, term in nodes.items():
+                canonical.setdefault(self._canonical(node), term)
+            self._classes[c] = canonical
+
+    def _repair(self, c):
+        uses = self._uses[c]
+        self._uses[c] = []
+        for node, _ in uses:
+            self._hashcons.pop(node, None)
+        seen = {}
+        for node, term in uses:
+            node = self._canonical(node)
+            if node in seen:
+                self.union(term, seen[node])
+            else:
+                seen[node] = term
+            self._hashcons[node] = term
+        self._uses[self.find(c)].extend(seen.items())
+
+    def _match(self, pattern: Expr, term: int, bindings: Dict[str, int]) -> Iterator[Dict[str, int]]:
+        """
+        Yield the extensions of bindings (pattern variable -> term id) under
+        which pattern matches some term of the class of term.
+        """
+        if isinstance(pattern, Var):
+            bound = bindings.get(pattern.name)
+            if bound is None:
+                yield {**bindings, pattern.name: term}
+            elif self.find(bound) == self.find(term):
+                yield bindings
+            return
+        op = pattern.__class__
+        for node, witness in list(self._classes[self.find(term)].items()):
+            if node[0] is not op:
+                continue
+            if isinstance(pattern, ConstantExpr):
+                yield bindings
+            elif isinstance(pattern, Not):
+                yield from self._match(pattern.negated, self._nodes[witness][1], bindings)
+            else:
+                operands = self._nodes[witness]
+                for left in self._match(pattern.left, operands[1], bindings):
+                    yield from self._match(pattern.right, operands[2], left)
+
+    def _instantiate(self, pattern: Expr, bindings: Dict[str, int]) -> int:
+        ids = {}
+        for node in postorder(pattern):
+            if isinstance(node, Var):
+                ids[node] = bindings[node.name]
+            elif isinstance(node, BinaryOperation):
+                ids[node] = self._add_node((node.__class__, ids[node.left], ids[node.right]))
+            elif isinstance(node, Not):
+                ids[node] = self._add_node((Not, ids[node.negated]))
+            else:
+                ids[node] = self._add_node((node.__class__,))
+        return ids[pattern]
+
+    def run(self, until=None) -> str:
+        """
+        Apply the rules until nothing changes, until() is true, or a budget
+        runs out.
+        ---
+        :return: The reason for stopping, also kept in self.reason:
+                 "saturated", "goal", "iteration budget", "node budget" or
+                 "time budget".
+        """
+        start = time.perf_counter()
+        deadline = self._deadline = start + self.timeout
+        try:
+            self.rebuild()
+            while True:
+                if until is not None and until():
+                    self.reason = "goal"
+                    break
+                if self.iterations >= self.max_iterations:
+                    self.reason = "iteration budget"
+                    break
+                if len(self._nodes) >= self.max_nodes:
+                    self.reason = "node budget"
+                    break
+                if time.perf_counter() > deadline:
+                    self.reason = "time budget"
+                    break
+                if not self._step(deadline):
+                    # The last iteration may still have reached the goal
+                    self.reason = "goal" if until is not None and until() else "saturated"
+                    break
+            return self.reason
+        finally:
+            self._deadline = None
+            self.elapsed += time.perf_counter() - start
+
+    def _step(self, deadline):
+        """
+        Run one iteration. Returns whether it changed the e-graph or left out
+        a banned rule, either of which makes another iteration worth running.
+        """
+        iteration = self.iterations
+        self.iterations += 1
+        roots = {}
+        for c, nodes in self._classes.items():
+            for node in nodes:
+                roots.setdefault(node[0], []).append(c)
+
+        matches = []
+        skipped = False
+        for rule, left, right in self.rewrites:
+            times, until = self._bans.get(rule, (0, 0))
+            if until > iteration:
+                skipped = True
+                continue
+            limit = self.match_limit << times
+            found = []
+            for c in dict.fromkeys(roots.get(left.__class__, ())):
+                for bindings in self._match(left, c, {}):
+                    found.append(bindings)
+                if len(found) > limit or time.perf_counter() > deadline:
+                    break
+            if len(found) > limit:
+                self._bans[rule] = (times + 1, iteration + (self.ban_length << times))
+                skipped = True
+                continue
+            matches.extend((rule, left, right, bindings) for bindings in found)
+            if time.perf_counter() > deadline:
+                break
+
+        changed = False
+        nodes = len(self._hashcons)
+        for rule, left, right, bindings in matches:
+            if len(self._nodes) >= self.max_nodes:
+                break
+            source = self._instantiate(left, bindings)
+            target = self._instantiate(right, bindings)
+            edges = self._edges.setdefault(source, {})
+            if target not in edges:
+                edges[target] = rule
+                self._members = None  # chain trees may miss the new edge
+            changed |= self.union(source, target)
+        changed |= len(self._hashcons) != nodes
+        self.rebuild()
+        return changed or skipped
+
+    def expr(self, term: int) -> Expr:
+        """The formula of a term"""
+        exprs = self._exprs
+        stack = [term]
+        while stack:
+            i = stack[-1]
+            if i in exprs:
+                stack.pop()
+                continue
+            op, *operands = self._nodes[i]
+            missing = [child for child in operands if child not in exprs]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            if isinstance(op, tuple):
+                exprs[i] = Var(op[1])
+            else:
+                exprs[i] = op(*(exprs[child] for child in operands))
+        return exprs[term]
+
+    def chain(self, source: int, target: int) -> Optional[List[Tuple[str, Tuple[str, ...]]]]:
+        """
+        Return a shortest list of (rule, path) rewrites turning the term
+        source into the term target, applying rules forwards only, or None if
+        the e-graph has no such chain or the search runs out of time. Outside
+        run, the search gets its own timeout.
+        """
+        if self.find(source) != self.find(target):
+            return None
+        if self._members is None:
+            self._members = {}
+            self._trees.clear()
+            for i, node in enumerate(self._nodes):
+                self._members.setdefault((self.find(i), node[0]), []).append(i)
+        deadline = self._deadline
+        if deadline is None:
+            self._deadline = time.perf_counter() + self.timeout
+        try:
+            return self._shortest(source, target)
+        finally:
+            if time.perf_counter() > self._deadline:
+                # Trees cut short would give wrong answers later
+                self._trees.clear()
+            self._deadline = deadline
+
+    def _shortest(self, source, target):
+        tree = self._trees.get(source)
+        if tree is None:
+            if self._depth >= MAX_NESTING:
+                return None
+            self._depth += 1
+            try:
+                tree = self._tree(source)
+            finally:
+                self._depth -= 1
+        if target not in tree:
+            return None
+        chain = []
+        while target != source:
+            target, rewrites = tree[target]
+            chain[:0] = rewrites
+        return chain
+
+    def _tree(self, source):
+        """
+        Shortest forward chains from source to every term it can reach: each
+        reached term maps to the term before it and the rewrites in between.
+        """
+        best = {source: 0}
+        # Installed at once: a class can hold a term built on a term of the
+        # same class, and chains within it then see the terms reached so far
+        tree = self._trees[source] = {source: None}
+        tie = count()
+        queue = [(0, next(tie), source)]
+        while queue:
+            if time.perf_counter() > self._deadline:
+                break
+            cost, _, term = heapq.heappop(queue)
+            if cost > best[term]:
+                continue
+            for nxt, rewrites in self._moves(term):
+                total = cost + len(rewrites)
+                if total < best.get(nxt, total + 1):
+                    best[nxt] = total
+                    tree[nxt] = (term, rewrites)
+                    heapq.heappush(queue, (total, next(tie), nxt))
+        return tree
+
+    def _moves(self, term):
+        """Terms reachable from term in one rewrite or by rewriting its operands"""
+        for nxt, rule in self._edges.get(term, {}).items():
+            yield nxt, [(rule, ())]
+        node = self._nodes[term]
+        if len(node) == 1:
+            return
+        for other in self._members.get((self.find(term), node[0]), ()):
+            if other == term:
+                continue
+            operands = self._nodes[other][1:]
+            if any(self.find(a) != self.find(b) for a, b in zip(node[1:], operands)):
+                continue
+            rewrites = []
+            for attr, a, b in zip(_ATTRS[len(operands)], node[1:], operands):
+                if a == b:
+                    continue
+                sub = self._shortest(a, b)
+                if sub is None:
+                    break
+                rewrites.extend((rule, (attr, *path)) for rule, path in sub)
+            else:
+                yield other, rewrites
+
+    def explain(self, source: int, target: int) -> List[Tuple[str, Expr]]:
+        """
+        Return the steps of a shortest forward rewrite chain between two terms.
+        ---
+        :return: (rule, formula) pairs, one per step, where rule is the rule
+                 name followed by " at <path>" for rewrites below the root,
+                 as written by apply on a subpath.
+        :raises ValueError: If the terms are not known to be equivalent, or no
+                            chain applies the rules forwards.
+        """
+        if self.find(source) != self.find(target):
+            raise ValueError("The formulas are not known to be equivalent")
+        chain = self.chain(source, target)
+        if chain is None:
+            raise ValueError("The formulas are equivalent, but no chain applying the rules forwards was found")
+        steps = []
+        current = self.expr(source)
+        for rule, path in chain:
+            current = set_path(current, path, RULES[rule].func(resolve_path(current, path)))
+            steps.append((f"{rule} at {'.'.join(path)}" if path else rule, current))
+        return steps
+
+
+def equivalent(a: Expr, b: Expr, **limits) -> bool:
+    """
+    Whether the equivalence rules, used in either direction, rewrite a into
+    b within the budgets. Keyword arguments are passed on to EGraph.
+    """
+    egraph = EGraph(**limits)
+    source, target = egraph.add(a), egraph.add(b)
+    egraph.run(lambda: egraph.equivalent(source, target))
+    return egraph.equivalent(source, target)
+
+def proof_steps(expr: Expr, goal: Expr, premise: int, first: int, **limits) -> List[ProofStep]:
+    """
+    Return the steps rewriting a proof step into goal with equivalence rules.
+    ---
+    :param expr: The formula of the step.
+    :param premise: The index of that step.
+    :param first: The index the first returned step will have.
+    :raises ValueError: As EGraph.explain, with the reason saturation stopped.
+    """
+    egraph = EGraph(**limits)
+    source, target = egraph.add(expr), egraph.add(goal)
+    # Equivalence may be found before the rewrites a forward chain needs
+    if egraph.run(lambda: egraph.chain(source, target) is not None) == "goal":
+        return chain_steps(egraph.explain(source, target), premise, first)
+    if egraph.equivalent(source, target):
+        problem = "The formulas are equivalent, but no chain applying the rules forwards was found"
+    else:
+        problem = "The formulas are not known to be equivalent"
+    raise ValueError(f"{problem} ({egraph.reason} after {egraph.iterations} iterations, {len(egraph)} nodes)")
@@ -0,0 +1,56 @@
+"""
+Background LaTeX exports for the interactive session.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from deducto.core.proof import ProofState
+
+
+class TexExporter:
+    """
+    Compiles exports on a background thread so the session is not blocked
+    while pdflatex runs. The document is built when the export is submitted,
+    so later edits to the proof do not leak into it. pylatex is only
+    imported by the first export.
+    """
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tex")
+        self._pending: List[Tuple[str, Future]] = []
+
+    def submit(self, proofs: List[ProofState], filepath: str, titles: Optional[List[str]] = None) -> Future:
+        from deducto.export import tex
+
+        doc = tex.build_document(proofs, titles)
+        future = self._executor.submit(tex.compile_pdf, doc, filepath, self.cache_dir)
+        self._pending.append((filepath, future))
+        return future
+
+    @staticmethod
+    def _message(filepath, future):
+        try:
+            cached = future.result()
+        except Exception as e:
+            return f"✗ Export to {filepath}.pdf failed: {e}"
+        source = " (cached)" if cached else ""
+        return f"✓ Exported to {filepath}.tex and {filepath}.pdf{source}"
+
+    def finished(self) -> List[str]:
+        """Return messages for exports that completed since the last call"""
+        messages = []
+        pending = []
+        for filepath, future in self._pending:
+            if future.done():
+                messages.append(self._message(filepath, future))
+            else:
+                pending.append((filepath, future))
+        self._pending = pending
+        return messages
+
+    def close(self) -> List[str]:
+        """Wait for every export still running and return their messages"""
+        self._executor.shutdown(wait=True)
+        messages = [self._message(filepath, future) for filepath, future in self._pending]
+        self._pending = []
+        return messages
@@ -1,58 +1,107 @@
-from pylatex import Command, Document, Section
+import functools
+import hashlib
+import os
+import shutil
+from typing import List, Optional
+
+from pylatex import Command, Document, Section, Subsection
 from pylatex.utils import NoEscape, bold
 
 from deducto.core.proof import ProofState
+from deducto.core.render import LATEX, Renderer
 
+# Compiled PDFs are kept here, named by the SHA-256 of their LaTeX source
+CACHE_DIR = os.environ.get(
+    "DEDUCTO_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "deducto", "pdf")
+)
+
+
+def format_expr(expr, renderer: Renderer = None):
+    if expr is None:
+        return "None"
+    return (renderer or Renderer(LATEX)).render(expr)
 
-def format_expr(expr):
-    return (
-        str(expr)
-        .replace("¬", r"\lnot ")
-        .replace("∨", r"\lor ")
-        .replace("∧", r"\land ")
-        .replace("→", r"\rightarrow")
-        .replace("↔", r"\leftrightarrow ")
-        # .replace("∀", r"\forall ")
-        # .replace("∃", r"\exists ")
-        # .replace("⊥", r"\bot ")
-        # .replace("⊤", r"\top ")
-        .replace("(", r"\left(")
-        .replace(")", r"\right)")
-        .replace("𝗧", r"\mathbf{T}")
-        .replace("𝗙", r"\mathbf{F}")
-    )
-
-
-def export_tex(proof: ProofState, filepath: str):
-    doc = Document()
 
+def add_proof(doc: Document, proof: ProofState, section=Section, label="eq"):
+    """Append the assumptions and steps of a proof to doc"""
+    renderer = Renderer(LATEX)
     # Assumptions section
-    with doc.create(Section("Assumptions")):
+    with doc.create(section("Assumptions")):
         for i, step in enumerate(proof.steps[: len(proof.assumptions)]):
-            expr = format_expr(step.result)
+            expr = format_expr(step.result, renderer)
             doc.append(NoEscape(r"\begin{equation}"))
             doc.append(NoEscape(expr))
-            doc.append(NoEscape(rf"\label{{eq:{i + 1}}}"))
+            doc.append(NoEscape(rf"\label{{{label}:{i + 1}}}"))
             doc.append(NoEscape(r"\end{equation}"))
-        doc.append(NoEscape(rf"\textbf{{Goal}}: ${format_expr(proof.goal)}$"))
+        doc.append(NoEscape(rf"\textbf{{Goal}}: ${format_expr(proof.goal, renderer)}$"))
 
     # Proof Steps
-    with doc.create(Section("Proof Steps")):
+    with doc.create(section("Proof Steps")):
         for i, step in enumerate(
             proof.steps[len(proof.assumptions) :], start=len(proof.assumptions) + 1
         ):
-            premise_refs = [rf"\ref{{eq:{j + 1}}}" for j in step.premises]
+            premise_refs = [rf"\ref{{{label}:{j + 1}}}" for j in step.premises]
             doc.append(
                 NoEscape(
                     rf"\textbf{i-len(proof.assumptions)}. {step.rule.replace('_', ' ').capitalize()} of {', '.join(premise_refs)}"
                 )
             )
             doc.append(NoEscape(r"\begin{equation}"))
-            doc.append(NoEscape(format_expr(step.result)))
-            doc.append(NoEscape(rf"\label{{eq:{i}}}"))
+            doc.append(NoEscape(format_expr(step.result, renderer)))
+            doc.append(NoEscape(rf"\label{{{label}:{i}}}"))
             doc.append(NoEscape(r"\end{equation}"))
         doc.append(NoEscape(r"\hfill"))
         doc.append(bold("QED"))
 
-    doc.generate_tex(filepath)
-    doc.generate_pdf(filepath, clean_tex=True)
+
+def build_document(proofs: List[ProofState], titles: Optional[List[str]] = None) -> Document:
+    """
+    Put one or more proofs into a single document. A lone proof is laid out
+    as before; several get a section each, titled from titles if given.
+    """
+    doc = Document()
+    if len(proofs) == 1:
+        add_proof(doc, proofs[0])
+        return doc
+    for k, proof in enumerate(proofs, 1):
+        title = titles[k - 1] if titles else f"Proof {k}"
+        with doc.create(Section(title)):
+            # Subsection labels would repeat across proofs
+            add_proof(doc, proof, functools.partial(Subsection, label=False), f"eq{k}")
+    return doc
+
+
+def _compile(doc: Document, filepath: str):
+    doc.generate_pdf(filepath, clean_tex=False)
+
+
+def compile_pdf(doc: Document, filepath: str, cache_dir: str = None) -> bool:
+    """
+    Write filepath.tex and filepath.pdf, running the LaTeX compiler only if
+    the same source has not been compiled before.
+    ---
+    :return: True if the PDF came from the cache.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    source = doc.dumps()
+    cached = os.path.join(cache_dir, hashlib.sha256(source.encode("utf-8")).hexdigest() + ".pdf")
+    with open(filepath + ".tex", "w", encoding="utf-8") as f:
+        f.write(source)
+    if os.path.exists(cached):
+        shutil.copyfile(cached, filepath + ".pdf")
+        return True
+    _compile(doc, filepath)
+    os.makedirs(cache_dir, exist_ok=True)
+    partial = f"{cached}.{os.getpid()}.tmp"
+    shutil.copyfile(filepath + ".pdf", partial)
+    os.replace(partial, cached)
+    return False
+
+
+def export_tex_batch(proofs: List[ProofState], filepath: str, titles: Optional[List[str]] = None) -> bool:
+    """Export several proofs into one document, compiled once"""
+    return compile_pdf(build_document(proofs, titles), filepath)
+
+
+def export_tex(proof: ProofState, filepath: str) -> bool:
+    return export_tex_batch([proof], filepath)
@@ -1,15 +1,17 @@
 from deducto.core.proof import ProofState
+from deducto.core.render import Renderer
 
 
 def export_txt(proof: ProofState, filepath: str):
     lines = []
+    renderer = Renderer()
 
     # Assumptions section
     lines.append("ASSUMPTIONS:")
     for i, step in enumerate(proof.steps[: len(proof.assumptions)]):
-        lines.append(f"{i + 1}: {step.result}")
+        lines.append(f"{i + 1}: {renderer.render(step.result)}")
     lines.append("")
-    lines.append(f"GOAL: {proof.goal}")
+    lines.append(f"GOAL: {renderer.render(proof.goal) if proof.goal is not None else None}")
     lines.append("")
 
     # Proof steps
@@ -23,7 +25,7 @@ def export_txt(proof: ProofState, filepath: str):
         lines.append(
             f"{step_index}. {rule_name} of {', '.join(premise_refs)}"
         )
-        lines.append(f"{i}: {step.result}")
+        lines.append(f"{i}: {renderer.render(step.result)}")
         lines.append("")
 
     lines.append("QED")
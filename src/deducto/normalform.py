@@ -0,0 +1,349 @@
+"""
+Negation, conjunctive and disjunctive normal forms.
+
+A Normalizer converts formulas in one pass over their distinct subtrees. All
+intermediate results go into a single memo table keyed on (stage, node), so a
+subtree shared by several parts of a formula, or by several formulas given to
+the same normalizer, is rewritten once. Results are hash-consed like any other
+formula, so shared subtrees stay shared in the output too.
+
+The conversions follow the equivalence rules of deducto.rules.equivalence
+exactly: implications, biconditionals and exclusive ors are expanded with
+material_implication, biconditional_elimination and xor_decomposition,
+negations are pushed inward with demorgan_and, demorgan_or and negation, and
+distribution uses distributive_or (distributive_and for DNF), after
+commutative_or (commutative_and) when the conjunction is on the left. Constants
+are left in place. Normalizer.trace replays the same rewrites one at a time,
+which gives the proof steps of a conversion.
+
+Distribution can multiply the size of a formula. When the CNF of a formula
+would have more clauses than the budget, to_cnf names the oversized
+disjuncts with fresh variables instead (a definitional, or Tseitin, CNF). That
+CNF is satisfiable exactly when the input is, but it is not equivalent to it,
+so it has no trace. DNF has no such fallback and raises ValueError.
+"""
+from typing import Dict, List, Tuple
+
+from deducto.core.expr import *
+from deducto.core.proof import ProofStep, chain_steps
+from deducto.core.utils import postorder, resolve_path, set_path
+from deducto.rules import equivalence
+
+# Most clauses (terms, for DNF) distribution may produce
+CLAUSE_BUDGET = 10000
+
+# Prefix of the variables introduced by definitional CNF
+FRESH_PREFIX = "_t"
+
+FORMS = ("nnf", "cnf", "dnf")
+
+# Operators rewritten away, and the rule doing it
+EXPANSIONS = {
+    Implies: "material_implication",
+    Iff: "biconditional_elimination",
+    Xor: "xor_decomposition",
+}
+
+# (outer, inner, distribution rule, commutation rule) of each form
+SHAPES = {
+    "cnf": (And, Or, "distributive_or", "commutative_or"),
+    "dnf": (Or, And, "distributive_and", "commutative_and"),
+}
+
+
+class Normalizer:
+    """
+    Converts formulas to normal form, remembering every rewritten subtree.
+    Reuse one normalizer for formulas that share subtrees.
+    ---
+    :param budget: Most clauses (terms, for DNF) distribution may produce.
+    """
+    def __init__(self, budget: int = CLAUSE_BUDGET):
+        self.budget = budget
+        self._memo: Dict[tuple, object] = {}
+        # Fresh variable name -> the NNF subformula it stands for
+        self.definitions: Dict[str, Expr] = {}
+
+    def nnf(self, expr: Expr) -> Expr:
+        return self._evaluate(("nnf", expr, False))
+
+    def cnf(self, expr: Expr) -> Expr:
+        """
+        Return a CNF equivalent to expr, or, when that needs more clauses than
+        the budget, an equisatisfiable CNF over fresh variables recorded in
+        definitions.
+        """
+        nnf = self.nnf(expr)
+        if self.size("cnf", nnf) <= self.budget:
+            return self._evaluate(("cnf", nnf))
+        return self._definitional(nnf)
+
+    def dnf(self, expr: Expr) -> Expr:
+        """
+        Return a DNF equivalent to expr.
+        ---
+        :raises ValueError: If it would have more terms than the budget.
+        """
+        nnf = self.nnf(expr)
+        self._check_budget("dnf", nnf)
+        return self._evaluate(("dnf", nnf))
+
+    def size(self, form: str, nnf: Expr) -> int:
+        """Number of clauses (terms) of the form of an NNF, capped just above the budget"""
+        return self._evaluate(("size", form, nnf))
+
+    def _check_budget(self, form, nnf):
+        if self.size(form, nnf) > self.budget:
+            unit = "clauses" if form == "cnf" else "terms"
+            raise ValueError(f"The {form.upper()} would have more than {self.budget} {unit}")
+
+    def _evaluate(self, root):
+        """
+        Compute the memo entry for root without recursion. Each key has a plan:
+        ("value", v), ("alias", key), ("build", func, key, key) applying func
+        to two other entries, or ("then", func, key, key), whose entry is that
+        of the key func returns for two other entries.
+        """
+        memo = self._memo
+        plans = {}
+        stack = [root]
+        while stack:
+            key = stack[-1]
+            if key in memo:
+                stack.pop()
+                continue
+            plan = plans.get(key)
+            if plan is None:
+                plan = plans[key] = self._plan(key)
+            kind = plan[0]
+            if kind == "value":
+                memo[key] = plan[1]
+                stack.pop()
+            elif kind == "alias":
+                if plan[1] in memo:
+                    memo[key] = memo[plan[1]]
+                    stack.pop()
+                else:
+                    stack.append(plan[1])
+            else:
+                func, first, second = plan[1:]
+                missing = [k for k in (second, first) if k not in memo]
+                if missing:
+                    stack.extend(missing)
+                elif kind == "build":
+                    memo[key] = func(memo[first], memo[second])
+                    stack.pop()
+                else:
+                    plans[key] = ("alias", func(memo[first], memo[second]))
+        return memo[root]
+
+    def _plan(self, key):
+        stage = key[0]
+        if stage == "nnf":
+            _, node, negated = key
+            if isinstance(node, (Var, ConstantExpr)):
+                return ("value", Not(node) if negated else node)
+            if isinstance(node, Not):
+                return ("alias", ("nnf", node.negated, not negated))
+            if isinstance(node, (And, Or)):
+                cls = node.__class__
+                if negated:
+                    cls = Or if cls is And else And
+                return ("build", cls, ("nnf", node.left, negated), ("nnf", node.right, negated))
+            rule = getattr(equivalence, EXPANSIONS[node.__class__])
+            return ("alias", ("nnf", rule(node), negated))
+
+        if stage == "size":
+            _, form, node = key
+            outer, inner = SHAPES[form][:2]
+            cap = self.budget + 1
+            if isinstance(node, outer):
+                return ("build", lambda a, b: min(cap, a + b), ("size", form, node.left), ("size", form, node.right))
+            if isinstance(node, inner):
+                return ("build", lambda a, b: min(cap, a * b), ("size", form, node.left), ("size", form, node.right))
+            return ("value", 1)
+
+        if stage == "dist":
+            # Distribute the inner operator over two formulas already in form
+            _, form, left, right = key
+            outer = SHAPES[form][0]
+            if isinstance(right, outer):
+                return ("build", outer, ("dist", form, left, right.left), ("dist", form, left, right.right))
+            if isinstance(left, outer):
+                return ("build", outer, ("dist", form, right, left.left), ("dist", form, right, left.right))
+            return ("value", SHAPES[form][1](left, right))
+
+        # "cnf" or "dnf" of an NNF
+        form, node = key
+        outer, inner = SHAPES[form][:2]
+        if isinstance(node, outer):
+            return ("build", outer, (form, node.left), (form, node.right))
+        if isinstance(node, inner):
+            return ("then", lambda a, b: ("dist", form, a, b), (form, node.left), (form, node.right))
+        return ("value", node)
+
+    def _definitional(self, nnf):
+        """
+        CNF of an NNF in which every disjunct whose CNF is not a single clause
+        is replaced by a fresh variable t, with clauses for t → disjunct. The
+        result grows linearly with the NNF.
+        """
+        taken = {node.name for node in postorder(nnf) if isinstance(node, Var)}
+        names: Dict[Expr, Var] = {}
+        clauses = self._encode(nnf, names, taken)
+        # Defining a variable can name further subformulas
+        pending = list(names)
+        while pending:
+            known = len(names)
+            for node in pending:
+                for clause in self._encode(node, names, taken):
+                    clauses.append(Or(Not(names[node]), clause))
+            pending = list(names)[known:]
+        return conjunction(clauses)
+
+    def _encode(self, nnf, names, taken):
+        """The clauses of the CNF of an NNF, naming oversized disjuncts"""
+        clauses = []
+        stack = [nnf]
+        while stack:
+            node = stack.pop()
+            if self.size("cnf", node) == 1:
+                clauses.append(self._evaluate(("cnf", node)))
+            elif isinstance(node, And):
+                stack.append(node.right)
+                stack.append(node.left)
+            else:
+                clauses.append(Or(*(self._literal(child, names, taken) for child in (node.left, node.right))))
+        return clauses
+
+    def _literal(self, node, names, taken):
+        """node itself if its CNF is one clause, otherwise the variable naming it"""
+        if self.size("cnf", node) == 1:
+            return self._evaluate(("cnf", node))
+        name = names.get(node)
+        if name is None:
+            n = len(self.definitions) + 1
+            while f"{FRESH_PREFIX}{n}" in taken:
+                n += 1
+            name = names[node] = Var(f"{FRESH_PREFIX}{n}")
+            taken.add(name.name)
+            self.definitions[name.name] = node
+        return name
+
+    def trace(self, expr: Expr, form: str) -> List[Tuple[str, Expr]]:
+        """
+        Rewrite expr into a normal form one rule application at a time.
+        ---
+        :param form: "nnf", "cnf" or "dnf".
+        :return: (rule, formula) pairs, one per step, where rule is the rule
+                 name followed by " at <path>" for rewrites below the root,
+                 as written by apply on a subpath.
+        :raises ValueError: If form is unknown, or distribution would go over
+                            the budget (definitional CNF is not equivalent).
+        """
+        if form not in FORMS:
+            raise ValueError(f"Unknown normal form '{form}', expected one of {', '.join(FORMS)}")
+        if form != "nnf":
+            self._check_budget(form, self.nnf(expr))
+        steps = []
+        current = expr
+
+        def rewrite(rule, path):
+            nonlocal current
+            result = getattr(equivalence, rule)(resolve_path(current, path))
+            current = set_path(current, path, result)
+            steps.append((f"{rule} at {'.'.join(path)}" if path else rule, current))
+            return result
+
+        stack = [()]
+        while stack:
+            path = stack.pop()
+            node = resolve_path(current, path)
+            if node.__class__ in EXPANSIONS:
+                rewrite(EXPANSIONS[node.__class__], path)
+                stack.append(path)
+            elif isinstance(node, (And, Or)):
+                stack.append(path + ("right",))
+                stack.append(path + ("left",))
+            elif isinstance(node, Not):
+                inner = node.negated
+                if inner.__class__ in EXPANSIONS:
+                    rewrite(EXPANSIONS[inner.__class__], path + ("negated",))
+                    stack.append(path)
+                elif isinstance(inner, (Not, And, Or)):
+                    rule = {Not: "negation", And: "demorgan_and", Or: "demorgan_or"}[inner.__class__]
+                    rewrite(rule, path)
+                    stack.append(path)
+
+        if form == "nnf":
+            return steps
+        outer, inner, distribute, commute = SHAPES[form]
+        stack = [("visit", ())]
+        while stack:
+            action, path = stack.pop()
+            node = resolve_path(current, path)
+            if action == "visit":
+                if isinstance(node, (outer, inner)):
+                    if isinstance(node, inner):
+                        stack.append(("dist", path))
+                    stack.append(("visit", path + ("right",)))
+                    stack.append(("visit", path + ("left",)))
+            elif isinstance(node.right, outer) or isinstance(node.left, outer):
+                if not isinstance(node.right, outer):
+                    rewrite(commute, path)
+                rewrite(distribute, path)
+                stack.append(("dist", path + ("right",)))
+                stack.append(("dist", path + ("left",)))
+        return steps
+
+
+def conjuncts(expr: Expr) -> List[Expr]:
+    """The operands of a tree of conjunctions, left to right"""
+    result = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, And):
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            result.append(node)
+    return result
+
+def conjunction(operands: List[Expr]) -> Expr:
+    """Join formulas into a right-nested conjunction, T if there are none"""
+    if not operands:
+        return TrueExpr()
+    result = operands[-1]
+    for operand in reversed(operands[:-1]):
+        result = And(operand, result)
+    return result
+
+def to_nnf(expr: Expr) -> Expr:
+    return Normalizer().nnf(expr)
+
+def to_cnf(expr: Expr, budget: int = CLAUSE_BUDGET) -> Expr:
+    """
+    Return a CNF of expr. Past budget clauses, the CNF is definitional: it
+    uses fresh variables named _t1, _t2, ... and is only equisatisfiable.
+    """
+    return Normalizer(budget).cnf(expr)
+
+def to_dnf(expr: Expr, budget: int = CLAUSE_BUDGET) -> Expr:
+    """
+    Return a DNF of expr.
+    ---
+    :raises ValueError: If it would have more than budget terms.
+    """
+    return Normalizer(budget).dnf(expr)
+
+def proof_steps(expr: Expr, form: str, premise: int, first: int, budget: int = CLAUSE_BUDGET) -> List[ProofStep]:
+    """
+    Return the steps converting a proof step into a normal form.
+    ---
+    :param expr: The formula of the step.
+    :param premise: The index of that step.
+    :param first: The index the first returned step will have.
+    :raises ValueError: As Normalizer.trace.
+    """
+    return chain_steps(Normalizer(budget).trace(expr, form), premise, first)
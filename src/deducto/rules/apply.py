@@ -7,19 +7,44 @@ commutative_and, commutative_or, demorgan_and, demorgan_or, distributive_and,
 distributive_or, idempotent, identity_and, identity_or, material_implication,
 negation, xor_decomposition.
 """
+from deducto.core.ac import same
 from deducto.core.expr import *
+from deducto.core.index import StepIndex
+from deducto.core.stats import STATS
 from deducto.rules import inference, equivalence
-from typing import List
+from typing import Callable, Dict, List, NamedTuple, Tuple
 import inspect
 
+class Rule(NamedTuple):
+    name: str
+    func: Callable[..., Expr]
+    arity: int
+    kind: str                   # "inference" or "equivalence"
+    types: Tuple[type, ...]     # expected type of each premise
+    doc: str                    # cleaned docstring
+    forms: Tuple[str, ...]      # one schema per docstring line
+
+def _build_registry() -> Dict[str, Rule]:
+    registry = {}
+    for kind, module in (("inference", inference), ("equivalence", equivalence)):
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("_") or func.__module__ != module.__name__:
+                continue
+            params = inspect.signature(func).parameters.values()
+            types = tuple(
+                p.annotation if isinstance(p.annotation, type) else Expr
+                for p in params
+            )
+            doc = inspect.cleandoc(func.__doc__) if func.__doc__ else ""
+            forms = tuple(line.strip() for line in doc.splitlines() if line.strip())
+            registry[name] = Rule(name, func, len(types), kind, types, doc, forms)
+    return registry
+
+# Built once at import time; rule dispatch is a single lookup
+RULES: Dict[str, Rule] = _build_registry()
+
 def list_rules() -> List[str]:
-    rules = []
-    for module in [inference, equivalence]:
-        for name in dir(module):
-            obj = getattr(module, name)
-            if inspect.isfunction(obj) and not name.startswith("_"):
-                rules.append(name)
-    return rules
+    return list(RULES)
 
 def apply_rule(rule: str, premises: List[Expr]) -> Expr:
     """
@@ -29,42 +54,90 @@ def apply_rule(rule: str, premises: List[Expr]) -> Expr:
     :param premises: A list of premises (Expr objects).
     :return: The result of applying the rule, or None if not applicable.
     :raises ValueError: If the rule given does not exist (or at least is not implemented)
+    :raises TypeError: If the number of premises does not match the rule
     """
-    rules = list_rules()
-    # Check if the rule exists in the inference or equivalence modules
-    if rule in rules:
-        # Get the function object for the rule
-        rule_func = getattr(inference, rule, None) or getattr(equivalence, rule, None)
-        if rule_func:
-            # Call the function with the premises
-            return rule_func(*premises)
-
-    else:
+    if STATS.rules and rule in RULES:
+        shape = (rule, *(premise.__class__ for premise in premises))
+        with STATS.timed("rule", rule), STATS.timed("shape", shape):
+            return _checked(rule, premises)(*premises)
+    return _checked(rule, premises)(*premises)
+
+def _checked(rule, premises):
+    """The function of rule, once the rule and the number of premises are checked"""
+    entry = RULES.get(rule)
+    if entry is None:
         raise ValueError(f"Rule '{rule}' does not exist")
+    if len(premises) != entry.arity:
+        raise TypeError(f"Rule '{rule}' takes {entry.arity} premise(s), got {len(premises)}")
+    return entry.func
 
-# def list_applicable_rules(premises: List[Expr], goal: Expr):
-#     suggestions = []
-#     for i, a in enumerate(premises):
-#         for j, b in enumerate(premises):
-#             if i != j and isinstance(b, Implies) and a == b.premise and b.conclusion == goal:
-#                 suggestions.append(("modus_ponens", [i, j]))
-#         if isinstance(a, And):
-#             if a.left == goal:
-#                 suggestions.append(("and_elim_left", [i]))
-#             if a.right == goal:
-#                 suggestions.append(("and_elim_right", [i]))
-#         if isinstance(goal, And):
-#             for j, b in enumerate(premises):
-#                 if b == goal.left:
-#                     for k, c in enumerate(premises):
-#                         if c == goal.right:
-#                             suggestions.append(("and_intro", [j, k]))
-#         if isinstance(a, Iff):
-#             if goal == Implies(a.left, a.right):
-#                 suggestions.append(("iff_elim_left", [i]))
-#             if goal == Implies(a.right, a.left):
-#                 suggestions.append(("iff_elim_right", [i]))
-#     return suggestions
+def list_applicable_rules(steps: List, index: StepIndex, goal: Expr = None) -> List[Tuple[str, List[int], Expr]]:
+    """
+    Suggest rule applications on the given proof steps.
+    ---
+    :param steps: The proof steps, in order.
+    :param index: A StepIndex over the same steps.
+    :param goal: The goal, used to suggest building it and to rank suggestions.
+    :return: (rule, premise indices, result) triples for applications whose
+             result is not already a step, those reaching the goal first.
+    """
+    positions = {step: i for i, step in enumerate(steps)}
+    suggestions = []
+    produced = set()
+
+    def suggest(rule, *premises):
+        try:
+            result = RULES[rule].func(*(step.result for step in premises))
+        except (TypeError, ValueError):
+            return
+        if result in produced or index.equal_to(result):
+            return
+        produced.add(result)
+        suggestions.append((rule, [positions[step] for step in premises], result))
+
+    for step in steps:
+        formula = step.result
+        if isinstance(formula, Implies):
+            for partner in index.equal_to(formula.left):
+                suggest("modus_ponens", step, partner)
+            for partner in index.equal_to(Not(formula.right)):
+                suggest("modus_tollens", step, partner)
+            for partner in index.with_operand(Implies, "left", formula.right):
+                suggest("hypothetical_syllogism", step, partner)
+        elif isinstance(formula, Or):
+            negated = Not(formula.left)
+            for partner in index.equal_to(negated):
+                suggest("disjunctive_syllogism", step, partner)
+            for partner in index.with_operand(Or, "left", negated):
+                suggest("resolution", step, partner)
+        elif isinstance(formula, And):
+            suggest("simplification", step)
+
+    if isinstance(goal, (And, Or)):
+        rule = "conjunction" if isinstance(goal, And) else "addition"
+        left = next(iter(index.equal_to(goal.left)), None)
+        right = next(iter(index.equal_to(goal.right)), None)
+        if left is not None and right is not None:
+            suggest(rule, left, right)
+
+    # Equivalence rules that rewrite a step straight into the goal
+    if goal is not None:
+        for rule in RULES.values():
+            if rule.kind != "equivalence":
+                continue
+            # idempotent accepts any Expr but only rewrites And and Or
+            classes = (And, Or) if rule.types[0] is Expr else (rule.types[0],)
+            for cls in classes:
+                for step in index.of_type(cls):
+                    try:
+                        result = rule.func(step.result)
+                    except (TypeError, ValueError):
+                        continue
+                    if same(result, goal):
+                        suggest(rule.name, step)
+
+    suggestions.sort(key=lambda suggestion: not same(suggestion[2], goal))
+    return suggestions
 
 def get_rule_explanation(rule: str) -> str:
     """
@@ -74,41 +147,14 @@ def get_rule_explanation(rule: str) -> str:
     :return: The docstring of the rule
     :raises ValueError: If the rule given does not exist (or at least is not implemented)
     """
-    rules = list_rules()
-    # Check if the rule exists in the inference or equivalence modules
-    if rule in rules:
-        # Get the function object for the rule
-        rule_func = getattr(inference, rule, None) or getattr(equivalence, rule, None)
-        explanation = rule_func.__doc__
-        if explanation:
-            # Remove leading/trailing whitespace and newlines
-            explanation = explanation.strip()
-            return explanation
-        else:
-            return f"No explanation available for rule '{rule}'"
-    else:
+    entry = RULES.get(rule)
+    if entry is None:
         raise ValueError(f"Rule '{rule}' does not exist")
+    return entry.doc or f"No explanation available for rule '{rule}'"
 
 if __name__ == '__main__':
-    from deducto.parser import parse
-    from copy import deepcopy
-
-    def resolve_path(expr, path):
-        """Access a nested attribute path like ['left', 'right']"""
-        for attr in path:
-            expr = getattr(expr, attr)
-        return expr
-
-    def set_path(expr, path, new_value):
-        """Mutate a subexpression via a path"""
-        for attr in path[:-1]:
-            expr = getattr(expr, attr)
-        setattr(expr, path[-1], new_value)
-
-    def parse_path(path_str):
-        """Convert '1.left.right' to (premise_index, ['left', 'right'])"""
-        parts = path_str.split('.')
-        return int(parts[0]) - 1, parts[1:]
+    from deducto.cli.parser import parse
+    from deducto.core.utils import parse_path, resolve_path, set_path
 
     # Input variables
     variables = input("Enter variables (comma-separated): ").strip()
@@ -148,13 +194,12 @@ if __name__ == '__main__':
             for ref in targets:
                 if '.' in ref:
                     idx, path = parse_path(ref)
-                    expr = deepcopy(premises[idx])  # to avoid mutating the original
+                    expr = premises[idx]
                     subexpr = resolve_path(expr, path)
                     result = apply_rule(rule, [subexpr])
                     if result is None:
                         raise ValueError(f"Rule '{rule}' not applicable at {ref}")
-                    set_path(expr, path, result)
-                    results.append(expr)
+                    results.append(set_path(expr, path, result))
                 else:
                     idx = int(ref) - 1
                     results.append(premises[idx])
@@ -130,7 +130,7 @@ def identity_or(expr: Or) -> Expr:
     """
     if not isinstance(expr, Or):
         raise TypeError("Expected an instance of Or")
-    if expr.right != FalseExpr:
+    if expr.right != FalseExpr():
         raise ValueError("Right operand is not False")
     return expr.left
 
@@ -1,3 +1,4 @@
+from deducto.core.ac import same
 from deducto.core.expr import *
 
 def modus_ponens(implication: Implies, premise: Expr):
@@ -8,7 +9,7 @@ def modus_ponens(implication: Implies, premise: Expr):
     """
     if not isinstance(implication, Implies):
         raise TypeError("Invalid type for modus ponens: Expected Implies for implication")
-    if implication.left == premise:
+    if same(implication.left, premise):
         return implication.right
     raise TypeError("Premise does not match the left side of the implication")
 
@@ -22,7 +23,7 @@ def modus_tollens(implication: Implies, negation: Not):
         raise TypeError("Invalid type for modus tollens: Expected Implies for implication")
     if not isinstance(negation, Not):
         raise TypeError("Invalid type for modus tollens: Expected Not for negation")
-    if Not(implication.right) == negation:
+    if same(Not(implication.right), negation):
         return Not(implication.left)
     raise TypeError("Negation does not match the right side of the implication")
 
@@ -36,7 +37,7 @@ def hypothetical_syllogism(implication1: Implies, implication2: Implies):
         raise TypeError("Invalid type for hypothetical syllogism: Expected Implies for implication1")
     if not isinstance(implication2, Implies):
         raise TypeError("Invalid type for hypothetical syllogism: Expected Implies for implication2")
-    if implication1.right == implication2.left:
+    if same(implication1.right, implication2.left):
         return Implies(implication1.left, implication2.right)
     raise TypeError("The right side of implication1 does not match the left side of implication2")
 
@@ -50,7 +51,7 @@ def disjunctive_syllogism(disjunction: Or, negation: Not):
         raise TypeError("Invalid type for disjunctive syllogism: Expected Or for disjunction")
     if not isinstance(negation, Not):
         raise TypeError("Invalid type for disjunctive syllogism: Expected Not for negation")
-    if Not(disjunction.left) == negation:
+    if same(Not(disjunction.left), negation):
         return disjunction.right
     raise TypeError("Negation does not match the left side of the disjunction")
 
@@ -87,6 +88,6 @@ def resolution(disjunction1: Or, disjunction2: Or):
         raise TypeError("Invalid type for resolution: Expected Or for disjunction1")
     if not isinstance(disjunction2, Or):
         raise TypeError("Invalid type for resolution: Expected Or for disjunction2")
-    if Not(disjunction1.left) == disjunction2.left:
+    if same(Not(disjunction1.left), disjunction2.left):
         return Or(disjunction1.right, disjunction2.right)
     raise TypeError("The left side of disjunction1 does not match the negated left side of disjunction2")
@@ -0,0 +1,124 @@
+"""
+Simplification with the reducing equivalence rules.
+
+A Simplifier rewrites a formula bottom-up with idempotent, absorption_*,
+identity_*, domination_*, negation, contradiction and excluded_middle. When a
+rule only matches the mirrored form of a conjunction or disjunction (T ∧ a
+rather than a ∧ T), commutative_and or commutative_or is applied first.
+
+Every rule returns an operand, or an operand of an operand, of the node it
+rewrites, or a constant. Once the children of a node are simplified, one
+rewrite at the node therefore reaches the fixpoint, and each distinct subtree
+is simplified once. Results are kept per hash-consed subtree, so subtrees
+shared within a formula, or across formulas given to the same simplifier,
+are not simplified again.
+"""
+from typing import Dict, List, Tuple
+
+from deducto.core.expr import *
+from deducto.core.proof import ProofStep, chain_steps
+from deducto.core.utils import children, postorder, resolve_path, set_path
+from deducto.rules import equivalence
+
+# Rules tried on each kind of node, in order
+REDUCTIONS = {
+    And: ("domination_and", "contradiction", "identity_and", "idempotent", "absorption_and"),
+    Or: ("domination_or", "excluded_middle", "identity_or", "idempotent", "absorption_or"),
+    Not: ("negation",),
+}
+
+COMMUTATIONS = {And: "commutative_and", Or: "commutative_or"}
+
+
+class Simplifier:
+    """Simplifies formulas, remembering the result for every subtree"""
+    def __init__(self):
+        self._memo: Dict[Expr, Expr] = {}
+
+    def simplify(self, expr: Expr) -> Expr:
+        memo = self._memo
+        for node in postorder(expr):
+            if node in memo:
+                continue
+            simplified = self._rebuild(node)
+            for rule in self.reductions(simplified):
+                simplified = getattr(equivalence, rule)(simplified)
+            memo[node] = simplified
+        return memo[expr]
+
+    def _rebuild(self, node):
+        """node with its children replaced by their simplified forms"""
+        changed = {
+            attr: self._memo[child] for attr, child in children(node)
+            if self._memo[child] is not child
+        }
+        return node.replace(**changed) if changed else node
+
+    def reductions(self, node: Expr) -> List[str]:
+        """
+        Return the rules that rewrite node, whose children must already be
+        simplified: one reducing rule, maybe preceded by a commutation, or
+        none if node is simplified.
+        """
+        rule = self._reduction(node)
+        if rule is not None:
+            return [rule]
+        cls = node.__class__
+        if cls in COMMUTATIONS:
+            rule = self._reduction(cls(node.right, node.left))
+            if rule is not None:
+                return [COMMUTATIONS[cls], rule]
+        return []
+
+    def _reduction(self, node):
+        for rule in REDUCTIONS.get(node.__class__, ()):
+            try:
+                getattr(equivalence, rule)(node)
+            except (TypeError, ValueError):
+                continue
+            return rule
+        return None
+
+    def trace(self, expr: Expr) -> List[Tuple[str, Expr]]:
+        """
+        Simplify expr one rule application at a time, innermost first.
+        ---
+        :return: (rule, formula) pairs, one per step, where rule is the rule
+                 name followed by " at <path>" for rewrites below the root,
+                 as written by apply on a subpath.
+        """
+        self.simplify(expr)
+        memo = self._memo
+        steps = []
+        current = expr
+        stack = [((), False)]
+        while stack:
+            path, expanded = stack.pop()
+            node = resolve_path(current, path)
+            if not expanded:
+                if memo[node] is node:
+                    # Already simplified, as are all its subtrees
+                    continue
+                stack.append((path, True))
+                for attr, _ in reversed(children(node)):
+                    stack.append((path + (attr,), False))
+                continue
+            for rule in self.reductions(node):
+                node = getattr(equivalence, rule)(node)
+                current = set_path(current, path, node)
+                steps.append((f"{rule} at {'.'.join(path)}" if path else rule, current))
+        return steps
+
+
+def simplify(expr: Expr) -> Expr:
+    return Simplifier().simplify(expr)
+
+def proof_steps(expr: Expr, premise: int, first: int) -> List[ProofStep]:
+    """
+    Return the steps simplifying a proof step.
+    ---
+    :param expr: The formula of the step.
+    :param premise: The index of that step.
+    :param first: The index the first returned step will have.
+    """
+    return chain_steps(Simplifier().trace(expr), premise, first)
@@ -0,0 +1,3 @@
+from deducto.solver.cdcl import Solver, solve
+from deducto.solver.entailment import entails, find_model, is_satisfiable, is_tautology
+from deducto.solver.tseitin import CNF, tseitin
@@ -0,0 +1,373 @@
+"""
+Conflict-driven clause learning SAT solver.
+
+A compact MiniSat-style solver in pure Python: two watched literals per
+clause, first-UIP learning with local clause minimization, VSIDS branching
+with phase saving, Luby restarts, and LBD-based deletion of learned clauses.
+
+Clauses are given as lists of DIMACS literals. Internally literal v is 2v and
+-v is 2v + 1, so negation is a flip of the lowest bit.
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional
+
+RESTART_BASE = 100     # conflicts in the first restart interval
+VAR_DECAY = 0.95       # VSIDS activity decay
+LEARNT_GROWTH = 1.1    # learned clause budget growth after each reduction
+
+
+def luby(i: int) -> int:
+    """Return the i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+def _internal(literal: int) -> int:
+    return 2 * literal if literal > 0 else -2 * literal + 1
+
+
+class Solver:
+    """
+    Incremental CDCL solver. Clauses may be added between calls to solve.
+    ---
+    :param num_vars: Number of variables to allocate up front.
+    :param clauses: Initial clauses as lists of DIMACS literals.
+    """
+    def __init__(self, num_vars: int = 0, clauses: Iterable[List[int]] = ()):
+        self.num_vars = 0
+        self.model: Optional[Dict[int, bool]] = None
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+        self.restarts = 0
+
+        self._clauses: List[Optional[List[int]]] = []
+        self._learnts: Dict[int, int] = {}  # learned clause index -> LBD
+        self._max_learnts = 1000
+        self._watches: List[List[int]] = [[], []]
+        self._value: List[int] = [0, 0]  # per literal: 1 true, -1 false, 0 unassigned
+        self._level: List[int] = [0]
+        self._reason: List[int] = [-1]
+        self._activity: List[float] = [0.0]
+        self._phase: List[int] = [1]  # last polarity bit, negative by default
+        self._seen: List[bool] = [False]
+        self._heap = []
+        self._var_inc = 1.0
+        self._trail: List[int] = []
+        self._trail_lim: List[int] = []
+        self._qhead = 0
+        self._ok = True  # False once the clauses are known to be unsatisfiable
+
+        self.ensure_vars(num_vars)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure_vars(self, num_vars: int):
+        while self.num_vars < num_vars:
+            self.num_vars += 1
+            self._watches += [[], []]
+            self._value += [0, 0]
+            self._level.append(0)
+            self._reason.append(-1)
+            self._activity.append(0.0)
+            self._phase.append(1)
+            self._seen.append(False)
+            heapq.heappush(self._heap, (0.0, self.num_vars))
+
+    def add_clause(self, clause: Iterable[int]) -> bool:
+        """
+        Add a clause. Returns False if the clauses became unsatisfiable.
+        """
+        if not self._ok:
+            return False
+        self._backtrack(0)
+        literals = []
+        for literal in clause:
+            self.ensure_vars(abs(literal))
+            lit = _internal(literal)
+            value = self._value[lit]
+            if value == 1 or lit ^ 1 in literals:
+                return True  # already satisfied, or a tautology
+            if value == 0 and lit not in literals:
+                literals.append(lit)
+        if not literals:
+            self._ok = False
+        elif len(literals) == 1:
+            self._enqueue(literals[0], -1)
+            self._ok = self._propagate() is None
+        else:
+            self._attach(literals)
+        return self._ok
+
+    def solve(self, max_conflicts: Optional[int] = None) -> Optional[bool]:
+        """
+        Decide satisfiability. On success the assignment is left in self.model.
+        ---
+        :param max_conflicts: Give up after this many conflicts.
+        :return: True, False, or None if the conflict budget ran out.
+        """
+        self.model = None
+        if not self._ok:
+            return False
+        if self._propagate() is not None:
+            self._ok = False
+            return False
+        limit = None if max_conflicts is None else self.conflicts + max_conflicts
+        restart = 0
+        while True:
+            budget = RESTART_BASE * luby(restart)
+            if limit is not None:
+                budget = min(budget, limit - self.conflicts)
+            status = self._search(budget)
+            if status is not None:
+                return status
+            if limit is not None and self.conflicts >= limit:
+                return None
+            restart += 1
+            self.restarts += 1
+
+    def _search(self, budget):
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self._trail_lim:
+                    self._ok = False
+                    return False
+                learnt, level, lbd = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], -1)
+                else:
+                    index = self._attach(learnt, lbd)
+                    self._enqueue(learnt[0], index)
+                self._var_inc /= VAR_DECAY
+                continue
+
+            if conflicts >= budget:
+                self._backtrack(0)
+                return None
+            if len(self._learnts) - len(self._trail) >= self._max_learnts:
+                self._reduce()
+
+            lit = self._decide()
+            if lit is None:
+                value = self._value
+                self.model = {v: value[2 * v] == 1 for v in range(1, self.num_vars + 1)}
+                self._backtrack(0)
+                return True
+            self.decisions += 1
+            self._trail_lim.append(len(self._trail))
+            self._enqueue(lit, -1)
+
+    def _attach(self, literals, lbd=None):
+        index = len(self._clauses)
+        self._clauses.append(literals)
+        self._watches[literals[0]].append(index)
+        self._watches[literals[1]].append(index)
+        if lbd is not None:
+            self._learnts[index] = lbd
+        return index
+
+    def _enqueue(self, lit, reason):
+        self._value[lit] = 1
+        self._value[lit ^ 1] = -1
+        var = lit >> 1
+        self._level[var] = len(self._trail_lim)
+        self._reason[var] = reason
+        self._trail.append(lit)
+
+    def _propagate(self):
+        """Unit propagation over the trail. Returns a conflicting clause index or None."""
+        clauses = self._clauses
+        watches = self._watches
+        value = self._value
+        trail = self._trail
+        level = self._level
+        reason = self._reason
+        current = len(self._trail_lim)
+
+        while self._qhead < len(trail):
+            false_lit = trail[self._qhead] ^ 1
+            self._qhead += 1
+            self.propagations += 1
+            watchers = watches[false_lit]
+            i = j = 0
+            end = len(watchers)
+            while i < end:
+                index = watchers[i]
+                i += 1
+                clause = clauses[index]
+                if clause is None:
+                    continue  # deleted, drop the watch
+                if clause[0] == false_lit:
+                    clause[0] = clause[1]
+                    clause[1] = false_lit
+                first = clause[0]
+                if value[first] == 1:
+                    watchers[j] = index
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if value[lit] != -1:
+                        clause[1] = lit
+                        clause[k] = false_lit
+                        watches[lit].append(index)
+                        break
+                else:
+                    watchers[j] = index
+                    j += 1
+                    if value[first] == -1:
+                        while i < end:
+                            watchers[j] = watchers[i]
+                            j += 1
+                            i += 1
+                        del watchers[j:]
+                        self._qhead = len(trail)
+                        return index
+                    value[first] = 1
+                    value[first ^ 1] = -1
+                    var = first >> 1
+                    level[var] = current
+                    reason[var] = index
+                    trail.append(first)
+            del watchers[j:]
+        return None
+
+    def _analyze(self, conflict):
+        """First-UIP conflict analysis. Returns (learnt clause, backjump level, LBD)."""
+        clauses = self._clauses
+        level = self._level
+        reason = self._reason
+        seen = self._seen
+        trail = self._trail
+        current = len(self._trail_lim)
+
+        learnt = [0]
+        marked = []
+        pending = 0
+        lit = -1
+        index = len(trail) - 1
+        clause_index = conflict
+        while True:
+            clause = clauses[clause_index]
+            for k in range(0 if lit == -1 else 1, len(clause)):
+                q = clause[k]
+                var = q >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = True
+                    marked.append(var)
+                    self._bump(var)
+                    if level[var] >= current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            var = lit >> 1
+            seen[var] = False
+            pending -= 1
+            if pending == 0:
+                break
+            clause_index = reason[var]
+        learnt[0] = lit ^ 1
+
+        # Drop literals implied by the rest of the clause
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            why = reason[q >> 1]
+            if why == -1 or any(
+                not seen[r >> 1] and level[r >> 1] > 0 for r in clauses[why][1:]
+            ):
+                kept.append(q)
+        learnt = kept
+        for var in marked:
+            seen[var] = False
+
+        if len(learnt) == 1:
+            return learnt, 0, 1
+        best = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        lbd = len({level[q >> 1] for q in learnt})
+        return learnt, level[learnt[1] >> 1], lbd
+
+    def _bump(self, var):
+        activity = self._activity
+        activity[var] += self._var_inc
+        if activity[var] > 1e100:
+            for v in range(1, self.num_vars + 1):
+                activity[v] *= 1e-100
+            self._var_inc *= 1e-100
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        value = self._value
+        activity = self._activity
+        self._heap = [(-activity[v], v) for v in range(1, self.num_vars + 1) if value[2 * v] == 0]
+        heapq.heapify(self._heap)
+
+    def _decide(self):
+        heap = self._heap
+        value = self._value
+        if len(heap) > 4 * self.num_vars + 1000:
+            self._rebuild_heap()
+            heap = self._heap
+        while heap:
+            _, var = heapq.heappop(heap)
+            if value[2 * var] == 0:
+                return 2 * var + self._phase[var]
+        return None
+
+    def _backtrack(self, level):
+        if len(self._trail_lim) <= level:
+            return
+        value = self._value
+        reason = self._reason
+        phase = self._phase
+        activity = self._activity
+        heap = self._heap
+        start = self._trail_lim[level]
+        for lit in self._trail[start:]:
+            var = lit >> 1
+            value[lit] = value[lit ^ 1] = 0
+            reason[var] = -1
+            phase[var] = lit & 1
+            heapq.heappush(heap, (-activity[var], var))
+        del self._trail[start:]
+        del self._trail_lim[level:]
+        self._qhead = start
+
+    def _reduce(self):
+        """Delete the less useful half of the learned clauses"""
+        clauses = self._clauses
+        value = self._value
+        reason = self._reason
+        candidates = sorted(
+            (index for index, lbd in self._learnts.items() if lbd > 2),
+            key=lambda index: -self._learnts[index],
+        )
+        for index in candidates[:len(candidates) // 2]:
+            first = clauses[index][0]
+            if value[first] == 1 and reason[first >> 1] == index:
+                continue  # locked: it is the reason of an assignment
+            clauses[index] = None
+            del self._learnts[index]
+        self._max_learnts = int(self._max_learnts * LEARNT_GROWTH)
+
+
+def solve(clauses: Iterable[List[int]], num_vars: int = 0) -> Optional[Dict[int, bool]]:
+    """Return a satisfying assignment of the DIMACS clauses, or None if there is none"""
+    solver = Solver(num_vars, clauses)
+    return solver.model if solver.solve() else None
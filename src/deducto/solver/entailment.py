@@ -0,0 +1,44 @@
+"""
+Satisfiability and entailment checks backed by the CDCL solver, with small
+problems answered by truth tables instead.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.solver.cdcl import Solver
+from deducto.solver.tseitin import CNF
+
+# Up to this many variables a truth table is cheaper than building a CNF
+TRUTH_TABLE_VARIABLES = 12
+
+
+def find_model(expr: Expr) -> Optional[Dict[str, bool]]:
+    """Return an assignment of the variables of expr satisfying it, or None"""
+    names = truthtable.variables(expr)
+    if len(names) <= TRUTH_TABLE_VARIABLES:
+        return truthtable.find_model(expr, names)
+    cnf = CNF()
+    cnf.assert_true(expr)
+    solver = Solver(cnf.num_vars, cnf.clauses)
+    if not solver.solve():
+        return None
+    return {name: solver.model[cnf.names[name]] for name in names}
+
+def is_satisfiable(expr: Expr) -> bool:
+    return find_model(expr) is not None
+
+def is_tautology(expr: Expr) -> bool:
+    return find_model(Not(expr)) is None
+
+def entails(premises: Iterable[Expr], goal: Expr) -> Tuple[bool, Optional[Dict[str, bool]]]:
+    """
+    Check whether goal is true under every assignment making all premises true.
+    ---
+    :return: (True, None) if it is, else (False, counterexample).
+    """
+    counter = Not(goal)
+    for premise in reversed(list(premises)):
+        counter = And(premise, counter)
+    model = find_model(counter)
+    return model is None, model
@@ -0,0 +1,93 @@
+"""
+Tseitin encoding of Expr trees into CNF.
+
+Every distinct compound subformula gets one fresh variable constrained to be
+equivalent to it, so the clause count is linear in the size of the formula.
+Literals use the DIMACS convention: variable v is the literal v, its negation
+is -v.
+"""
+from typing import Dict, List
+
+from deducto.core.expr import *
+from deducto.core.utils import postorder
+
+
+class CNF:
+    """
+    A growing set of clauses over numbered variables.
+    Formulas encoded into the same CNF share the definitions of their common
+    subformulas.
+    """
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses: List[List[int]] = []
+        self.names: Dict[str, int] = {}  # formula variable name -> number
+        self._literals: Dict[Expr, int] = {}
+        self._true = None
+
+    def new_var(self) -> int:
+        self.num_vars += 1
+        return self.num_vars
+
+    def var(self, name: str) -> int:
+        """Return the variable number standing for the formula variable name"""
+        number = self.names.get(name)
+        if number is None:
+            number = self.names[name] = self.new_var()
+        return number
+
+    def add(self, clause: List[int]):
+        self.clauses.append(clause)
+
+    def encode(self, expr: Expr) -> int:
+        """Return a literal that is true exactly when expr is"""
+        literals = self._literals
+        if expr in literals:
+            return literals[expr]
+        for node in postorder(expr):
+            if node in literals:
+                continue
+            if isinstance(node, Var):
+                literal = self.var(node.name)
+            elif isinstance(node, TrueExpr):
+                literal = self._constant()
+            elif isinstance(node, FalseExpr):
+                literal = -self._constant()
+            elif isinstance(node, Not):
+                literal = -literals[node.negated]
+            else:
+                literal = self._define(node, literals[node.left], literals[node.right])
+            literals[node] = literal
+        return literals[expr]
+
+    def assert_true(self, expr: Expr):
+        self.add([self.encode(expr)])
+
+    def _constant(self):
+        if self._true is None:
+            self._true = self.new_var()
+            self.add([self._true])
+        return self._true
+
+    def _define(self, node, a, b):
+        x = self.new_var()
+        if isinstance(node, And):
+            clauses = [[-x, a], [-x, b], [x, -a, -b]]
+        elif isinstance(node, Or):
+            clauses = [[-x, a, b], [x, -a], [x, -b]]
+        elif isinstance(node, Implies):
+            clauses = [[-x, -a, b], [x, a], [x, -b]]
+        elif isinstance(node, Iff):
+            clauses = [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+        elif isinstance(node, Xor):
+            clauses = [[-x, a, b], [-x, -a, -b], [x, -a, b], [x, a, -b]]
+        else:
+            raise TypeError(f"Cannot encode {node.__class__.__name__}")
+        self.clauses.extend(clauses)
+        return x
+
+def tseitin(expr: Expr) -> CNF:
+    """Return a CNF that is satisfiable exactly when expr is"""
+    cnf = CNF()
+    cnf.assert_true(expr)
+    return cnf
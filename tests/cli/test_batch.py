@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from deducto.__main__ import main
+from deducto.cli.batch import ScriptError, find_scripts, parse_script, run_script, run_scripts
+from deducto.cli.parser import parse
+
+VALID = """\
+# modus ponens
+variables: p, q
+premises: p -> q, p
+goal: q
+apply modus_ponens 1 2
+"""
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_parse_script():
+    script = parse_script(VALID)
+    assert script.variables == ["p", "q"]
+    assert script.premises == [parse("p -> q"), parse("p")]
+    assert script.goal == parse("q")
+    assert script.commands == [(5, "apply modus_ponens 1 2")]
+
+def test_parse_script_errors():
+    with pytest.raises(ScriptError) as e:
+        parse_script("premises: p ->\ngoal: p")
+    assert e.value.line == 1
+    with pytest.raises(ScriptError) as e:
+        parse_script("goal: p\ngoal: q")
+    assert e.value.line == 2
+
+def test_run_script(tmp_path):
+    result = run_script(write(tmp_path, "ok.dd", VALID))
+    assert result["reached"] and result["error"] is None
+    assert result["steps"] == 3
+
+def test_run_script_failing_line(tmp_path):
+    text = VALID.replace("modus_ponens 1 2", "modus_ponens 1 5")
+    result = run_script(write(tmp_path, "bad.dd", text))
+    assert not result["reached"]
+    assert result["line"] == 5
+    assert result["error"] == "Invalid step index."
+
+def test_run_script_unknown_command(tmp_path):
+    result = run_script(write(tmp_path, "bad.dd", VALID + "frobnicate\n"))
+    assert result["line"] == 6
+
+def test_run_script_errors_come_from_the_proof(tmp_path):
+    text = VALID.replace("modus_ponens 1 2", "modus_tollens 1 2")
+    result = run_script(write(tmp_path, "bad.dd", text))
+    assert result["line"] == 5
+    assert result["error"].startswith("Error applying rule:")
+    result = run_script(write(tmp_path, "bad.dd", "premises: p | q\ngoal: p\nprove\n"))
+    assert result["line"] == 3
+    assert result["error"].startswith("The goal does not follow")
+
+def test_run_script_not_utf8(tmp_path):
+    path = tmp_path / "latin1.dd"
+    path.write_bytes("premises: p\ngoal: p\n# café\n".encode("latin-1"))
+    result = run_script(str(path))
+    assert not result["reached"] and "utf-8" in result["error"]
+    assert main(["run", str(path), "--jobs", "1"]) == 1
+
+def test_run_script_goal_not_reached(tmp_path):
+    text = "premises: p -> q, p\ngoal: q\n"
+    result = run_script(write(tmp_path, "open.dd", text))
+    assert not result["reached"]
+    assert result["line"] is None
+
+def test_find_scripts(tmp_path):
+    a = write(tmp_path, "a.dd", VALID)
+    b = write(tmp_path, "sub/b.dd", VALID)
+    write(tmp_path, "notes.txt", "")
+    assert find_scripts([str(tmp_path)]) == [a, b]
+    assert find_scripts([str(tmp_path / "*.dd")]) == [a]
+
+def test_run_scripts_in_pool(tmp_path):
+    paths = [write(tmp_path, f"{i}.dd", VALID) for i in range(4)]
+    results = list(run_scripts(paths, jobs=2))
+    assert sorted(r["script"] for r in results) == sorted(paths)
+    assert all(r["reached"] for r in results)
+
+def test_main_run(tmp_path, capsys):
+    write(tmp_path, "a.dd", VALID)
+    write(tmp_path, "b.dd", "premises: p\ngoal: q\n")
+    assert main(["run", str(tmp_path), "--jobs", "1"]) == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["reached"] for r in lines] == [True, False]
@@ -0,0 +1,54 @@
+from prompt_toolkit.document import Document
+
+from deducto.cli.completion import CommandCompleter
+from deducto.cli.parser import parse
+from deducto.cli.trie import PrefixTrie
+from deducto.core.proof import ProofState, ProofStep
+
+def complete(completer, text):
+    return [c.text for c in completer.get_completions(Document(text), None)]
+
+def test_trie_complete():
+    trie = PrefixTrie(["1", "1.left", "1.right", "10", "2"])
+    assert len(trie) == 5
+    assert "1.left" in trie
+    assert "1.le" not in trie
+    assert list(trie.complete("1.")) == ["1.left", "1.right"]
+    assert list(trie.complete("1"))[0] == "1"
+    assert set(trie.complete("")) == {"1", "1.left", "1.right", "10", "2"}
+    assert list(trie.complete("3")) == []
+
+def test_trie_ignores_duplicates():
+    trie = PrefixTrie(["a", "a"])
+    assert len(trie) == 1
+    assert list(trie.complete("a")) == ["a"]
+
+def test_step_paths_cached():
+    step = ProofStep(parse("!(p & q)"), "assumption", [])
+    assert "paths" not in vars(step)
+    assert step.paths == ["negated", "negated.left", "negated.right"]
+    assert step.paths is step.paths
+
+def test_completes_subpaths():
+    proof = ProofState([parse("p & q"), parse("r")], None)
+    completer = CommandCompleter(proof)
+    assert complete(completer, "apply simplification 1.") == ["1.left", "1.right"]
+    assert complete(completer, "apply simplification 1.l") == ["1.left"]
+    assert complete(completer, "apply conjunction 1 ") == ["1", "1.left", "1.right", "2"]
+
+def test_completion_follows_steps():
+    proof = ProofState([parse("p & q")], None)
+    completer = CommandCompleter(proof)
+    assert complete(completer, "apply negation 2") == []
+    proof.try_rule("simplification", ["1"])
+    assert complete(completer, "apply negation 2") == ["2"]
+    proof.undo()
+    assert complete(completer, "apply negation 2") == []
+
+def test_completes_checkpoints_and_branches():
+    proof = ProofState([parse("p")], None)
+    proof.checkpoint("start")
+    proof.branch("alt")
+    completer = CommandCompleter(proof)
+    assert complete(completer, "restore s") == ["start"]
+    assert complete(completer, "switch ") == ["main", "alt"]
@@ -1,5 +1,5 @@
 import pytest
-from deducto.cli.parser import parse
+from deducto.cli.parser import _parse_normalized, parse, tokenize
 from deducto.core.expr import *
 
 def test_single_var():
@@ -76,3 +76,53 @@ def test_missing_operand():
     with pytest.raises(SyntaxError):
         parse("¬")
 
+def test_token_positions():
+    tokens = list(tokenize("¬P ∧ (Q -> R)"))
+    assert [(t.type, t.value, t.pos) for t in tokens] == [
+        ("NOT", "¬", 0),
+        ("VAR", "P", 1),
+        ("AND", "∧", 3),
+        ("LPAREN", "(", 5),
+        ("VAR", "Q", 6),
+        ("IMPLIES", "->", 8),
+        ("VAR", "R", 11),
+        ("RPAREN", ")", 12),
+    ]
+
+def test_invalid_token_position():
+    with pytest.raises(SyntaxError, match="position 2"):
+        list(tokenize("P @ Q"))
+
+def test_tokenize_long_input():
+    text = " & ".join(f"x{i}" for i in range(10000))
+    tokens = list(tokenize(text))
+    assert len(tokens) == 19999
+    assert tokens[-1].value == "x9999"
+    assert text[tokens[-1].pos:] == "x9999"
+
+def test_trailing_tokens():
+    with pytest.raises(SyntaxError):
+        parse("P Q")
+    with pytest.raises(SyntaxError):
+        parse("P ∧ Q)")
+
+def test_deep_nesting():
+    depth = 20000
+    expr = parse("(" * depth + "P" + ")" * depth)
+    assert expr == Var("P")
+    expr = parse("¬" * depth + "P")
+    for _ in range(depth):
+        expr = expr.negated
+    assert expr == Var("P")
+
+def test_long_chain_is_left_associative():
+    expr = parse(" ∧ ".join(f"x{i}" for i in range(5000)))
+    assert expr.right == Var("x4999")
+    assert expr.left.right == Var("x4998")
+
+def test_parse_cache():
+    _parse_normalized.cache_clear()
+    first = parse("P ∧ (Q ∨ R)")
+    second = parse("  P ∧ (Q   ∨ R) ")
+    assert first is second
+    assert _parse_normalized.cache_info().hits == 1
@@ -0,0 +1,33 @@
+import pstats
+import time
+
+from deducto.__main__ import main
+from deducto.cli.profile import profiled
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_collapsed_stacks(tmp_path):
+    path = tmp_path / "run.folded"
+    with profiled(str(path)):
+        busy(0.1)
+    lines = path.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "busy" in stack and int(count) > 0
+
+def test_cprofile_output(tmp_path):
+    path = tmp_path / "run.prof"
+    with profiled(str(path)):
+        busy(0.01)
+    names = {func[2] for func in pstats.Stats(str(path)).stats}
+    assert "busy" in names
+
+def test_profile_flag(tmp_path):
+    script = tmp_path / "a.dd"
+    script.write_text("premises: p -> q, p\ngoal: q\napply modus_ponens 1 2\n")
+    path = tmp_path / "run.prof"
+    assert main(["--profile", str(path), "run", str(script)]) == 0
+    assert path.exists()
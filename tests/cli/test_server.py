@@ -0,0 +1,191 @@
+import asyncio
+import json
+import time
+
+import pytest
+from deducto.cli.server import (
+    INVALID_PARAMS, INVALID_REQUEST, LIMIT_REACHED, METHOD_NOT_FOUND, PARSE_ERROR, RULE_ERROR,
+    UNKNOWN_SESSION, RPCError, Server, SessionPool,
+)
+from deducto.cli.parser import parse
+from deducto.core.proof import ProofState
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.ids = 0
+
+    async def send(self, text):
+        self.writer.write(text.encode() + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def call(self, method, **params):
+        self.ids += 1
+        response = await self.send(json.dumps(
+            {"jsonrpc": "2.0", "id": self.ids, "method": method, "params": params}))
+        assert response["id"] == self.ids
+        return response.get("result"), response.get("error")
+
+def serving(tmp_path, test, **limits):
+    """Run test(client, server) against a server on a Unix socket"""
+    async def main():
+        server = Server(jobs=1, **limits)
+        path = str(tmp_path / "deducto.sock")
+        await server.start(socket_path=path)
+        try:
+            client = Client(*await asyncio.open_unix_connection(path))
+            await test(client, server)
+            client.writer.close()
+        finally:
+            await server.stop()
+    asyncio.run(main())
+
+def test_stateless_methods(tmp_path):
+    async def test(client, server):
+        result, _ = await client.call("parse", formula="p -> (q & r)")
+        assert result == {"formula": "p → (q ∧ r)"}
+        _, error = await client.call("parse", formula="p ->")
+        assert error["code"] == INVALID_PARAMS
+        result, _ = await client.call("apply_rule", rule="modus_ponens", premises=["p -> q", "p"])
+        assert result == {"result": "q"}
+        _, error = await client.call("apply_rule", rule="modus_ponens", premises=["p -> q", "q"])
+        assert error["code"] == RULE_ERROR
+        result, _ = await client.call("apply_rule", rule="modus_ponens",
+                                      premises=["(p & q) -> r", "q & p"], ac=True)
+        assert result == {"result": "r"}
+    serving(tmp_path, test)
+
+def test_session(tmp_path):
+    async def test(client, server):
+        opened, _ = await client.call("open", assumptions=["p -> q", "q -> r", "p"], goal="r")
+        session = opened["session"]
+        assert [step["formula"] for step in opened["steps"]] == ["p → q", "q → r", "p"]
+        assert not opened["reached"]
+
+        result, _ = await client.call("try_rule", session=session, rule="modus_ponens", targets=[1, 3])
+        assert result["ok"] and result["steps"] == [
+            {"n": 4, "formula": "q", "rule": "modus_ponens", "premises": [1, 3]}]
+        result, _ = await client.call("try_rule", session=session, rule="modus_tollens", targets=["1", "3"])
+        assert not result["ok"] and result["message"] and result["steps"] == []
+
+        result, _ = await client.call("check", session=session)
+        assert result == {"valid": True, "counterexample": None}
+        result, _ = await client.call("prove", session=session, timeout=5)
+        assert result["ok"] and result["reached"]
+        assert result["steps"][-1]["formula"] == "r"
+
+        result, _ = await client.call("steps", session=session)
+        assert result["reached"] and len(result["steps"]) == 5
+        assert await client.call("close", session=session) == ({}, None)
+        _, error = await client.call("steps", session=session)
+        assert error["code"] == UNKNOWN_SESSION
+    serving(tmp_path, test)
+
+def test_check_and_prove_invalid_goal(tmp_path):
+    async def test(client, server):
+        opened, _ = await client.call("open", assumptions=["p | q"], goal="p")
+        result, _ = await client.call("check", session=opened["session"])
+        assert not result["valid"] and result["counterexample"] == {"p": False, "q": True}
+        result, _ = await client.call("prove", session=opened["session"])
+        assert not result["ok"] and "does not follow" in result["message"]
+        opened, _ = await client.call("open", assumptions=["p"])
+        _, error = await client.call("check", session=opened["session"])
+        assert error["code"] == INVALID_PARAMS
+    serving(tmp_path, test)
+
+def test_protocol_errors(tmp_path):
+    async def test(client, server):
+        assert (await client.send("{not json"))["error"]["code"] == PARSE_ERROR
+        assert (await client.send('{"id": 1, "method": "parse"}'))["error"]["code"] == INVALID_REQUEST
+        response = await client.send('{"jsonrpc": "2.0", "id": 2, "method": "parse", "params": ["p"]}')
+        assert response["error"]["code"] == INVALID_PARAMS
+        _, error = await client.call("shutdown")
+        assert error["code"] == METHOD_NOT_FOUND
+        _, error = await client.call("try_rule", session="nope", rule="modus_ponens", targets=[1])
+        assert error["code"] == UNKNOWN_SESSION
+        # A notification gets no response: the next line read answers the request after it
+        client.writer.write(b'{"jsonrpc": "2.0", "method": "parse", "params": {"formula": "p"}}\n')
+        result, _ = await client.call("parse", formula="q")
+        assert result == {"formula": "q"}
+    serving(tmp_path, test)
+
+def test_concurrent_clients(tmp_path):
+    async def test(client, server):
+        path = str(tmp_path / "deducto.sock")
+        async def learner(i):
+            other = Client(*await asyncio.open_unix_connection(path))
+            opened, _ = await other.call("open", assumptions=[f"a{i} -> b{i}", f"a{i}"], goal=f"b{i}")
+            result, _ = await other.call("try_rule", session=opened["session"],
+                                         rule="modus_ponens", targets=[1, 2])
+            other.writer.close()
+            return result["reached"]
+        assert all(await asyncio.gather(*(learner(i) for i in range(50))))
+        assert len(server.sessions) == 50
+    serving(tmp_path, test)
+
+def test_session_limits(tmp_path):
+    async def test(client, server):
+        opened, _ = await client.call("open", assumptions=["p & q & r"])
+        _, error = await client.call("try_rule", session=opened["session"], rule="simplification", targets=[1])
+        assert error["code"] == LIMIT_REACHED
+        _, error = await client.call("open", assumptions=["p"])
+        assert error["code"] == LIMIT_REACHED
+        assert len(server.sessions) == 1
+        server.sessions.close(opened["session"])
+        _, error = await client.call("open", assumptions=["p & q", "r -> s"])
+        assert error["code"] == LIMIT_REACHED
+        assert len(server.sessions) == 0
+    serving(tmp_path, test, max_sessions=1, max_nodes=5)
+
+def test_idle_sessions_are_evicted():
+    async def main():
+        pool = SessionPool(idle_timeout=10)
+        old = pool.open(ProofState([parse("p")], None))
+        busy = pool.open(ProofState([parse("q")], None))
+        new = pool.open(ProofState([parse("r")], None))
+        new.last_used = old.last_used + 20
+        await busy.lock.acquire()
+        assert pool.evict_idle(old.last_used + 15) == [old.id]
+        assert len(pool) == 2
+        with pytest.raises(RPCError):
+            pool.get(old.id)
+        busy.lock.release()
+    asyncio.run(main())
+
+def test_deep_formulas(tmp_path):
+    deep = "p"
+    for i in range(1000):
+        deep = f"(q{i % 3} ∨ {deep})"
+    async def test(client, server):
+        opened, error = await client.call("open", assumptions=[f"{deep} → r", deep], goal="r")
+        assert error is None
+        result, _ = await client.call("check", session=opened["session"])
+        assert result == {"valid": True, "counterexample": None}
+        result, _ = await client.call("prove", session=opened["session"], timeout=5)
+        assert result["ok"] and result["steps"] == [
+            {"n": 3, "formula": "r", "rule": "modus_ponens", "premises": [1, 2]}]
+    serving(tmp_path, test)
+
+def test_main_serve_on_any_port(monkeypatch):
+    from deducto import __main__
+    from deducto.cli import server
+    calls = []
+    async def serve(*args, **limits):
+        calls.append(args)
+    monkeypatch.setattr(server, "serve", serve)
+    assert __main__.main(["serve", "--port", "0", "--host", ""]) == 0
+    assert __main__.main(["serve"]) == 0
+    assert [call[:2] for call in calls] == [("", 0), (server.DEFAULT_HOST, server.DEFAULT_PORT)]
+
+def test_stop_does_not_block_the_loop(tmp_path):
+    async def test(client, server):
+        server.executor.submit(time.sleep, 0.5)
+        await asyncio.sleep(0.1)  # let a worker pick it up
+        stopping = asyncio.create_task(server.stop())
+        ticks = 0
+        while not stopping.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks > 10
+    serving(tmp_path, test)
@@ -0,0 +1,104 @@
+import json
+
+from deducto.__main__ import main
+from deducto.cli.verify import read_batches, verify_files, verify_proof
+
+def proof(steps, assumptions=("p -> q", "p"), goal="q"):
+    return {"assumptions": list(assumptions), "goal": goal, "steps": steps}
+
+def test_valid_proof():
+    record = proof([{"rule": "modus_ponens", "premises": [1, 2], "result": "q"}])
+    assert verify_proof(record) == (None, None)
+
+def test_valid_proof_at_subpath():
+    record = proof([{"rule": "negation", "premises": [1], "path": "left"}],
+                   assumptions=["!!p & q"], goal="p & q")
+    assert verify_proof(record) == (None, None)
+
+def test_first_invalid_step():
+    record = proof([
+        {"rule": "modus_ponens", "premises": [1, 2]},
+        {"rule": "modus_tollens", "premises": [1, 3]},
+        {"rule": "modus_ponens", "premises": [1, 9]},
+    ])
+    step, error = verify_proof(record)
+    assert step == 4
+
+def test_wrong_result():
+    record = proof([{"rule": "modus_ponens", "premises": [1, 2], "result": "p"}])
+    step, error = verify_proof(record)
+    assert step == 3
+    assert "not p" in error
+
+def test_later_premise_rejected():
+    record = proof([{"rule": "simplification", "premises": [3]}])
+    assert verify_proof(record)[0] == 3
+
+def test_conclusion_not_goal():
+    record = proof([{"rule": "addition", "premises": [2, 1]}])
+    step, error = verify_proof(record)
+    assert step is None and error.startswith("Conclusion")
+
+def test_malformed_proof():
+    assert verify_proof({"goal": "q"})[1].startswith("Invalid proof")
+
+def test_ill_typed_proofs():
+    for record in (proof([], goal=5), proof([], assumptions=[1]), {**proof([]), "steps": "none"},
+                   proof([{"rule": "negation", "premises": [1], "path": 3}]), proof(["step"])):
+        step, error = verify_proof(record)
+        assert error is not None
+
+def test_premises_must_be_step_numbers():
+    for premises in ([True, 2], [1.0, 2], ["1", 2]):
+        step, error = verify_proof(proof([{"rule": "modus_ponens", "premises": premises}]))
+        assert step == 3 and "not a step number" in error
+
+def test_no_conclusion():
+    assert verify_proof(proof([], assumptions=[], goal="p")) == (
+        None, "No conclusion: the proof has no assumptions and no steps")
+
+def test_bad_records_do_not_stop_the_run(tmp_path):
+    path = tmp_path / "proofs.jsonl"
+    records = [proof([], assumptions=[], goal="p"), proof([], goal=5),
+               proof([{"rule": "modus_ponens", "premises": [1, 2]}])]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    results = list(verify_files([str(path)], jobs=2, batch_size=1))
+    assert [r["valid"] for r in results] == [False, False, True]
+
+def write_corpus(tmp_path, count):
+    good = json.dumps(proof([{"rule": "modus_ponens", "premises": [1, 2]}]))
+    bad = json.dumps(proof([{"rule": "modus_tollens", "premises": [1, 2]}]))
+    path = tmp_path / "proofs.jsonl"
+    path.write_text("\n".join(good if i % 3 else bad for i in range(count)) + "\n\nnot json\n")
+    return str(path)
+
+def test_read_batches(tmp_path):
+    path = write_corpus(tmp_path, 10)
+    batches = list(read_batches([path], 4))
+    assert [len(batch) for batch in batches] == [4, 4, 3]
+    assert batches[-1][-1][1] == 12  # the blank line is skipped, numbering is not
+
+def test_unreadable_lines_and_files(tmp_path):
+    path = tmp_path / "proofs.jsonl"
+    good = json.dumps(proof([{"rule": "modus_ponens", "premises": [1, 2]}])).encode()
+    path.write_bytes(good + b"\n\xff\xfe\n" + good + b"\n")
+    missing = str(tmp_path / "missing.jsonl")
+    results = list(verify_files([missing, str(path)], jobs=1))
+    assert [(r["line"], r["valid"]) for r in results] == [(None, False), (1, True), (2, False), (3, True)]
+    assert results[0]["file"] == missing and "No such file" in results[0]["error"]
+    assert results[2]["error"].startswith("Invalid proof")
+
+def test_verify_files_in_order(tmp_path):
+    path = write_corpus(tmp_path, 50)
+    serial = list(verify_files([path], jobs=1))
+    parallel = list(verify_files([path], jobs=2, batch_size=7))
+    assert serial == parallel
+    assert [r["valid"] for r in serial[:4]] == [False, True, True, False]
+    assert serial[-1]["error"].startswith("Invalid JSON")
+
+def test_main_verify(tmp_path, capsys):
+    path = write_corpus(tmp_path, 3)
+    assert main(["verify", path, "-j", "1"]) == 1
+    out, err = capsys.readouterr()
+    assert len(out.splitlines()) == 4
+    assert "proofs/s" in err
@@ -0,0 +1,128 @@
+import gc
+
+import pytest
+from deducto.cli.batch import execute_script, parse_script
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core import ac
+from deducto.core.ac import MODULO_AC, canonical, modulo_ac, operands, same
+from deducto.core.expr import *
+from deducto.core.index import StepIndex
+from deducto.core.proof import ProofState, ProofStep
+from deducto.rules.apply import RULES, apply_rule
+
+@pytest.mark.parametrize("a, b", [
+    ("p ∧ q", "q ∧ p"),
+    ("(p ∧ q) ∧ r", "p ∧ (r ∧ q)"),
+    ("p ∨ q ∨ p", "q ∨ p"),
+    ("p ∧ p", "p"),
+    ("¬(a ∨ b) → (c ∧ d)", "¬(b ∨ a) → (d ∧ c)"),
+    ("(a ∧ b) ∨ ((a ∧ b) ∧ (b ∧ a))", "b ∧ a"),
+    ("x ∧ ((y ∧ z) ∨ (z ∧ y))", "z ∧ (x ∧ y)"),
+])
+def test_equal_modulo_ac(a, b):
+    assert canonical(parse(a)) is canonical(parse(b))
+
+@pytest.mark.parametrize("a, b", [
+    ("p ∧ q", "p ∨ q"),
+    ("p → q", "q → p"),
+    ("p ∧ (q ∨ r)", "(p ∧ q) ∨ r"),
+    ("¬(p ∧ q)", "¬p ∧ q"),
+])
+def test_different_modulo_ac(a, b):
+    assert canonical(parse(a)) is not canonical(parse(b))
+
+def test_canonical_form_is_canonical():
+    expr = parse("(c ∨ a) ∧ (b ∧ (a ∨ c)) ∧ d")
+    result = canonical(expr)
+    assert canonical(result) is result
+    assert operands(expr) == operands(result)
+    assert len(operands(expr)) == 3
+    assert operands(Var("p")) == (Var("p"),)
+
+def test_wide_chain():
+    names = [f"x{i}" for i in range(3000)]
+    left = Var(names[0])
+    for name in names[1:]:
+        left = And(left, Var(name))
+    right = Var(names[0])
+    for name in names[1:]:
+        right = And(Var(name), right)
+    assert canonical(left) is canonical(right)
+    assert len(operands(left)) == 3000
+
+def test_cache_does_not_keep_formulas_alive():
+    gc.collect()
+    before = len(ac._cache)
+    # Built directly, as parse keeps recent results
+    canonical(Or(And(Var("u1"), Var("u2")), Implies(Var("u3"), Not(Var("u4")))))
+    gc.collect()
+    assert len(ac._cache) == before
+
+def test_same_follows_the_switch():
+    a, b = parse("p ∧ q"), parse("q ∧ p")
+    assert not same(a, b)
+    with modulo_ac():
+        assert same(a, b)
+        assert not same(a, None)
+        with modulo_ac(False):
+            assert not same(a, b)
+    assert not MODULO_AC.get()
+
+def test_premises_match_modulo_ac():
+    implication, premise = parse("(p ∧ q) → r"), parse("q ∧ p")
+    with pytest.raises(TypeError):
+        apply_rule("modus_ponens", [implication, premise])
+    with modulo_ac():
+        assert apply_rule("modus_ponens", [implication, premise]) == Var("r")
+        assert apply_rule("modus_tollens", [implication, parse("¬r")]) == parse("¬(p ∧ q)")
+        assert apply_rule("disjunctive_syllogism", [parse("(a ∨ b) ∨ c"), parse("¬(b ∨ a)")]) == Var("c")
+        assert apply_rule("hypothetical_syllogism", [parse("a → (b ∨ c)"), parse("(c ∨ b) → d")]) == parse("a → d")
+
+def test_index_lookup_modulo_ac():
+    first = ProofStep(parse("p ∧ q"), "assumption", [])
+    second = ProofStep(parse("r"), "assumption", [])
+    index = StepIndex([first])
+    assert not index.equal_to(parse("q ∧ p"))
+    with modulo_ac():
+        assert list(index.equal_to(parse("q ∧ p"))) == [first]
+        index.add(second)
+        assert list(index.equal_to(parse("r ∧ r"))) == [second]
+        index.remove(first)
+        assert not index.equal_to(parse("q ∧ p"))
+
+def test_goal_reached_modulo_ac(capsys):
+    proof = ProofState([parse("p ∧ (q ∧ p)")], parse("q ∧ p"))
+    assert not execute_command("exact", proof)
+    try:
+        execute_command("ac on", proof)
+        assert "is on" in capsys.readouterr().out
+        assert execute_command("exact", proof)
+        assert proof.prune() == []
+    finally:
+        execute_command("ac off", proof)
+    assert "is off" in capsys.readouterr().out
+    execute_command("ac maybe", proof)
+    assert "Usage" in capsys.readouterr().out
+
+def test_script_switch_does_not_leak():
+    script = parse_script("premises: (p ∧ q) → r, q ∧ p\ngoal: r\nac on\napply modus_ponens 1 2\n")
+    with modulo_ac(False):
+        proof = execute_script(script)
+    assert proof.steps[-1].result == Var("r")
+    assert not MODULO_AC.get()
+
+def test_search_matches_exactly(monkeypatch):
+    seen = []
+    rule = RULES["modus_ponens"]
+    def recorded(*premises):
+        seen.append(MODULO_AC.get())
+        return rule.func(*premises)
+    monkeypatch.setitem(RULES, "modus_ponens", rule._replace(func=recorded))
+    with modulo_ac():
+        proof = ProofState([parse("(p ∧ q) → r"), parse("q ∧ p")], parse("r"))
+        proof.derive()
+        assert MODULO_AC.get()
+    assert seen and not any(seen)
+    # The implication is rewritten to match q ∧ p exactly first
+    assert proof.steps[-1].premises == [2, 1]
@@ -0,0 +1,74 @@
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core.proof import ProofState
+from deducto.export.txt import export_txt
+
+def make_proof():
+    proof = ProofState([parse("p -> q"), parse("q -> r"), parse("p"), parse("s")], parse("r"))
+    proof.try_rule("modus_ponens", ["1", "3"])          # 5. q
+    proof.try_rule("conjunction", ["3", "4"])           # 6. p & s
+    proof.try_rule("modus_ponens", ["2", "5"])          # 7. r
+    proof.try_rule("simplification", ["6"])             # 8. p
+    return proof
+
+def check_premises(proof):
+    """Every premise index must point at an earlier step"""
+    for i, step in enumerate(proof.steps):
+        assert all(j < i for j in step.premises)
+        assert proof.dependencies.closure([step]) >= {step}
+
+def test_cascading_delete():
+    proof = make_proof()
+    assert proof.delete_step(4) == [4, 6]
+    assert [str(step.result) for step in proof.steps[4:]] == ["p ∧ s", "p"]
+    assert proof.steps[5].premises == [4]
+    check_premises(proof)
+
+def test_delete_renumbers_later_steps():
+    proof = make_proof()
+    assert proof.delete_step(5) == [5, 7]
+    assert proof.steps[5].result == parse("r")
+    assert proof.steps[5].premises == [1, 4]
+    check_premises(proof)
+
+def test_delete_keeps_old_steps_unchanged():
+    proof = make_proof()
+    before = proof.steps[6]
+    proof.delete_step(5)
+    assert before.premises == [1, 4]
+    assert proof.undo() and proof.undo()
+    assert len(proof.steps) == 4
+
+def test_dependents():
+    proof = make_proof()
+    assert set(proof.dependencies.dependents(proof.steps[2])) == {proof.steps[4], proof.steps[5]}
+    proof.undo()
+    assert set(proof.dependencies.dependents(proof.steps[5])) == set()
+
+def test_prune():
+    proof = make_proof()
+    assert proof.prune() == [5, 7]
+    assert [str(step.result) for step in proof.steps[4:]] == ["q", "r"]
+    assert proof.steps[5].premises == [1, 4]
+    check_premises(proof)
+
+def test_prune_requires_goal():
+    proof = make_proof()
+    proof.delete_step(4)
+    with pytest.raises(ValueError):
+        proof.prune()
+
+def test_assumed_assumptions_are_kept(tmp_path):
+    proof = ProofState([parse("p -> q"), parse("p")], parse("q"))
+    execute_command("assume r", proof)
+    proof.try_rule("modus_ponens", ["1", "2"])
+    assert proof.prune() == []
+    with pytest.raises(ValueError):
+        proof.delete_step(2)
+    path = str(tmp_path / "proof.txt")
+    export_txt(proof, path)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert "3: r" in text.split("GOAL")[0]
+    assert "4: q" in text.split("PROOF STEPS:")[1]
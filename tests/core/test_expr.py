@@ -0,0 +1,57 @@
+import pickle
+from copy import deepcopy
+
+import pytest
+from deducto.core.expr import *
+
+def test_structurally_equal_nodes_are_shared():
+    a = And(Var("P"), Or(Var("Q"), Not(Var("R"))))
+    b = And(Var("P"), Or(Var("Q"), Not(Var("R"))))
+    assert a is b
+    assert TrueExpr() is TrueExpr()
+
+def test_distinct_nodes():
+    assert And(Var("P"), Var("Q")) != Or(Var("P"), Var("Q"))
+    assert And(Var("P"), Var("Q")) != And(Var("Q"), Var("P"))
+    assert TrueExpr() != FalseExpr()
+    assert Var("P") != "P"
+
+def test_usable_as_keys():
+    table = {Implies(Var("P"), Var("Q")): 1}
+    assert table[Implies(Var("P"), Var("Q"))] == 1
+    assert len({Var("P"), Var("P"), Not(Var("P"))}) == 2
+
+def test_hash_is_structural():
+    a = Not(Var("P"))
+    assert hash(a) == hash(("Not", Var("P")))
+
+def test_immutable():
+    expr = And(Var("P"), Var("Q"))
+    with pytest.raises(AttributeError):
+        expr.left = Var("R")
+    with pytest.raises(AttributeError):
+        del expr.right
+    with pytest.raises(AttributeError):
+        expr.extra = 1
+
+def test_replace_shares_untouched_children():
+    right = Or(Var("Q"), Var("R"))
+    expr = And(Var("P"), right)
+    new = expr.replace(left=Var("S"))
+    assert new == And(Var("S"), right)
+    assert new.right is right
+
+def test_copies_and_pickles_are_interned():
+    expr = Iff(Var("P"), Xor(TrueExpr(), FalseExpr()))
+    assert deepcopy(expr) is expr
+    assert pickle.loads(pickle.dumps(expr)) is expr
+
+def test_deep_formulas_pickle():
+    expr = Var("p")
+    for i in range(5000):
+        expr = Implies(Var(f"x{i % 3}"), Not(expr) if i % 2 else expr)
+    assert pickle.loads(pickle.dumps(expr)) is expr
+
+def test_base_classes_are_abstract():
+    with pytest.raises(TypeError):
+        Expr()
@@ -0,0 +1,70 @@
+from collections import Counter
+
+from deducto.cli.parser import parse
+from deducto.core.expr import *
+from deducto.core.index import StepIndex
+from deducto.core.proof import ProofState, ProofStep
+from deducto.rules.apply import RULES, list_applicable_rules
+
+def test_index_lookups():
+    p, q = Var("p"), Var("q")
+    first = ProofStep(Implies(p, q), "assumption", [])
+    second = ProofStep(p, "assumption", [])
+    index = StepIndex([first, second])
+    assert list(index.equal_to(p)) == [second]
+    assert list(index.of_type(Implies)) == [first]
+    assert list(index.with_operand(Implies, "left", p)) == [first]
+    assert not index.with_operand(Implies, "left", q)
+
+def test_index_remove():
+    p = Var("p")
+    step = ProofStep(Not(p), "assumption", [])
+    index = StepIndex([step])
+    index.remove(step)
+    assert not index.equal_to(Not(p))
+    assert not index.with_operand(Not, "negated", p)
+    assert not index._entries
+
+def test_index_follows_proof_edits():
+    proof = ProofState([parse("p -> q"), parse("p")], parse("q"))
+    proof.try_rule("modus_ponens", ["1", "2"])
+    assert proof.index.equal_to(parse("q"))
+    proof.undo()
+    assert not proof.index.equal_to(parse("q"))
+
+def test_suggestions():
+    proof = ProofState([parse("p -> q"), parse("p"), parse("q -> r")], parse("p -> r"))
+    suggestions = list_applicable_rules(proof.steps, proof.index, proof.goal)
+    assert suggestions[0] == ("hypothetical_syllogism", [0, 2], parse("p -> r"))
+    assert ("modus_ponens", [0, 1], parse("q")) in suggestions
+
+def test_suggestions_skip_known_results():
+    proof = ProofState([parse("p -> q"), parse("p"), parse("q")], parse("q"))
+    suggestions = list_applicable_rules(proof.steps, proof.index, proof.goal)
+    assert all(rule != "modus_ponens" for rule, _, _ in suggestions)
+
+def test_suggestions_build_goal():
+    proof = ProofState([parse("p"), parse("q")], parse("p & q"))
+    suggestions = list_applicable_rules(proof.steps, proof.index, proof.goal)
+    assert suggestions == [("conjunction", [0, 1], parse("p & q"))]
+
+def test_suggestions_rewrite_to_goal():
+    proof = ProofState([parse("p & q")], parse("q & p"))
+    suggestions = list_applicable_rules(proof.steps, proof.index, proof.goal)
+    assert suggestions[0] == ("commutative_and", [0], parse("q & p"))
+
+def test_suggestions_on_long_proof(monkeypatch):
+    premises = [parse(f"p{i} -> p{i + 1}") for i in range(300)] + [parse("p0")]
+    proof = ProofState(premises, parse("p300"))
+    calls = Counter()
+    for name, rule in list(RULES.items()):
+        if rule.kind == "inference":
+            def counted(*args, name=name, func=rule.func):
+                calls[name] += 1
+                return func(*args)
+            monkeypatch.setitem(RULES, name, rule._replace(func=counted))
+    suggestions = list_applicable_rules(proof.steps, proof.index, proof.goal)
+    assert ("modus_ponens", [0, 300], parse("p1")) in suggestions
+    # Partners come from the index: one pairing per implication, not one per
+    # pair of steps
+    assert sum(calls.values()) <= 2 * len(proof.steps)
@@ -0,0 +1,84 @@
+import pytest
+from deducto.cli.parser import parse
+from deducto.core.log import ProofLog, diff
+from deducto.core.proof import ProofState
+
+def results(proof):
+    return [str(step.result) for step in proof.steps]
+
+def make_proof():
+    return ProofState([parse("p -> q"), parse("q -> r"), parse("p")], parse("r"))
+
+def test_diff():
+    log = ProofLog()
+    a = log.append("a")
+    b = log.append("b")
+    log.goto(a)
+    c = log.append("c")
+    assert diff(b, c) == (1, ["c"])
+    assert diff(c, log.root) == (2, [])
+    assert diff(log.root, b) == (0, ["a", "b"])
+
+def test_undo_redo():
+    proof = make_proof()
+    proof.try_rule("modus_ponens", ["1", "3"])
+    proof.try_rule("modus_ponens", ["2", "4"])
+    assert proof.undo()
+    assert results(proof)[-1] == "q"
+    assert proof.redo()
+    assert results(proof)[-1] == "r"
+    assert not proof.redo()
+    assert proof.index.equal_to(parse("r"))
+
+def test_undo_stops_at_assumptions():
+    proof = make_proof()
+    assert not proof.undo()
+    assert len(proof.steps) == 3
+
+def test_new_step_clears_redo():
+    proof = make_proof()
+    proof.try_rule("modus_ponens", ["1", "3"])
+    proof.undo()
+    proof.try_rule("hypothetical_syllogism", ["1", "2"])
+    assert not proof.redo()
+    assert results(proof)[-1] == "p → r"
+
+def test_reset_keeps_steps_reachable():
+    proof = make_proof()
+    proof.try_rule("modus_ponens", ["1", "3"])
+    proof.checkpoint("done")
+    proof.reset()
+    assert len(proof.steps) == 3
+    proof.restore("done")
+    assert results(proof)[-1] == "q"
+    with pytest.raises(ValueError):
+        proof.restore("missing")
+
+def test_branches():
+    proof = make_proof()
+    proof.try_rule("modus_ponens", ["1", "3"])
+    proof.branch("syllogism")
+    proof.undo()
+    proof.try_rule("hypothetical_syllogism", ["1", "2"])
+    proof.switch("main")
+    assert results(proof)[-1] == "q"
+    assert not proof.index.equal_to(parse("p -> r"))
+    proof.switch("syllogism")
+    assert results(proof)[-1] == "p → r"
+    assert not proof.index.equal_to(parse("q"))
+    with pytest.raises(ValueError):
+        proof.branch("main")
+    with pytest.raises(ValueError):
+        proof.switch("missing")
+
+def test_delete_step():
+    proof = make_proof()
+    proof.try_rule("modus_ponens", ["1", "3"])
+    proof.try_rule("hypothetical_syllogism", ["1", "2"])
+    assert proof.delete_step(3) == [3]
+    assert results(proof) == ["p → q", "q → r", "p", "p → r"]
+    assert not proof.index.equal_to(parse("q"))
+    with pytest.raises(ValueError):
+        proof.delete_step(0)
+    with pytest.raises(IndexError):
+        proof.delete_step(10)
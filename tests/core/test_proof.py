@@ -52,3 +52,11 @@ def test_try_rule_with_path_mutation():
     assert success
     assert proof.steps[-1].result == goal
     assert "negation" in proof.steps[-1].rule
+
+def test_try_rule_at_path_shares_subtrees():
+    other = And(Var("A"), Or(Var("B"), Var("C")))
+    expr = Or(Not(Not(Var("A"))), other)
+    proof = ProofState([expr], None)
+    assert proof.try_rule("negation", ["1.left"])
+    assert proof.steps[-1].result.right is other
+    assert proof.steps[0].result is expr
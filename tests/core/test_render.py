@@ -0,0 +1,63 @@
+import pytest
+from deducto.cli.parser import parse
+from deducto.core.expr import *
+from deducto.core import render as render_module
+from deducto.core.render import LATEX, UNICODE, Renderer, render
+
+def test_unicode_matches_previous_format():
+    assert render(parse("!(p & q) -> !r")) == "¬(p ∧ q) → ¬r"
+    assert render(parse("(p | q) & T")) == "(p ∨ q) ∧ (𝗧)"
+    assert render(parse("!!p")) == "¬(¬p)"
+    assert str(parse("p ^ q")) == "p ⊕ q"
+
+def test_latex_symbols():
+    assert render(parse("p ^ q"), LATEX) == r"p \oplus q"
+    assert render(parse("!(p <-> F)"), LATEX) == r"\lnot \left(p \leftrightarrow \mathbf{F}\right)"
+    assert render(parse("!!T"), LATEX) == r"\lnot \lnot \mathbf{T}"
+
+def test_latex_precedence():
+    assert render(parse("p & q | r"), LATEX) == r"p \land q \lor r"
+    assert render(parse("p & (q | r)"), LATEX) == r"p \land \left(q \lor r\right)"
+    assert render(parse("p & q & r"), LATEX) == r"p \land q \land r"
+    assert render(parse("p & (q & r)"), LATEX) == r"p \land \left(q \land r\right)"
+    assert render(parse("(p -> q) -> r"), LATEX) == r"\left(p \rightarrow q\right) \rightarrow r"
+    assert render(parse("p -> (q -> r)"), LATEX) == r"p \rightarrow \left(q \rightarrow r\right)"
+
+def test_latex_round_trips_through_parser():
+    formulas = ["(p -> q) & !r | s <-> p ^ q", "!(p & q) -> (r | s) & T", "p -> q -> r"]
+    symbols = [(r"\left(", "("), (r"\right)", ")"), (r"\land", "&"), (r"\lor", "|"),
+               (r"\rightarrow", "->"), (r"\leftrightarrow", "<->"), (r"\oplus", "^"),
+               (r"\lnot ", "!"), (r"\mathbf{T}", "T"), (r"\mathbf{F}", "F")]
+    for text in formulas:
+        latex = render(parse(text), LATEX)
+        for symbol, ascii in symbols:
+            latex = latex.replace(symbol, ascii)
+        assert parse(latex) == parse(text)
+
+def test_shared_subtrees():
+    shared = parse("(p -> q) & (q -> r)")
+    renderer = Renderer()
+    first = renderer.render(Or(shared, Var("s")))
+    second = renderer.render(Or(Var("t"), shared))
+    third = renderer.render(Not(shared))
+    assert first == "((p → q) ∧ (q → r)) ∨ s"
+    assert second == "t ∨ ((p → q) ∧ (q → r))"
+    assert third == "¬((p → q) ∧ (q → r))"
+    assert renderer.render(Or(shared, Var("s"))) is first
+
+@pytest.mark.parametrize("style", [UNICODE, LATEX])
+def test_deep_rendering_matches_recursive(monkeypatch, style):
+    expr = parse("(p -> !q) & (F | r <-> s ^ T)")
+    for i in range(40):
+        expr = [Or(expr, Var("a")), Not(expr), Implies(Var("b"), expr), And(expr, Not(Var("c")))][i % 4]
+    expected = Renderer(style).render(expr)
+    monkeypatch.setattr(render_module, "RECURSION_DEPTH", 3)
+    assert Renderer(style).render(expr) == expected
+
+def test_deep_formula():
+    expr = Var("p")
+    for i in range(10000):
+        expr = And(expr, Var("q")) if i % 2 else Not(expr)
+    text = render(expr)
+    assert text.count("¬") == 5000
+    assert text.endswith("∧ q")
@@ -0,0 +1,71 @@
+import pytest
+from deducto.cli.parser import parse
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.search import ProofSearch
+
+def replay(premises, goal, steps):
+    """Check every found step by applying it again through try_rule"""
+    proof = ProofState(premises, goal)
+    for result, rule, indices in steps:
+        if " at " in rule:
+            rule, path = rule.split(" at ")
+            targets = [f"{indices[0] + 1}.{path}"]
+        else:
+            targets = [str(i + 1) for i in indices]
+        assert proof.try_rule(rule, targets)
+        assert proof.steps[-1].result == result
+    return proof
+
+@pytest.mark.parametrize("premises, goal", [
+    ("p -> q, q -> r, p", "r"),
+    ("p -> q, !q", "!p"),
+    ("p | q, !p", "q"),
+    ("(p & q) -> r, p, q", "r"),
+    ("!(p | q)", "!p"),
+    ("p -> q, p -> r, p", "q & r"),
+    ("p | q, !p | r", "q | r"),
+    ("p & (q & r)", "r"),
+    ("p <-> q, p", "q"),
+    ("!!p -> q, p", "q"),
+])
+def test_finds_valid_proofs(premises, goal):
+    premises = [parse(p) for p in premises.split(",")]
+    goal = parse(goal)
+    search = ProofSearch(premises, goal)
+    steps = search.run()
+    assert search.reason == "found"
+    assert steps[-1][0] == goal
+    proof = replay(premises, goal, steps)
+    assert proof.steps[-1].result == goal
+
+def test_goal_already_known():
+    search = ProofSearch([Var("p")], Var("p"))
+    assert search.run() == []
+
+def test_not_entailed():
+    search = ProofSearch([Var("p")], Var("q"))
+    assert search.run() is None
+    assert search.reason == "not entailed"
+    assert search.counterexample == {"p": True, "q": False}
+
+def test_exhausted():
+    # Entailed, but ¬¬p cannot be introduced with the available rules
+    search = ProofSearch([parse("¬(p ∧ q)"), Var("p")], parse("¬q"))
+    assert search.run() is None
+    assert search.reason == "exhausted"
+
+def test_node_budget():
+    premises = [parse("(a | b) -> c"), parse("a & d")]
+    search = ProofSearch(premises, Var("c"), max_nodes=3)
+    assert search.run() is None
+    assert search.reason == "node budget"
+
+def test_prove_appends_steps(capsys):
+    proof = ProofState([parse("p -> q"), parse("q -> r"), Var("p")], Var("r"))
+    assert proof.prove()
+    assert len(proof.steps) == 5
+    assert proof.steps[3].rule == "modus_ponens"
+    assert proof.steps[3].premises == [0, 2]
+    assert proof.steps[-1].result == Var("r")
+    assert "Goal reached" in capsys.readouterr().out
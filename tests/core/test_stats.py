@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.stats import STATS, Metric, Stats
+from deducto.rules.apply import apply_rule
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    STATS.reset()
+    yield
+    STATS.reset()
+    STATS.rules = False
+
+def test_metric():
+    counter = Metric()
+    for i in range(100):
+        counter.add(i / 1000, ok=i % 10 != 0)
+    row = counter.to_dict()
+    assert (row["calls"], row["ok"], row["failed"]) == (100, 90, 10)
+    assert row["p95"] == pytest.approx(0.095)
+    assert row["mean"] == pytest.approx(0.0495)
+
+def test_timed_counts_failures():
+    stats = Stats()
+    with stats.timed("command", "ok"):
+        pass
+    with pytest.raises(ValueError):
+        with stats.timed("command", "bad"):
+            raise ValueError
+    assert stats.counters["command"]["ok"].ok == 1
+    assert stats.counters["command"]["bad"].failed == 1
+
+def test_disabled():
+    stats = Stats()
+    stats.enabled = False
+    stats.record("rule", "x", 1.0)
+    assert stats.counters == {}
+
+def test_apply_rule_records_only_when_on():
+    p, q = Var("p"), Var("q")
+    apply_rule("modus_ponens", [Implies(p, q), p])
+    assert STATS.counters == {}
+
+def test_apply_rule_records_rule_and_shape(capsys):
+    p, q = Var("p"), Var("q")
+    execute_command("stats on", ProofState([], None))
+    assert "on" in capsys.readouterr().out
+    apply_rule("modus_ponens", [Implies(p, q), p])
+    with pytest.raises(TypeError):
+        apply_rule("modus_ponens", [p, p])
+    rule = STATS.counters["rule"]["modus_ponens"]
+    assert (rule.calls, rule.ok, rule.failed) == (2, 1, 1)
+    assert STATS.counters["shape"][("modus_ponens", Implies, Var)].ok == 1
+    assert STATS.to_dict()["shape"]["modus_ponens(Implies, Var)"]["ok"] == 1
+    assert any("modus_ponens(Implies, Var)" in line for line in STATS.table())
+    with pytest.raises(ValueError):
+        apply_rule("no_such_rule", [p])
+    assert "no_such_rule" not in STATS.counters["rule"]
+
+def test_commands_and_try_rule(tmp_path, capsys):
+    proof = ProofState([parse("p -> q"), parse("p")], parse("q"))
+    execute_command("apply modus_tollens 1 2", proof)
+    execute_command("apply modus_ponens 1 2", proof)
+    assert STATS.counters["command"]["apply"].calls == 2
+    assert STATS.counters["try_rule"]["modus_tollens"].failed == 1
+    assert STATS.counters["try_rule"]["modus_ponens"].ok == 1
+
+    execute_command("stats", proof)
+    out = capsys.readouterr().out
+    assert "try_rule:" in out and "modus_ponens" in out
+
+    path = tmp_path / "stats.json"
+    execute_command(f"stats json {path}", proof)
+    data = json.loads(path.read_text())
+    assert data["try_rule"]["modus_ponens"]["calls"] == 1
+    assert set(data["command"]["apply"]) == {"calls", "ok", "failed", "total", "mean", "p95"}
+
+    execute_command("stats reset", proof)
+    assert list(STATS.counters) == ["command"]  # only the reset itself
@@ -0,0 +1,97 @@
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.truthtable import entails, evaluate, find_model, is_tautology, variables
+
+def brute_force(expr, names):
+    """Reference evaluation, one assignment at a time"""
+    def value(node, env):
+        if isinstance(node, Var):
+            return env[node.name]
+        if isinstance(node, TrueExpr):
+            return True
+        if isinstance(node, FalseExpr):
+            return False
+        if isinstance(node, Not):
+            return not value(node.negated, env)
+        a, b = value(node.left, env), value(node.right, env)
+        return {
+            And: a and b,
+            Or: a or b,
+            Implies: (not a) or b,
+            Iff: a == b,
+            Xor: a != b,
+        }[node.__class__]
+
+    table = 0
+    for k in range(1 << len(names)):
+        env = {name: bool(k >> i & 1) for i, name in enumerate(names)}
+        if value(expr, env):
+            table |= 1 << k
+    return table
+
+def test_variables():
+    assert variables(parse("(b ∧ a) → (c ∨ a)"), parse("d")) == ["a", "b", "c", "d"]
+
+@pytest.mark.parametrize("text", [
+    "a ∧ b",
+    "a ∨ ¬b",
+    "a → (b ↔ c)",
+    "(a ⊕ b) ⊕ (c ∧ T)",
+    "¬(a ∨ F) ↔ (b → a)",
+])
+def test_evaluate_matches_brute_force(text):
+    expr = parse(text)
+    names = variables(expr)
+    assert evaluate(expr) == brute_force(expr, names)
+
+def test_evaluate_across_chunks(monkeypatch):
+    monkeypatch.setattr(truthtable, "CHUNK_VARIABLES", 2)
+    expr = parse("(a → b) ∧ (c ⊕ d) ∨ ¬e")
+    assert evaluate(expr) == brute_force(expr, variables(expr))
+
+def test_tautology():
+    assert is_tautology(parse("a ∨ ¬a"))
+    assert is_tautology(parse("(a → b) ↔ (¬b → ¬a)"))
+    assert not is_tautology(parse("a → b"))
+    assert find_model(parse("a ∧ ¬a")) is None
+
+def test_entails():
+    assert entails([parse("p → q"), parse("p")], parse("q")) == (True, None)
+    valid, counterexample = entails([parse("p → q")], parse("q → p"))
+    assert not valid
+    assert counterexample == {"p": False, "q": True}
+
+def test_entails_many_variables():
+    chain = [parse(f"x{i} → x{i + 1}") for i in range(24)]
+    assert entails(chain + [Var("x0")], Var("x24"))[0]
+    assert not entails(chain, Var("x24"))[0]
+
+def test_too_many_variables():
+    expr = parse(" ∧ ".join(f"x{i}" for i in range(truthtable.MAX_VARIABLES + 1)))
+    with pytest.raises(ValueError):
+        evaluate(expr)
+
+def test_proof_state_check():
+    proof = ProofState([parse("p ∨ q"), parse("¬p")], Var("q"))
+    assert proof.check() == (True, None)
+    proof.goal = Var("p")
+    assert proof.check() == (False, {"p": False, "q": True})
+
+def test_check_ignores_undone_assumptions(capsys):
+    proof = ProofState([Var("p")], Var("q"))
+    execute_command("assume q", proof)
+    assert proof.check() == (True, None)
+    execute_command("undo", proof)
+    assert proof.check() == (False, {"p": True, "q": False})
+    assert not proof.prove()
+    assert "does not follow" in capsys.readouterr().out
+
+def test_prove_rejects_unprovable_goal(capsys):
+    proof = ProofState([Var("p")], Var("q"))
+    assert not proof.prove()
+    assert "does not follow" in capsys.readouterr().out
+    assert len(proof.steps) == 1
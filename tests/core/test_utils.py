@@ -11,8 +11,24 @@ def test_resolve_path():
 
 def test_set_path():
     expr = And(Var("A"), Var("B"))
-    utils.set_path(expr, ["right"], Var("C"))
-    assert expr.right == Var("C")
+    new_expr = utils.set_path(expr, ["right"], Var("C"))
+    assert new_expr.right == Var("C")
+    assert new_expr.left is expr.left
+    assert expr.right == Var("B")  # the original is left untouched
+
+def test_set_path_shares_untouched_subtrees():
+    big = And(Or(Var("P"), Var("Q")), Implies(Var("R"), Var("S")))
+    expr = Or(big, Not(Not(Var("T"))))
+    new_expr = utils.set_path(expr, ["right", "negated"], Var("U"))
+    assert new_expr == Or(big, Not(Var("U")))
+    assert new_expr.left is expr.left
+
+def test_set_path_deep():
+    expr = Var("A")
+    for _ in range(5000):
+        expr = Not(expr)
+    new_expr = utils.set_path(expr, ["negated"] * 5000, Var("B"))
+    assert utils.resolve_path(new_expr, ["negated"] * 5000) == Var("B")
 
 def test_parse_path():
     index, path = utils.parse_path("2.left.right")
@@ -43,3 +59,11 @@ def test_all_paths_deeply_nested():
     assert "right.left" in paths
     assert "right.right.negated" in paths
 
+
+def test_all_paths_very_deep():
+    expr = Var("A")
+    for _ in range(5000):
+        expr = Not(expr)
+    paths = utils.all_paths(expr)
+    assert len(paths) == 5000
+    assert paths[0] == "negated"
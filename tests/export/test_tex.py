@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from deducto.cli.parser import parse
+from deducto.core.proof import ProofState
+from deducto.export import tex
+from deducto.export.background import TexExporter
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Replace pdflatex by a fake that records each compilation"""
+    calls = []
+    def fake_compile(doc, filepath):
+        calls.append(filepath)
+        with open(filepath + ".pdf", "w") as f:
+            f.write(f"pdf of {len(doc.dumps())} characters")
+    monkeypatch.setattr(tex, "_compile", fake_compile)
+    return calls
+
+def make_proof():
+    proof = ProofState([parse("p -> q"), parse("p")], parse("q"))
+    proof.try_rule("modus_ponens", ["1", "2"])
+    return proof
+
+def test_cache_skips_compiler(tmp_path, compiles):
+    doc = tex.build_document([make_proof()])
+    cache = str(tmp_path / "cache")
+    assert not tex.compile_pdf(doc, str(tmp_path / "a"), cache)
+    assert tex.compile_pdf(doc, str(tmp_path / "b"), cache)
+    assert len(compiles) == 1
+    assert (tmp_path / "b.pdf").read_text() == (tmp_path / "a.pdf").read_text()
+    assert (tmp_path / "b.tex").read_text() == doc.dumps()
+
+def test_changed_proof_recompiles(tmp_path, compiles):
+    cache = str(tmp_path / "cache")
+    proof = make_proof()
+    tex.compile_pdf(tex.build_document([proof]), str(tmp_path / "a"), cache)
+    proof.try_rule("addition", ["3", "1"])
+    tex.compile_pdf(tex.build_document([proof]), str(tmp_path / "a"), cache)
+    assert len(compiles) == 2
+
+def test_batch_document_labels():
+    source = tex.build_document([make_proof(), make_proof()], ["First", "Second"]).dumps()
+    assert r"\section{First}" in source and r"\section{Second}" in source
+    assert r"\label{eq1:3}" in source and r"\ref{eq2:1}" in source
+    assert "subsec:" not in source
+
+def test_background_exporter(tmp_path, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    def slow_compile(doc, filepath):
+        started.set()
+        release.wait(5)
+        with open(filepath + ".pdf", "w") as f:
+            f.write("pdf")
+    monkeypatch.setattr(tex, "_compile", slow_compile)
+    exporter = TexExporter(str(tmp_path / "cache"))
+    proof = make_proof()
+    exporter.submit([proof], str(tmp_path / "out"))
+    started.wait(5)
+    proof.try_rule("addition", ["3", "1"])  # edits after submitting are not exported
+    assert exporter.finished() == []
+    release.set()
+    messages = exporter.close()
+    assert messages == [f"✓ Exported to {tmp_path / 'out'}.tex and {tmp_path / 'out'}.pdf"]
+    assert "lor" not in (tmp_path / "out.tex").read_text()
+
+def test_exporter_reports_failures(tmp_path, monkeypatch):
+    def failing_compile(doc, filepath):
+        raise RuntimeError("no pdflatex")
+    monkeypatch.setattr(tex, "_compile", failing_compile)
+    exporter = TexExporter(str(tmp_path / "cache"))
+    exporter.submit([make_proof()], str(tmp_path / "out"))
+    assert exporter.close() == [f"✗ Export to {tmp_path / 'out'}.pdf failed: no pdflatex"]
+
+def test_branch_proofs(tmp_path, compiles):
+    proof = make_proof()
+    proof.branch("alt")
+    proof.undo()
+    source = tex.build_document([proof.branch_proof(name) for name in ("main", "alt")]).dumps()
+    assert source.count(r"\label{eq1:") == 3
+    assert source.count(r"\label{eq2:") == 2
@@ -0,0 +1,42 @@
+import pytest
+from deducto.core.expr import *
+from deducto.rules import equivalence, inference
+from deducto.rules.apply import RULES, apply_rule, get_rule_explanation, list_rules
+
+def test_registry_covers_both_modules():
+    assert RULES["modus_ponens"].kind == "inference"
+    assert RULES["commutative_and"].kind == "equivalence"
+    assert RULES["modus_ponens"].func is inference.modus_ponens
+    assert RULES["negation"].func is equivalence.negation
+    assert list_rules() == list(RULES)
+
+def test_registry_skips_imported_names():
+    for name in ("Expr", "And", "Var"):
+        assert name not in RULES
+
+def test_registry_signature():
+    rule = RULES["modus_tollens"]
+    assert rule.arity == 2
+    assert rule.types == (Implies, Not)
+    assert RULES["idempotent"].types == (Expr,)
+    assert RULES["addition"].types == (Expr, Expr)
+
+def test_registry_docstring():
+    rule = RULES["idempotent"]
+    assert rule.forms == ("a ∧ a ⇔ a", "a ∨ a ⇔ a")
+    assert get_rule_explanation("idempotent") == rule.doc
+
+def test_apply_rule():
+    p, q = Var("P"), Var("Q")
+    assert apply_rule("modus_ponens", [Implies(p, q), p]) == q
+    assert apply_rule("commutative_or", [Or(p, q)]) == Or(q, p)
+
+def test_apply_rule_unknown():
+    with pytest.raises(ValueError):
+        apply_rule("nonexistent_rule", [Var("P")])
+    with pytest.raises(ValueError):
+        get_rule_explanation("nonexistent_rule")
+
+def test_apply_rule_wrong_arity():
+    with pytest.raises(TypeError, match="takes 2 premise"):
+        apply_rule("conjunction", [Var("P")])
@@ -178,13 +178,13 @@ def test_negation():
 
 def test_identity_or():
     p = Var("P")
-    or_expr = Or(p, FalseExpr)
+    or_expr = Or(p, FalseExpr())
 
     result = identity_or(or_expr)
     assert result == p
 
     with pytest.raises(ValueError):
-        identity_or(Or(p, TrueExpr))
+        identity_or(Or(p, TrueExpr()))
 
 def test_identity_and():
     p = Var("P")
@@ -194,7 +194,7 @@ def test_identity_and():
     assert result == p
 
     with pytest.raises(ValueError):
-        identity_and(And(p, FalseExpr))
+        identity_and(And(p, FalseExpr()))
 
 def test_domination_or():
     p = Var("P")
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+from deducto.solver.cdcl import Solver, luby, solve
+
+def brute_force(num_vars, clauses):
+    for bits in range(1 << num_vars):
+        if all(any((l > 0) == bool(bits >> (abs(l) - 1) & 1) for l in c) for c in clauses):
+            return True
+    return False
+
+def satisfies(model, clauses):
+    return all(any(model[abs(l)] == (l > 0) for l in c) for c in clauses)
+
+def test_luby():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+def test_trivial():
+    assert solve([[1, 2], [-1], [-2, 3]]) == {1: False, 2: True, 3: True}
+    assert solve([[1], [-1]]) is None
+    assert solve([[]]) is None
+    assert solve([[1, -1]]) == {1: False}
+
+def test_random_against_brute_force():
+    rng = random.Random(0)
+    for _ in range(500):
+        n = rng.randint(1, 9)
+        clauses = [
+            [rng.choice([-1, 1]) * rng.randint(1, n) for _ in range(rng.randint(1, 4))]
+            for _ in range(rng.randint(1, 45))
+        ]
+        solver = Solver(n, clauses)
+        result = solver.solve()
+        assert result == brute_force(n, clauses)
+        if result:
+            assert satisfies(solver.model, clauses)
+
+def test_learnt_clause_deletion_keeps_answers():
+    rng = random.Random(1)
+    for _ in range(30):
+        n = 40
+        clauses = [[v * rng.choice([-1, 1]) for v in rng.sample(range(1, n + 1), 3)] for _ in range(170)]
+        small = Solver(n, clauses)
+        small._max_learnts = 5
+        large = Solver(n, clauses)
+        large._max_learnts = 10 ** 9
+        assert small.solve() == large.solve()
+
+def test_pigeonhole_unsat():
+    # 5 pigeons in 4 holes; p(i, j) is pigeon i in hole j
+    def p(i, j):
+        return 4 * i + j + 1
+    clauses = [[p(i, j) for j in range(4)] for i in range(5)]
+    for j in range(4):
+        for a in range(5):
+            for b in range(a + 1, 5):
+                clauses.append([-p(a, j), -p(b, j)])
+    solver = Solver(20, clauses)
+    assert solver.solve() is False
+    assert solver.conflicts > 0
+
+def test_incremental():
+    solver = Solver(3, [[1, 2, 3]])
+    models = set()
+    while solver.solve():
+        model = tuple(solver.model[v] for v in (1, 2, 3))
+        models.add(model)
+        solver.add_clause([-v if solver.model[v] else v for v in (1, 2, 3)])
+    assert len(models) == 7
+
+def test_conflict_budget():
+    rng = random.Random(2)
+    clauses = [[v * rng.choice([-1, 1]) for v in rng.sample(range(1, 151), 3)] for _ in range(639)]
+    assert Solver(150, clauses).solve(max_conflicts=1) is None
@@ -0,0 +1,69 @@
+import pytest
+from deducto.cli.parser import parse
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.solver import entails, find_model, is_satisfiable, is_tautology
+from deducto.solver import entailment
+from deducto.solver.cdcl import Solver
+from deducto.solver.tseitin import CNF, tseitin
+
+FORMULAS = [
+    "a ∧ b",
+    "a ∨ ¬b",
+    "a → (b ↔ c)",
+    "(a ⊕ b) ⊕ (c ∧ T)",
+    "¬(a ∨ F) ↔ (b → a)",
+    "a ∧ ¬a",
+    "(a → b) ↔ (¬b → ¬a)",
+    "F",
+]
+
+@pytest.mark.parametrize("text", FORMULAS)
+def test_encoding_is_equisatisfiable(text):
+    expr = parse(text)
+    cnf = tseitin(expr)
+    solver = Solver(cnf.num_vars, cnf.clauses)
+    expected = truthtable.find_model(expr) is not None
+    assert solver.solve() == expected
+    if expected:
+        names = sorted(cnf.names)
+        index = sum(1 << i for i, name in enumerate(names) if solver.model[cnf.names[name]])
+        assert truthtable.evaluate(expr, names) >> index & 1
+
+def test_encoding_is_linear():
+    text = " ∧ ".join(f"(x{i} ↔ x{i + 1})" for i in range(100))
+    cnf = tseitin(parse(text))
+    assert cnf.num_vars == 101 + 100 + 99
+    assert len(cnf.clauses) == 1 + 100 * 4 + 99 * 3
+
+def test_shared_subformulas():
+    cnf = CNF()
+    shared = parse("a ∧ b")
+    first = cnf.encode(Or(shared, Var("c")))
+    count = len(cnf.clauses)
+    cnf.encode(Implies(shared, Var("c")))
+    assert len(cnf.clauses) == count + 3
+
+@pytest.fixture(params=[0, 12])
+def threshold(request, monkeypatch):
+    # 0 forces every check through the SAT solver
+    monkeypatch.setattr(entailment, "TRUTH_TABLE_VARIABLES", request.param)
+
+def test_entails(threshold):
+    assert entails([parse("p → q"), parse("p")], parse("q")) == (True, None)
+    valid, counterexample = entails([parse("p → q")], parse("q → p"))
+    assert not valid
+    assert counterexample == {"p": False, "q": True}
+
+def test_satisfiability(threshold):
+    assert is_satisfiable(parse("a ∧ ¬b"))
+    assert find_model(parse("a ∧ ¬b")) == {"a": True, "b": False}
+    assert not is_satisfiable(parse("(a → b) ∧ a ∧ ¬b"))
+    assert is_tautology(parse("a ∨ ¬a"))
+
+def test_entails_hundreds_of_variables():
+    chain = [parse(f"x{i} → x{i + 1}") for i in range(300)]
+    assert entails(chain + [Var("x0")], Var("x300"))[0]
+    valid, counterexample = entails(chain, Var("x300"))
+    assert not valid
+    assert not counterexample["x300"]
@@ -0,0 +1,94 @@
+import pytest
+from deducto.bdd import BDD, FALSE, TRUE, equivalent, first_nonequivalent
+from deducto.cli.parser import parse
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.core.utils import set_path
+from deducto.rules.equivalence import *
+
+def test_equivalent_formulas_share_a_node():
+    bdd = BDD()
+    assert bdd.compile(parse("a → b")) == bdd.compile(parse("¬a ∨ b"))
+    assert bdd.compile(parse("¬(a ∧ b)")) == bdd.compile(parse("¬a ∨ ¬b"))
+    assert bdd.compile(parse("a ⊕ b")) == bdd.compile(parse("¬(a ↔ b)"))
+    assert bdd.compile(parse("a ∧ b")) != bdd.compile(parse("a ∨ b"))
+
+def test_constants_and_tautologies():
+    bdd = BDD()
+    assert bdd.compile(parse("a ∨ ¬a")) == TRUE
+    assert bdd.compile(parse("a ∧ ¬a")) == FALSE
+    assert bdd.compile(parse("T")) == TRUE
+    assert bdd.is_tautology(parse("(a → b) ↔ (¬b → ¬a)"))
+    assert not bdd.is_tautology(parse("a → b"))
+
+@pytest.mark.parametrize("text", [
+    "a ∧ b",
+    "a ∨ b ∨ c",
+    "a ⊕ b ⊕ c",
+    "(a → b) ∧ (c ↔ ¬d)",
+    "F",
+])
+def test_model_count(text):
+    expr = parse(text)
+    bdd = BDD()
+    node = bdd.compile(expr)
+    assert bdd.count(node) == bin(truthtable.evaluate(expr, bdd.order)).count("1")
+
+def test_satisfy():
+    bdd = BDD()
+    node = bdd.compile(parse("¬a ∧ (b ∨ c)"))
+    assignment = bdd.satisfy(node)
+    assert assignment["a"] is False
+    assert bdd.satisfy(FALSE) is None
+
+def test_order_changes_size():
+    # x0 ∧ y0 ∨ x1 ∧ y1 ∨ ... is linear with interleaved variables and
+    # exponential with all x before all y
+    n = 5
+    expr = parse(" ∨ ".join(f"(x{i} ∧ y{i})" for i in range(n)))
+    interleaved = BDD([v for i in range(n) for v in (f"x{i}", f"y{i}")])
+    separated = BDD([f"x{i}" for i in range(n)] + [f"y{i}" for i in range(n)])
+    small = interleaved.size([interleaved.compile(expr)])
+    large = separated.size([separated.compile(expr)])
+    assert small == 2 * n
+    assert large > 4 * small
+
+def test_sift_finds_smaller_order():
+    n = 6
+    expr = parse(" ∨ ".join(f"(x{i} ∧ y{i})" for i in range(n)))
+    bdd = BDD([f"x{i}" for i in range(n)] + [f"y{i}" for i in range(n)])
+    root = bdd.compile(expr)
+    before = bdd.size([root])
+    assert bdd.sift([root], passes=3) == [root]
+    assert bdd.size([root]) == 2 * n < before
+    assert bdd.compile(expr) == root
+    assert bdd.count(root) == bin(truthtable.evaluate(expr, bdd.order)).count("1")
+
+def test_sift_keeps_every_function():
+    texts = ["(a ∧ d) ∨ (b ∧ e) ∨ (c ∧ f)", "a ⊕ b ⊕ c", "(a → f) ∧ (e ↔ b)", "¬(c ∨ d) ∧ a", "e"]
+    bdd = BDD(["a", "b", "c", "d", "e", "f"])
+    roots = [bdd.compile(parse(text)) for text in texts]
+    bdd.sift(roots, passes=2)
+    fresh = BDD(bdd.order)
+    assert bdd.transfer(roots, fresh) == [fresh.compile(parse(text)) for text in texts]
+    # The unique table still describes every node
+    assert len(bdd._unique) == len(bdd) - 2
+    for (level, low, high), node in bdd._unique.items():
+        assert (bdd._level[node], bdd._low[node], bdd._high[node]) == (level, low, high)
+        assert level < bdd._level[low] and level < bdd._level[high]
+    assert bdd.compile(parse("a ∧ b")) == bdd.compile(parse("b ∧ a"))
+
+def test_small_cache_still_correct():
+    bdd = BDD(cache_size=1)
+    assert bdd.compile(parse("(a ∧ b) ∨ (a ∧ c)")) == bdd.compile(parse("a ∧ (b ∨ c)"))
+
+def test_equivalent():
+    assert equivalent(parse("a ∧ (b ∨ c)"), parse("(a ∧ b) ∨ (a ∧ c)"))
+    assert not equivalent(parse("a → b"), parse("b → a"))
+
+def test_first_nonequivalent():
+    start = parse("¬(a ∧ b) ∨ c")
+    step = set_path(start, ["left"], demorgan_and(start.left))
+    chain = [start, step, commutative_or(step)]
+    assert first_nonequivalent(chain) is None
+    assert first_nonequivalent(chain + [parse("a ∨ c")]) == 3
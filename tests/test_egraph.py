@@ -0,0 +1,99 @@
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.utils import resolve_path, set_path
+from deducto.egraph import EGraph, equivalent, proof_steps
+from deducto.rules.apply import RULES, apply_rule
+
+def test_patterns_match_rule_functions():
+    egraph = EGraph()
+    assert {rule for rule, _, _ in egraph.rewrites} == {
+        rule.name for rule in RULES.values() if rule.kind == "equivalence"
+    }
+    for rule, left, right in egraph.rewrites:
+        assert RULES[rule].func(left) == right
+
+def test_hash_consing_and_congruence():
+    egraph = EGraph()
+    first = egraph.add(parse("(a ∧ b) ∨ c"))
+    assert egraph.add(parse("(a ∧ b) ∨ c")) == first
+    size = len(egraph)
+    egraph.add(parse("(a ∧ d) ∨ c"))
+    assert len(egraph) == size + 3
+    egraph.union(egraph.add(Var("b")), egraph.add(Var("d")))
+    egraph.rebuild()
+    assert egraph.equivalent(first, egraph.add(parse("(a ∧ d) ∨ c")))
+    assert not egraph.equivalent(first, egraph.add(Var("c")))
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("a ∧ b", "b ∧ a", True),
+    ("a → b", "¬b → ¬a", True),
+    ("¬(a ∨ (b ∧ c))", "¬a ∧ (¬b ∨ ¬c)", True),
+    ("p ∧ (q ∨ F)", "q ∧ p", True),
+    ("a ∨ b", "a ∧ b", False),
+    ("a", "b", False),
+])
+def test_equivalent(a, b, expected):
+    assert equivalent(parse(a), parse(b)) == expected
+
+@pytest.mark.parametrize("a, b", [
+    ("a ∧ (b ∧ c)", "(a ∧ b) ∧ c"),
+    ("(p ∨ q) ∧ r", "(r ∧ q) ∨ (p ∧ r)"),
+    ("x0 ∧ x1 ∧ x2 ∧ x3", "x3 ∧ x2 ∧ x1 ∧ x0"),
+    ("((p → q) ∧ (q → r)) ∨ F", "(r ∨ ¬q) ∧ (¬p ∨ q)"),
+    ("a ↔ b", "(¬a ∨ b) ∧ (¬b ∨ a)"),
+])
+def test_chains_replay_with_rules(a, b):
+    current = parse(a)
+    steps = proof_steps(current, parse(b), 0, 1)
+    for step in steps:
+        name, _, path = step.rule.partition(" at ")
+        path = path.split(".") if path else []
+        current = set_path(current, path, apply_rule(name, [resolve_path(current, path)]))
+        assert current == step.result
+    assert current == parse(b)
+    assert [step.premises for step in steps] == [[0]] + [[i] for i in range(1, len(steps))]
+
+def test_chain_is_shortest():
+    steps = proof_steps(parse("¬(a ∨ b) ∧ c"), parse("c ∧ (¬b ∧ ¬a)"), 0, 1)
+    assert len(steps) == 3
+
+def test_chain_found_in_last_iteration():
+    # Saturates after the iteration adding the commutative_or edge
+    steps = proof_steps(parse("p -> q"), parse("q | !p"), 0, 1)
+    assert [step.rule for step in steps] == ["material_implication", "commutative_or"]
+
+def test_no_forward_chain():
+    # Contraposition needs material implication backwards
+    with pytest.raises(ValueError, match="no chain"):
+        proof_steps(parse("a → b"), parse("¬b → ¬a"), 0, 1)
+    with pytest.raises(ValueError, match="not known to be equivalent"):
+        proof_steps(parse("a"), parse("b"), 0, 1)
+
+def test_budgets_and_bans():
+    expr = parse(" ∧ ".join(f"x{i}" for i in range(8)))
+    egraph = EGraph(max_nodes=500)
+    egraph.add(expr)
+    assert egraph.run() == "node budget"
+    # Commutativity and associativity are held back, so the e-graph grows slowly
+    egraph = EGraph(max_nodes=500, match_limit=20)
+    egraph.add(expr)
+    assert egraph.run() == "iteration budget"
+    assert {"commutative_and", "associative_and"} <= set(egraph._bans)
+    assert len(egraph) < 500
+    egraph = EGraph(max_iterations=2)
+    egraph.add(expr)
+    assert egraph.run() == "iteration budget"
+    assert egraph.iterations == 2
+
+def test_equiv_command(capsys):
+    proof = ProofState([parse("p ∧ (q ∨ F)")], parse("q ∧ p"))
+    assert execute_command("equiv 1", proof)
+    assert proof.steps[-1].result == parse("q ∧ p")
+    execute_command("equiv 3", proof)
+    assert "already the goal" in capsys.readouterr().out
+    proof.goal = parse("p ∨ q")
+    execute_command("equiv 1", proof)
+    assert "not known to be equivalent" in capsys.readouterr().out
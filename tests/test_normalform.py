@@ -0,0 +1,130 @@
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.utils import postorder, resolve_path, set_path
+from deducto.normalform import Normalizer, conjuncts, proof_steps, to_cnf, to_dnf, to_nnf
+from deducto.rules.apply import apply_rule
+from deducto.solver import is_satisfiable
+
+FORMULAS = [
+    "a → b",
+    "¬(a ↔ b)",
+    "a ⊕ b ⊕ c",
+    "(a ∧ b) ∨ (c ∧ d)",
+    "¬(a → (b ∨ ¬c))",
+    "¬¬¬a ∧ (T → b)",
+    "(a ∨ b) ∧ ¬(c ∧ ¬d) ↔ a",
+]
+
+def is_nnf(expr):
+    return all(
+        not isinstance(node, (Implies, Iff, Xor)) and
+        not (isinstance(node, Not) and not isinstance(node.negated, (Var, ConstantExpr)))
+        for node in postorder(expr)
+    )
+
+def is_normal(expr, outer, inner):
+    """Whether expr is an outer of inners of literals"""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, outer):
+            stack.extend((node.left, node.right))
+        elif any(isinstance(n, outer) for n in postorder(node)):
+            return False
+    return is_nnf(expr)
+
+def equivalent(a, b):
+    names = sorted({n.name for e in (a, b) for n in postorder(e) if isinstance(n, Var)})
+    return truthtable.evaluate(a, names) == truthtable.evaluate(b, names)
+
+@pytest.mark.parametrize("text", FORMULAS)
+def test_conversions_are_equivalent(text):
+    expr = parse(text)
+    nnf, cnf, dnf = to_nnf(expr), to_cnf(expr), to_dnf(expr)
+    assert is_nnf(nnf) and equivalent(expr, nnf)
+    assert is_normal(cnf, And, Or) and equivalent(expr, cnf)
+    assert is_normal(dnf, Or, And) and equivalent(expr, dnf)
+
+@pytest.mark.parametrize("form", ["nnf", "cnf", "dnf"])
+@pytest.mark.parametrize("text", FORMULAS)
+def test_trace_replays_with_rules(text, form):
+    expr = parse(text)
+    normalizer = Normalizer()
+    current = expr
+    for rule, result in normalizer.trace(expr, form):
+        name, _, path = rule.partition(" at ")
+        path = path.split(".") if path else []
+        current = set_path(current, path, apply_rule(name, [resolve_path(current, path)]))
+        assert current == result
+    assert current == getattr(normalizer, form)(expr)
+
+def test_proof_steps_number_premises():
+    proof = ProofState([parse("p"), parse("¬(p ∧ q)")], None)
+    steps = proof_steps(proof.steps[1].result, "cnf", 1, len(proof.steps))
+    assert [step.premises for step in steps] == [[1]]
+    assert steps[0].rule == "demorgan_and"
+
+    proof = ProofState([parse("a → (b ∧ c)")], None)
+    steps = proof_steps(proof.steps[0].result, "cnf", 0, 1)
+    assert [step.premises for step in steps] == [[0], [1]]
+    assert [step.rule for step in steps] == ["material_implication", "distributive_or"]
+
+def test_shared_subtrees_are_converted_once():
+    shared = parse("(a → b) ↔ (c ⊕ d)")
+    normalizer = Normalizer()
+    first = normalizer.cnf(And(shared, Var("e")))
+    entries = len(normalizer._memo)
+    second = normalizer.cnf(Or(Var("e"), shared))
+    assert len(normalizer._memo) < 2 * entries
+    assert equivalent(first, And(shared, Var("e")))
+    assert equivalent(second, Or(Var("e"), shared))
+
+def test_deep_formula():
+    expr = Var("x0")
+    for i in range(1, 3000):
+        expr = Implies(Var(f"x{i}"), expr)
+    cnf = to_cnf(expr)
+    assert len(conjuncts(cnf)) == 1
+    assert is_nnf(cnf)
+
+def test_definitional_fallback():
+    n = 12
+    expr = parse(" ∨ ".join(f"(x{i} ∧ y{i})" for i in range(n)))
+    normalizer = Normalizer(budget=100)
+    cnf = normalizer.cnf(expr)
+    assert normalizer.definitions
+    assert all(name.startswith("_t") for name in normalizer.definitions)
+    assert len(conjuncts(cnf)) < 200
+    assert is_normal(cnf, And, Or)
+    assert is_satisfiable(cnf)
+    blocked = And(expr, parse(" ∧ ".join(f"¬x{i}" for i in range(n))))
+    assert not is_satisfiable(to_cnf(blocked, budget=100))
+
+def test_fresh_names_avoid_existing_variables():
+    expr = parse("(_t1 ∧ a) ∨ (b ∧ c) ∨ (d ∧ e)")
+    normalizer = Normalizer(budget=4)
+    normalizer.cnf(expr)
+    assert "_t1" not in normalizer.definitions
+
+def test_over_budget():
+    expr = parse(" ∨ ".join(f"(x{i} ∧ y{i})" for i in range(8)))
+    with pytest.raises(ValueError):
+        Normalizer(budget=100).trace(expr, "cnf")
+    with pytest.raises(ValueError):
+        to_dnf(parse(" ∧ ".join(f"(x{i} ∨ y{i})" for i in range(8))), budget=100)
+    with pytest.raises(ValueError):
+        Normalizer().trace(expr, "anf")
+
+def test_normalize_command(capsys):
+    proof = ProofState([parse("a → (b ∧ c)")], parse("(¬a ∨ b) ∧ (¬a ∨ c)"))
+    assert execute_command("normalize cnf 1", proof)
+    assert [step.rule for step in proof.steps[1:]] == ["material_implication", "distributive_or"]
+    execute_command("normalize cnf 3", proof)
+    assert len(proof.steps) == 3
+    assert "already in CNF" in capsys.readouterr().out
+    execute_command("normalize cnf 9", proof)
+    assert "Invalid step index" in capsys.readouterr().out
@@ -0,0 +1,71 @@
+import pytest
+from deducto.cli.commands import execute_command
+from deducto.cli.parser import parse
+from deducto.core import truthtable
+from deducto.core.expr import *
+from deducto.core.proof import ProofState
+from deducto.core.utils import postorder, resolve_path, set_path
+from deducto.rules.apply import apply_rule
+from deducto.simplify import Simplifier, proof_steps, simplify
+
+@pytest.mark.parametrize("text, expected", [
+    ("(a ∧ T) ∨ F", "a"),
+    ("T ∧ a", "a"),
+    ("¬¬(a ∨ ¬a)", "T"),
+    ("(a ∧ (a ∨ b)) ∧ ((a ∨ b) ∧ a)", "a"),
+    ("(p ∧ ¬p) ∨ q", "q"),
+    ("((a ∨ F) ∧ (a ∨ F)) → b", "a → b"),
+    ("a ∨ (b ∧ F)", "a"),
+    ("a → b", "a → b"),
+])
+def test_simplify(text, expected):
+    assert simplify(parse(text)) == parse(expected)
+
+@pytest.mark.parametrize("text", [
+    "(a ∧ T) ∨ F",
+    "¬¬(a ∨ ¬a) ↔ (F ∨ (b ∧ b))",
+    "((p ∧ ¬p) ∨ q) ∧ ((p ∧ ¬p) ∨ q)",
+    "(T ∧ (a ∨ (a ∧ c))) ⊕ ¬¬c",
+])
+def test_trace_replays_with_rules(text):
+    expr = parse(text)
+    simplifier = Simplifier()
+    current = expr
+    for rule, result in simplifier.trace(expr):
+        name, _, path = rule.partition(" at ")
+        path = path.split(".") if path else []
+        current = set_path(current, path, apply_rule(name, [resolve_path(current, path)]))
+        assert current == result
+    assert current == simplifier.simplify(expr)
+    names = sorted({n.name for n in postorder(expr) if isinstance(n, Var)})
+    assert truthtable.evaluate(current, names) == truthtable.evaluate(expr, names)
+
+def test_shared_subtrees_are_simplified_once():
+    shared = parse("(a ∧ T) ∨ (b ∧ b)")
+    simplifier = Simplifier()
+    simplifier.simplify(And(shared, shared))
+    entries = len(simplifier._memo)
+    assert simplifier.simplify(Or(shared, Var("c"))) == parse("(a ∨ b) ∨ c")
+    assert len(simplifier._memo) == entries + 2
+    # Each occurrence still gets its own steps
+    rules = [rule for rule, _ in simplifier.trace(And(shared, shared))]
+    assert rules.count("identity_and at left.left") == 1
+    assert rules.count("identity_and at right.left") == 1
+
+def test_deep_formula():
+    expr = Var("x")
+    for _ in range(3000):
+        expr = And(expr, TrueExpr())
+    assert simplify(expr) == Var("x")
+
+def test_proof_steps_number_premises():
+    steps = proof_steps(parse("T ∧ (a ∨ F)"), 2, 5)
+    assert [step.rule for step in steps] == ["identity_or at right", "commutative_and", "identity_and"]
+    assert [step.premises for step in steps] == [[2], [5], [6]]
+
+def test_simplify_command(capsys):
+    proof = ProofState([parse("(p ∧ T) ∨ (q ∧ ¬q)")], parse("p"))
+    assert execute_command("simplify 1", proof)
+    assert proof.steps[-1].result == parse("p")
+    execute_command("simplify 4", proof)
+    assert "already simplified" in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# The import time budget lives in benchmarks/startup.py, as it depends on the
+# machine; these tests only check what gets imported
+
+
+def imports(*args):
+    """Return {module: self microseconds} for one launch of the CLI"""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "deducto", *args],
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            own, _, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(own)
+    return times
+
+@pytest.mark.parametrize("args", [("--version",), ("verify", os.devnull)])
+def test_non_interactive_startup(args):
+    times = imports(*args)
+    assert "deducto" in times
+    assert not any(name.split(".")[0] in ("prompt_toolkit", "pylatex") for name in times)
+
+def test_interactive_modules_load_lazily():
+    code = (
+        "import sys, deducto.cli.commands, deducto.core.proof, deducto.export.background;"
+        "print(any(m.split('.')[0] in ('prompt_toolkit', 'pylatex') for m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=SRC),
+        capture_output=True, text=True, timeout=60,
+    ).stdout
+    assert output.strip() == "False"